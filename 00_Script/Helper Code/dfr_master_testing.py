@@ -1,71 +1,61 @@
 '''this code reads the output transformed app-config.json and returns concatenated specific credentials based on "credential_request" for testing purposes
 for example, after using main_transformer.py, we would like to get only the DFR credentials for testing in tests-untp
 then, run this code by passing credential_request = 'DFR'
+when main_transformer.py wrote an index next to its output (<output>.index.json, see feature_index.py), the features are read
+directly from their byte offsets instead of loading and re-classifying the whole config, and each one is written to the output
+as soon as it is read, so large extractions never hold every feature in memory
 '''
 
-import json
+import sys
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, Iterable, Iterator, List
+
+sys.path.append(str(Path(__file__).resolve().parent.parent)) # 00_Script, for the shared JSON backend and classifier
+import json_backend
+from credential_classifier import feature_credential_type
+from feature_index import FeatureIndex, index_path_for
+from stream_io import dump_array
 
 
 ############## PARAMETERS & VARIABLES #####################
 
 current_dir = Path(__file__).resolve().parent
 input_path = (current_dir.parent.parent / "01_Data/app-config/RBTP" / "transformed-app-config-v4.json")
-credential_request = 'DFR'
+credential_request = 'DFR' # any of DFR, DPP, DCC, DTE, DIA
+features_dir = None # e.g. current_dir.parent.parent / "01_Data/app-config/RBTP/dfr-features-v4" to also write each feature to its own file (needs the index)
 
 ###########################################################
 
 
-with open(input_path, "r") as f:
-    config_data = json.load(f)
+def scan_features(config_data: Dict[str, Any], credential_request: str) -> List[Dict[str, Any]]:
+    # Fallback without an index: classifies every feature of the loaded config as the index does (see credential_classifier.feature_credential_type)
+    requested = []
+    for app in config_data.get("apps", []):
+        for feature in app.get("features", []):
+            if feature_credential_type(feature) == credential_request:
+                requested.append(feature)
+    return requested
 
-apps = config_data.get("apps", [])
 
-json_list = [] # initialises json list for output
-i=1
-for app in apps:
-    features = app.get("features", [])
-    for feature in features:
-        components = feature.get("components", [])
-        # Initialize credential_type to None
-        credential_type = None
-    
-        for component in components: # update component
-            if component.get("type") == "EntryData": #only process 
-                if component.get("name") == "LocalStorageLoader": #to identify 2 types of json types "LocalStorageLoader/NestedComponents" and standard "JsonForm"
-                    nestedcomponents = component['props']['nestedComponents']
-                    if len(nestedcomponents) == 1:
-                        schema_url = nestedcomponents[0]["props"]["schema"]["url"]
-                    else:
-                        print('Multiple nested components found. Please investigate')
-                        break
-                else:
-                    schema_url = component["props"]["schema"]["url"]
-                # Detect type from schema URL
-                if "DigitalFacilityRecord" in schema_url:
-                    credential_type = "DFR"
-                # elif "DigitalTraceabilityEvent" in schema_url:
-                #     credential_type = "DTE"
-                # elif "DigitalProductPassport" in schema_url:
-                #     credential_type = "DPP"
-                # elif "DigitalConformityCredential" in schema_url:
-                #     credential_type = "DCC"
-                # elif "DigitalIdentityAnchor" in schema_url:
-                #     credential_type = "DIA"
-                else:
-                    continue  # Skip unknown
-        
-        if credential_type == credential_request:
-            print(feature)
-            print('credential_type', credential_type)
-            feature['name'] += f" {str(i)}"
-            json_list.append(feature)
-            i += 1
+def numbered(features: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    # Appends a running number to each feature name, so the features can be told apart in tests-untp
+    for i, feature in enumerate(features, start=1):
+        print('credential_type', credential_request)
+        feature['name'] += f" {str(i)}"
+        yield feature
 
 
-output_path = current_dir.parent.parent / "01_Data/app-config/RBTP" / "transformed-app-config-dfr-only-v4.json"
-with open(output_path, "w") as f:
-    json.dump(json_list, f, indent=2)
+index_path = index_path_for(input_path)
+if index_path.exists():
+    index = FeatureIndex.load(index_path)
+    if features_dir:
+        index.write_features(features_dir, credential_request)
+    requested = (feature for _, feature in index.iter_features(index.by_type(credential_request))) # read while the output is written
+else:
+    requested = scan_features(json_backend.load_file(input_path), credential_request)
+    if features_dir:
+        print(f"No index found at {index_path.name}; re-run main_transformer.py with write_index = True to write each feature to its own file")
 
-# THE ABOVE ONLY OUTPUTS THE DFRS, can't test them in test-untp if they're in the same file
\ No newline at end of file
+
+output_path = current_dir.parent.parent / "01_Data/app-config/RBTP" / "transformed-app-config-dfr-only-v4.json"
+dump_array(numbered(requested), output_path)
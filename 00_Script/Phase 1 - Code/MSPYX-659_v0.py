@@ -250,15 +250,16 @@ def pop_and_replace_key(d, old_key, new_key):
         return None  # or raise KeyError like dict.pop
 
     value = d[old_key]
-    new_dict = {}
-    for k, v in d.items():
+    # only the keys after old_key are re-inserted, instead of copying the whole dict
+    tail = []
+    for k in reversed(d):
         if k == old_key:
-            new_dict[new_key] = v
-        else:
-            new_dict[k] = v
-
-    d.clear()
-    d.update(new_dict)
+            break
+        tail.append(k)
+    tail_items = [(k, d.pop(k)) for k in reversed(tail)]
+    del d[old_key]
+    d[new_key] = value
+    d.update(tail_items)
     return value
 
 # migrate DFR function
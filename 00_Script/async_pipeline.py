@@ -0,0 +1,208 @@
+'''
+This code migrates a folder of app-configs as a three-stage asyncio pipeline, so file I/O overlaps with the transformation:
+- read:      the next file's bytes are read in a thread while the current file is transformed
+- transform: parsing, AppConfigProcessor.process() and serializing run in a worker thread (or in worker processes for workers > 1)
+- write:     the previous file's output is written in a thread while the current file is transformed
+
+The stages are joined by bounded asyncio queues: when transformation is the slowest stage, the reader waits once queue_size files
+are read ahead, and when writing is the slowest, the transformers wait for the writer. At most about 2 * queue_size + workers files
+are in memory at once, and the wall-clock time of a run approaches the time of the slowest stage alone instead of the sum of the three.
+The outputs are the same as those of batch_transformer.py and main_transformer.py, and like there only app-configs are migrated:
+other JSON files of the source are reported as skipped, and the outputs are written to a separate folder.
+
+The overlap comes from the time reads and writes spend waiting on the disk, during which their threads release the GIL.
+Files served from the page cache make reading and writing CPU work as well, so on a single CPU such a run is no faster than file by file.
+'''
+
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+import json_backend
+from batch_transformer import collect_config_paths, migrate_file, output_paths_for, skipped_result, split_app_configs
+from main_transformer import AppConfigProcessor
+from metrics import MetricsCollector
+
+PIPELINE_STAGES = ("read", "transform", "write")
+_DONE = None # end-of-input marker passed down the queues
+
+
+# ---------- Stages ----------
+def transform_config(input_path: Path, data: bytes) -> Dict[str, Any]:
+    '''
+    This function parses and transforms one app-config whose bytes were read by the pipeline, and serializes the output
+    exactly like json_backend.dump_file(). It may run in a worker process, so it takes and returns only picklable values.
+
+    Returns:
+        Dict[str, Any]: "text" (the output, None on failure), "success", "error", "log" and "metrics", as in batch_transformer.migrate_file().
+    '''
+    metrics = MetricsCollector()
+    result = {"text": None, "success": False, "error": None}
+    # quiet: the progress messages are returned under "log" instead of printed, as transforms run in threads and processes
+    processor = AppConfigProcessor(input_path, streaming=True, metrics=metrics, quiet=True) # nothing is loaded; the pipeline read the file
+    try:
+        with metrics.stage("load"):
+            processor.config_data = json_backend.loads(data)
+        output = processor.process()
+        with metrics.stage("dump"):
+            result["text"] = json_backend.dumps(output, indent=2)
+        result["success"] = True
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["log"] = "".join(message + "\n" for message in processor.messages)
+    result["metrics"] = metrics.to_dict()
+    return result
+
+
+def _write_text(output_path: Path, text: str) -> None:
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+async def _timed(result: Dict[str, Any], stage: str, call: Any) -> Any:
+    # Awaits call, adding its wall-clock time to result["stages"][stage]
+    start = time.perf_counter()
+    try:
+        return await call
+    finally:
+        result["stages"][stage] = time.perf_counter() - start
+
+
+async def _read_stage(jobs: List[Tuple[Path, Path]], results: List[Dict[str, Any]], loaded: asyncio.Queue, transformers: int) -> None:
+    loop = asyncio.get_running_loop()
+    for position, (input_path, _) in enumerate(jobs):
+        try:
+            data = await _timed(results[position], "read", loop.run_in_executor(None, input_path.read_bytes))
+        except OSError as e:
+            results[position]["error"] = f"{type(e).__name__}: {e}"
+            continue
+        await loaded.put((position, data)) # waits while queue_size files are read ahead
+    for _ in range(transformers):
+        await loaded.put(_DONE)
+
+
+async def _transform_stage(jobs: List[Tuple[Path, Path]], results: List[Dict[str, Any]], loaded: asyncio.Queue,
+                           transformed: asyncio.Queue, executor: Executor) -> None:
+    loop = asyncio.get_running_loop()
+    while (item := await loaded.get()) is not _DONE:
+        position, data = item
+        result = results[position]
+        outcome = await _timed(result, "transform", loop.run_in_executor(executor, transform_config, jobs[position][0], data))
+        del data
+        text = outcome.pop("text")
+        result.update(outcome)
+        if text is not None:
+            await transformed.put((position, text)) # waits while queue_size outputs are waiting to be written
+    await transformed.put(_DONE)
+
+
+async def _write_stage(jobs: List[Tuple[Path, Path]], results: List[Dict[str, Any]], transformed: asyncio.Queue, transformers: int) -> None:
+    loop = asyncio.get_running_loop()
+    while transformers:
+        item = await transformed.get()
+        if item is _DONE:
+            transformers -= 1
+            continue
+        position, text = item
+        result = results[position]
+        try:
+            await _timed(result, "write", loop.run_in_executor(None, _write_text, jobs[position][1], text))
+        except OSError as e:
+            result["success"] = False
+            result["error"] = f"{type(e).__name__}: {e}"
+
+
+# ---------- Pipeline ----------
+async def migrate_pipelined_async(source: str, output_dir: Optional[str] = None, workers: int = 1, queue_size: int = 2) -> List[Dict[str, Any]]:
+    '''
+    This function migrates every app-config matched by source (a directory or a glob) through the read -> transform -> write pipeline.
+
+    Args:
+        source (str): Directory or glob pattern of app-config files.
+        output_dir (str, optional): Where to write the outputs, named OUTPUT_PREFIX + file name. Defaults to batch_transformer.default_output_dir() of each input.
+        workers (int): Files transformed at the same time; more than one needs worker processes.
+        queue_size (int): Files each queue holds between two stages before the stage in front of it waits.
+
+    Returns:
+        List[Dict[str, Any]]: One result per file, in input order, with "input", "output", "success", "skipped", "error", "log",
+        "metrics" and "stages" (seconds spent in each of PIPELINE_STAGES). Files that are not app-configs have "skipped": True and are not written.
+    '''
+    candidates = collect_config_paths(source)
+    input_paths, skipped = split_app_configs(candidates)
+    jobs = list(zip(input_paths, output_paths_for(input_paths, output_dir))) if input_paths else []
+    results = [
+        {"input": str(input_path), "output": str(output_path), "success": False, "skipped": False, "error": None, "log": "", "metrics": {}, "stages": {}}
+        for input_path, output_path in jobs
+    ]
+    by_path = {path: dict(skipped_result(path), stages={}) for path in skipped}
+    by_path.update(zip(input_paths, results))
+    if not jobs:
+        return [by_path[path] for path in candidates]
+
+    loaded = asyncio.Queue(maxsize=queue_size)
+    transformed = asyncio.Queue(maxsize=queue_size)
+    workers = min(workers, len(jobs))
+    # One worker transforms in a thread, which is enough to overlap with the I/O threads, as reads and writes release the GIL.
+    # More workers need processes to transform in parallel, at the cost of sending each file and output between processes.
+    executor_class = ThreadPoolExecutor if workers == 1 else ProcessPoolExecutor
+    with executor_class(max_workers=workers) as executor:
+        await asyncio.gather(
+            _read_stage(jobs, results, loaded, workers),
+            *(_transform_stage(jobs, results, loaded, transformed, executor) for _ in range(workers)),
+            _write_stage(jobs, results, transformed, workers),
+        )
+    return [by_path[path] for path in candidates]
+
+
+def migrate_pipelined(source: str, output_dir: Optional[str] = None, workers: int = 1, queue_size: int = 2) -> List[Dict[str, Any]]:
+    # Synchronous entry point of migrate_pipelined_async(), for scripts without an event loop
+    return asyncio.run(migrate_pipelined_async(source, output_dir, workers, queue_size))
+
+
+def stage_totals(results: List[Dict[str, Any]]) -> Dict[str, float]:
+    # Seconds spent in each stage over all files; a run is fully overlapped when its wall-clock time is close to the largest total
+    return {stage: sum(result["stages"].get(stage, 0.0) for result in results) for stage in PIPELINE_STAGES}
+
+
+# ---------- Example Usage ----------
+'''
+This code migrates a folder of app-config.json files through the pipeline, then once more file by file with batch_transformer.migrate_file(),
+and compares the wall-clock times with the time spent in each stage.
+'''
+if __name__ == "__main__":
+
+    ############## PARAMETERS & VARIABLES #####################
+
+    current_dir = Path(__file__).resolve().parent
+
+    input_source = current_dir.parent / "01_Data/app-config/RBTP/untp-playground-test-v2&3"
+    output_folder_name = None # None writes to a "transformed-<folder>" folder next to the input folder
+    workers = 1 # transforming worker processes
+    queue_size = 2
+    compare_sequential = True # runs batch_transformer.migrate_file() over the same inputs, writing to a "sequential" folder in the output folder
+
+    ###########################################################
+
+    start = time.perf_counter()
+    results = migrate_pipelined(str(input_source), output_folder_name, workers, queue_size)
+    pipelined_seconds = time.perf_counter() - start
+    for result in results:
+        status = "OK" if result["success"] else f"SKIPPED ({result['error']})" if result["skipped"] else f"FAILED ({result['error']})"
+        print(f"{Path(result['input']).name}: {status}")
+
+    totals = stage_totals(results)
+    print(f"Pipelined: {pipelined_seconds:.2f} s wall clock; " + ", ".join(f"{stage} {seconds:.2f} s" for stage, seconds in totals.items()))
+    if compare_sequential:
+        # A separate folder, so the sequential run neither overwrites nor reuses the pipelined outputs
+        jobs = [(Path(result["input"]), Path(result["output"]).parent / "sequential" / Path(result["output"]).name) for result in results if not result["skipped"]]
+        start = time.perf_counter()
+        for input_path, output_path in jobs:
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            migrate_file(input_path, output_path)
+        print(f"Sequential: {time.perf_counter() - start:.2f} s wall clock")
+
+    succeeded = sum(result["success"] for result in results)
+    skipped = sum(result["skipped"] for result in results)
+    print(f"Pipelined transformation complete! {succeeded}/{len(results) - skipped} app-configs migrated, {skipped} other files skipped.")
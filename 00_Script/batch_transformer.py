@@ -0,0 +1,152 @@
+'''
+This code migrates many app-config.json files in one run by fanning AppConfigProcessor.process() out over a process pool.
+Each file is loaded, transformed and written by its own worker, so the results are the same as running main_transformer.py on the files one by one.
+Only documents with a top-level "apps" list are migrated; other JSON files in the folder (e.g. the per-GTIN credentials downloaded
+from the playground) are reported as skipped. Outputs go to a separate folder, so the input folders are never written to.
+'''
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from glob import glob
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+from main_transformer import AppConfigProcessor
+from metrics import MetricsCollector
+from stream_io import JsonStreamReader
+
+OUTPUT_PREFIX = "transformed-"
+
+
+def collect_config_paths(source: str) -> List[Path]:
+    '''
+    This function resolves a directory or a glob pattern to the list of app-config files to migrate.
+    A directory selects every *.json file in it, skipping previous outputs (files starting with OUTPUT_PREFIX).
+    '''
+    source_path = Path(source)
+    if source_path.is_dir():
+        paths = [p for p in source_path.glob("*.json") if not p.name.startswith(OUTPUT_PREFIX)]
+    else:
+        paths = [Path(p) for p in glob(str(source))]
+    return sorted(paths)
+
+
+def is_app_config(path: Path) -> bool:
+    '''
+    This function tells whether a JSON file is an app-config, i.e. an object with a top-level "apps" list.
+    The file is read only up to the "apps" key, so large configs are not parsed twice. Unreadable or invalid files are not app-configs.
+    '''
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            reader = JsonStreamReader(f)
+            if reader.peek() != "{":
+                return False
+            for key in reader.iter_object():
+                if key == "apps":
+                    return reader.peek() == "["
+                reader.read_value()
+    except (OSError, ValueError):
+        return False
+    return False
+
+
+def split_app_configs(paths: List[Path]) -> Tuple[List[Path], List[Path]]:
+    # (app-configs, other files) of paths, each in the order given
+    configs, skipped = [], []
+    for path in paths:
+        (configs if is_app_config(path) else skipped).append(path)
+    return configs, skipped
+
+
+def skipped_result(input_path: Path) -> Dict[str, Any]:
+    # The result reported for a file that is not an app-config; nothing is written for it
+    return {"input": str(input_path), "output": None, "success": False, "skipped": True,
+            "error": "Not an app-config (no top-level \"apps\" list)", "log": "", "metrics": {}}
+
+
+def default_output_dir(input_path: Path) -> Path:
+    # transformed-<input folder> next to the input folder, e.g. RBTP/transformed-untp-playground-test-v2&3
+    return input_path.parent.parent / f"{OUTPUT_PREFIX}{input_path.parent.name}"
+
+
+def output_paths_for(input_paths: List[Path], output_dir: Optional[str] = None) -> List[Path]:
+    # OUTPUT_PREFIX + file name, in output_dir or in default_output_dir() of each input (created if needed), never in the input folder
+    output_paths = [(Path(output_dir) if output_dir else default_output_dir(input_path)) / f"{OUTPUT_PREFIX}{input_path.name}" for input_path in input_paths]
+    for folder in {output_path.parent for output_path in output_paths}:
+        folder.mkdir(parents=True, exist_ok=True)
+    return output_paths
+
+
+def migrate_file(input_path: Path, output_path: Path) -> Dict[str, Any]:
+    '''
+    This function migrates a single app-config file and reports the outcome instead of raising, so one bad file does not stop the batch.
+    The progress messages of AppConfigProcessor are returned with the result under "log", as worker output would otherwise interleave.
+    The stage timings and counters of the file (see metrics.py) are returned under "metrics".
+    '''
+    metrics = MetricsCollector()
+    result = {"input": str(input_path), "output": str(output_path), "success": False, "skipped": False, "error": None}
+    processor = AppConfigProcessor(input_path, streaming=True, metrics=metrics, quiet=True) # loaded below, so load errors are reported too
+    try:
+        processor.config_data = processor.load_config()
+        output = processor.process()
+        processor.write_output(output, output_path) # recorded as the "dump" stage
+        result["success"] = True
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["log"] = "".join(message + "\n" for message in processor.messages)
+    result["metrics"] = metrics.to_dict()
+    return result
+
+
+def migrate_batch(source: str, output_dir: Optional[str] = None, max_workers: Optional[int] = None) -> List[Dict[str, Any]]:
+    '''
+    This function migrates every app-config matched by source (a directory or a glob) over a ProcessPoolExecutor.
+
+    Args:
+        source (str): Directory or glob pattern of app-config files.
+        output_dir (str, optional): Where to write the outputs, named OUTPUT_PREFIX + file name. Defaults to default_output_dir() of each input.
+        max_workers (int, optional): Upper bound on worker processes. Defaults to the number of CPUs, and is never more than the number of files.
+
+    Returns:
+        List[Dict[str, Any]]: One result per file, in input order, with "input", "output", "success", "skipped", "error", "log" and "metrics".
+        Files that are not app-configs have "skipped": True and are not written.
+    '''
+    candidates = collect_config_paths(source)
+    input_paths, skipped = split_app_configs(candidates)
+    results = {path: skipped_result(path) for path in skipped}
+    if input_paths:
+        output_paths = output_paths_for(input_paths, output_dir)
+        workers = min(max_workers or os.cpu_count() or 1, len(input_paths))
+        if workers == 1: # no pool needed, avoids the process start-up cost for a single file
+            migrated = [migrate_file(i, o) for i, o in zip(input_paths, output_paths)]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                migrated = list(executor.map(migrate_file, input_paths, output_paths))
+        results.update(zip(input_paths, migrated))
+    return [results[path] for path in candidates]
+
+
+# ---------- Example Usage ----------
+'''
+This code takes a folder (or glob) of app-config.json files and writes a transformed copy of each one.
+'''
+if __name__ == "__main__":
+
+    ############## PARAMETERS & VARIABLES #####################
+
+    current_dir = Path(__file__).resolve().parent
+
+    input_source = current_dir.parent / "01_Data/app-config/RBTP/untp-playground-test-v2&3"
+    output_folder_name = None # None writes to transformed-<input folder> next to the input folder
+    max_workers = None # None uses one worker per CPU
+
+    ###########################################################
+
+    results = migrate_batch(str(input_source), output_folder_name, max_workers)
+    for result in results:
+        status = "OK" if result["success"] else f"SKIPPED ({result['error']})" if result["skipped"] else f"FAILED ({result['error']})"
+        print(f"{Path(result['input']).name}: {status}")
+
+    succeeded = sum(result["success"] for result in results)
+    skipped = sum(result["skipped"] for result in results)
+    print(f"Batch transformation complete! {succeeded}/{len(results) - skipped} app-configs migrated, {skipped} other files skipped.")
@@ -0,0 +1,371 @@
+'''
+Benchmark suite for the migration pipeline.
+Runs the pipeline stages over the 0.5.0 inputs in CORPUS_PATHS and over synthetic copies with 10x, 100x and 1000x the features,
+and records the time and peak memory of each stage:
+- load:               AppConfigProcessor(path), i.e. reading and parsing the app-config
+- process:            AppConfigProcessor.process()
+- process_parallel:   AppConfigProcessor.process(max_workers=PARALLEL_WORKERS), the features transformed over a process pool
+- dfr_transform:      DFRTransformer.transform() on every DFR EntryData component
+- dfr_multipass:      the same with benchmarks/dfr_multipass.py, the step-by-step reference of the single-pass transform()
+- transform_services: DFRTransformer.transform_services() on every "process..." service of the DFR features
+- dump:               writing the transformed config with json_backend
+Scales from STREAMING_SCALE upwards do not fit in memory as one tree, so they are measured end to end with process_streaming() instead.
+
+tracemalloc only sees Python allocations, so compare_peak_rss() also runs the whole load -> process -> dump pipeline once per loader
+in a fresh interpreter and reports its peak resident set size, which includes the parser's own buffers and memory-mapped pages:
+- read:          the file read into memory as one copy and the output dumped as one string (the loader before memory-mapped loading)
+- mmap:          the file parsed from a memory map (json_backend.load_file(use_mmap=True), without orjson from LOW_MEMORY_SIZE on),
+                 the output still dumped as one string
+- mmap_streamed: the file parsed from a memory map and the output written feature by feature (AppConfigProcessor.write_output)
+
+The results are saved as a baseline JSON; later runs are compared with it and slower or bigger stages are reported as regressions.
+Stages or inputs missing from the baseline are reported as gaps, as they were not compared; regenerate the baseline after adding one.
+'''
+
+import contextlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Any, List, Callable, Optional, Tuple
+
+try:
+    import resource
+except ImportError: # not available on Windows; peak RSS is then not measured
+    resource = None
+
+import json_backend
+from main_transformer import AppConfigProcessor
+from stream_io import JsonStreamWriter
+from transformer_registry import TransformerRegistry
+from benchmarks.dfr_multipass import transform_multipass
+
+SCALES = [1, 10, 100, 1000]
+STREAMING_SCALE = 1000 # from this scale on, only the streaming pipeline is measured
+PARALLEL_WORKERS = 4 # capped at os.cpu_count() by process(); peak memory of the process_parallel stage only covers the main process
+# Inputs that still need migrating (0.5.0), relative to the repo root; the other app-configs under 01_Data are 0.6.0 already,
+# so process() would find nothing to transform in them. A single feature (spotcheck-0.5.json) is benchmarked as a one-feature app-config.
+CORPUS_PATHS = ("01_Data/app-config/RegenFarmers/app-config.json", "01_Data/app-config/RBTP/spotcheck-0.5.json")
+RSS_SCALE = 200 # about 250 MB from the RegenFarmers config
+# loader -> (parse from a memory map, write the output feature by feature)
+RSS_LOADERS: Dict[str, Tuple[bool, bool]] = {"read": (False, False), "mmap": (True, False), "mmap_streamed": (True, True)}
+
+
+# ---------- Corpus ----------
+def collect_corpus(root: Path) -> List[Path]:
+    # The CORPUS_PATHS that exist under root
+    return [root / path for path in CORPUS_PATHS if (root / path).exists()]
+
+
+def corpus_name(config_path: Path, root: Path) -> str:
+    # RegenFarmers/app-config.json -> "RegenFarmers", RBTP/spotcheck-0.5.json -> "RBTP/spotcheck-0.5"
+    path = config_path.relative_to(root / "01_Data/app-config")
+    return (path.parent if path.name == "app-config.json" else path.with_suffix("")).as_posix()
+
+
+def load_config(input_path: Path) -> Dict[str, Any]:
+    # An app-config, or a single feature wrapped in one
+    config = json_backend.load_file(input_path)
+    return config if "apps" in config else {"apps": [{"features": [config]}]}
+
+
+def write_scaled_config(input_path: Path, output_path: Path, scale: int) -> None:
+    '''
+    This function writes a synthetic app-config with every app's features repeated scale times (a single feature is wrapped first).
+    The output is written with JsonStreamWriter, so even the largest scales are never built in memory.
+    '''
+    config = load_config(input_path)
+    with open(output_path, "w") as f:
+        writer = JsonStreamWriter(f)
+        writer.begin_object()
+        for key, value in config.items():
+            writer.key(key)
+            if key != "apps" or not isinstance(value, list):
+                writer.value(value)
+                continue
+            writer.begin_array()
+            for app in value:
+                writer.begin_object()
+                for app_key, app_value in app.items():
+                    writer.key(app_key)
+                    if app_key != "features" or not isinstance(app_value, list):
+                        writer.value(app_value)
+                        continue
+                    writer.begin_array()
+                    for _ in range(scale):
+                        for feature in app_value:
+                            writer.value(feature)
+                    writer.end_array()
+                writer.end_object()
+            writer.end_array()
+        writer.end_object()
+
+
+def _dfr_parts(config: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    # DFR EntryData components and the "process..." services of the features that have one
+    components, services = [], []
+    for app in config.get("apps", []):
+        for feature in app.get("features", []):
+            dfr_components = []
+            for component in feature.get("components", []):
+                if component.get("type") != "EntryData":
+                    continue
+                props = component.get("props", {})
+                if component.get("name") == "LocalStorageLoader":
+                    nested = props.get("nestedComponents", [])
+                    props = nested[0].get("props", {}) if len(nested) == 1 else {}
+                if "DigitalFacilityRecord" in props.get("schema", {}).get("url", ""):
+                    dfr_components.append(component)
+            if dfr_components:
+                components += dfr_components
+                services += [service for service in feature.get("services", []) if service["name"].startswith("process")]
+    return components, services
+
+
+# ---------- Measurement ----------
+def _measure(stage: Callable[[], Any], trace: bool) -> Tuple[Any, float, int]:
+    '''
+    Runs one stage and returns (result, seconds, peak bytes allocated above the memory in use when the stage started).
+    The peak is only measured when trace is True, as tracemalloc slows the stage down.
+    '''
+    if trace:
+        tracemalloc.reset_peak()
+        start_memory = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    result = stage()
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] - start_memory if trace else 0
+    return result, seconds, peak
+
+
+def _run_stages(config_path: Path, output_path: Path, trace: bool) -> Dict[str, Tuple[float, int]]:
+    # One run of the in-memory pipeline; every stage gets freshly loaded input, as process() and the transformers work in place
+    stages = {}
+    processor, *stages["load"] = _measure(lambda: AppConfigProcessor(config_path), trace)
+    output, *stages["process"] = _measure(processor.process, trace)
+    _, *stages["dump"] = _measure(lambda: json_backend.dump_file(output, output_path, indent=2), trace)
+    del processor, output
+    processor = AppConfigProcessor(config_path)
+    _, *stages["process_parallel"] = _measure(lambda: processor.process(max_workers=PARALLEL_WORKERS), trace)
+    del processor
+
+    components, services = _dfr_parts(load_config(config_path))
+    transformer = TransformerRegistry.get("DFR")
+    _, *stages["dfr_transform"] = _measure(lambda: [transformer.transform(component) for component in components], trace)
+    components, _ = _dfr_parts(load_config(config_path))
+    _, *stages["dfr_multipass"] = _measure(lambda: [transform_multipass(transformer, component) for component in components], trace)
+    _, *stages["transform_services"] = _measure(lambda: [transformer.transform_services(service) for service in services], trace)
+    return stages
+
+
+def _run_streaming(config_path: Path, output_path: Path, trace: bool) -> Dict[str, Tuple[float, int]]:
+    processor = AppConfigProcessor(config_path, streaming=True)
+    _, *result = _measure(lambda: processor.process_streaming(output_path), trace)
+    return {"process_streaming": result}
+
+
+def benchmark_config(config_path: Path, scale: int, work_dir: Path, repeats: int = 3) -> Dict[str, Dict[str, float]]:
+    '''
+    This function benchmarks one app-config at one scale.
+    Times are the best of repeats untraced runs; peak memory comes from one extra run under tracemalloc.
+
+    Returns:
+        Dict[str, Dict[str, float]]: stage -> {"seconds": ..., "peak_mb": ...}
+    '''
+    output_path = work_dir / f"output-{config_path.name}"
+    temp_paths = [output_path]
+    if scale > 1 or "apps" not in json_backend.load_file(config_path): # a single feature is benchmarked as a one-feature app-config
+        scaled_path = work_dir / f"scaled-{scale}x-{config_path.name}"
+        write_scaled_config(config_path, scaled_path, scale)
+        config_path = scaled_path
+        temp_paths.append(scaled_path)
+    run = _run_streaming if scale >= STREAMING_SCALE else _run_stages
+    if scale >= STREAMING_SCALE:
+        repeats = 1 # a single run already takes long enough to be stable
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull): # the pipeline prints per component
+        timings = [run(config_path, output_path, trace=False) for _ in range(repeats)]
+        tracemalloc.start()
+        try:
+            memory = run(config_path, output_path, trace=True)
+        finally:
+            tracemalloc.stop()
+
+    for path in temp_paths:
+        path.unlink(missing_ok=True) # scaled inputs and outputs can be gigabytes
+    return {
+        stage: {
+            "seconds": round(min(timing[stage][0] for timing in timings), 6),
+            "peak_mb": round(memory[stage][1] / 1e6, 3),
+        }
+        for stage in memory
+    }
+
+
+def run_benchmarks(root: Path, scales: List[int] = SCALES, repeats: int = 3) -> Dict[str, Any]:
+    '''
+    This function runs the benchmark over every input of the corpus at every scale.
+
+    Returns:
+        Dict[str, Any]: The environment the benchmark ran in and, per "<config> x<scale>", the results of benchmark_config().
+    '''
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "json_backend": json_backend.get_backend(),
+        "cpu_count": os.cpu_count(), # process_parallel falls back to the serial loop on a single CPU
+        "results": {},
+    }
+    with tempfile.TemporaryDirectory() as work_dir:
+        for config_path in collect_corpus(root):
+            for scale in scales:
+                key = f"{corpus_name(config_path, root)} x{scale}"
+                print(f"Benchmarking {key}...")
+                report["results"][key] = benchmark_config(config_path, scale, Path(work_dir), repeats)
+    return report
+
+
+# ---------- Peak RSS ----------
+def run_loader(loader: str, config_path: Any, output_path: Any) -> None:
+    '''
+    This function runs the pipeline once with one of RSS_LOADERS and prints "<peak RSS in bytes> <seconds>" as the last line.
+    It is meant to run alone in a fresh interpreter (see compare_peak_rss()), as the peak RSS of a process never goes down.
+    '''
+    use_mmap, streamed = RSS_LOADERS[loader]
+    start = time.perf_counter()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        processor = AppConfigProcessor(config_path, streaming=True) # loaded below, with the loader under test
+        processor.config_data = json_backend.load_file(config_path, use_mmap=use_mmap)
+        output = processor.process()
+        if streamed:
+            processor.write_output(output, output_path)
+        else:
+            json_backend.dump_file(output, output_path, indent=2)
+    seconds = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(peak if sys.platform == "darwin" else peak * 1024, seconds) # bytes on macOS, kilobytes on Linux
+
+
+def compare_peak_rss(config_path: Path, work_dir: Path, scale: int = RSS_SCALE) -> Optional[Dict[str, Dict[str, float]]]:
+    '''
+    This function measures the peak RSS and time of each of RSS_LOADERS on a synthetic copy of config_path with scale x the features.
+    Each loader runs in its own interpreter; the peaks include the interpreter and the imported scripts (the same for every loader).
+
+    Returns:
+        Optional[Dict[str, Dict[str, float]]]: loader -> {"seconds": ..., "peak_rss_mb": ...}, or None where the resource module is missing.
+    '''
+    if resource is None:
+        return None
+    scaled_path = work_dir / f"scaled-{scale}x-{config_path.name}"
+    output_path = work_dir / f"output-{config_path.name}"
+    write_scaled_config(config_path, scaled_path, scale)
+    results = {}
+    try:
+        for loader in RSS_LOADERS:
+            code = f"import benchmark; benchmark.run_loader({loader!r}, {str(scaled_path)!r}, {str(output_path)!r})"
+            completed = subprocess.run([sys.executable, "-c", code], cwd=Path(__file__).resolve().parent,
+                                       capture_output=True, text=True, check=True)
+            peak, seconds = completed.stdout.split()[-2:]
+            results[loader] = {"seconds": round(float(seconds), 3), "peak_rss_mb": round(int(peak) / 1e6, 1)}
+    finally:
+        scaled_path.unlink(missing_ok=True)
+        output_path.unlink(missing_ok=True)
+    return results
+
+
+# ---------- Baseline ----------
+def save_baseline(report: Dict[str, Any], path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+
+
+def compare_to_baseline(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.25, min_seconds: float = 0.005) -> List[str]:
+    '''
+    This function compares a benchmark report with a saved baseline.
+    A stage is a regression when its time or peak memory grew by more than tolerance (0.25 = 25%).
+    Stages faster than min_seconds in the baseline are only checked for memory, as their timings are mostly noise.
+
+    Returns:
+        List[str]: One line per regression; empty if none. Stages missing from the baseline are not compared (see baseline_gaps()).
+    '''
+    regressions = []
+    for key, stages in report["results"].items():
+        for stage, result in stages.items():
+            before = baseline.get("results", {}).get(key, {}).get(stage)
+            if not before:
+                continue
+            if before["seconds"] >= min_seconds and result["seconds"] > before["seconds"] * (1 + tolerance):
+                regressions.append(f"{key} {stage}: {before['seconds']:.4f}s -> {result['seconds']:.4f}s")
+            if before["peak_mb"] > 0 and result["peak_mb"] > before["peak_mb"] * (1 + tolerance):
+                regressions.append(f"{key} {stage}: {before['peak_mb']:.2f} MB -> {result['peak_mb']:.2f} MB")
+    return regressions
+
+
+def baseline_gaps(report: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    # "<config> x<scale> <stage>" of every measured stage the baseline has no result for, so nothing was compared
+    return [
+        f"{key} {stage}"
+        for key, stages in report["results"].items()
+        for stage in stages
+        if stage not in baseline.get("results", {}).get(key, {})
+    ]
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    for key, stages in report["results"].items():
+        print(key)
+        for stage, result in stages.items():
+            print(f"  {stage:<18} {result['seconds'] * 1000:10.2f} ms {result['peak_mb']:10.2f} MB")
+
+
+# ---------- Example Usage ----------
+'''
+This code benchmarks the pipeline over the 01_Data corpus and compares the results with the saved baseline.
+Set update_baseline = True to replace the baseline, e.g. after an intended performance change.
+'''
+if __name__ == "__main__":
+
+    ############## PARAMETERS & VARIABLES #####################
+
+    current_dir = Path(__file__).resolve().parent
+
+    baseline_path = current_dir / "benchmarks" / "baseline.json"
+    scales = SCALES # e.g. [1, 10] for a quick run
+    repeats = 3
+    update_baseline = False
+    rss_scale = RSS_SCALE # None to skip the peak RSS comparison of the loaders
+
+    ###########################################################
+
+    report = run_benchmarks(current_dir.parent, scales, repeats)
+    print_report(report)
+
+    if rss_scale:
+        rss_config = collect_corpus(current_dir.parent)[0]
+        with tempfile.TemporaryDirectory() as work_dir:
+            peaks = compare_peak_rss(rss_config, Path(work_dir), rss_scale)
+        for loader, result in (peaks or {}).items():
+            print(f"peak RSS x{rss_scale} {loader:<14} {result['seconds']:8.2f} s {result['peak_rss_mb']:10.1f} MB")
+
+    if update_baseline or not baseline_path.exists():
+        save_baseline(report, baseline_path)
+        print(f"Baseline saved to {baseline_path}")
+    else:
+        with open(baseline_path, "r") as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(report, baseline)
+        gaps = baseline_gaps(report, baseline)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        for gap in gaps:
+            print(f"NOT IN BASELINE {gap}")
+        print(f"Benchmark complete! {len(regressions)} regression(s) against {baseline_path.name}, {len(gaps)} stage(s) not in it"
+              + (" (set update_baseline = True to add them)." if gaps else "."))
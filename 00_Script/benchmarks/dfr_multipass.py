@@ -0,0 +1,69 @@
+'''
+The step-by-step DFR component transform that DFRTransformer.transform() replaced: builds the nested 0.6.0 credentialSubject, cleans it
+and flattens it back into "props" -> "data".
+Kept outside the transformer as the reference transform() is compared against, for its output (tests/test_dfr_transform.py)
+and its speed (the dfr_multipass stage of benchmark.py).
+'''
+
+from typing import Dict, Any
+
+from dfr import DFRTransformer
+from rule_engine import RuleRegistry
+
+
+def transform_multipass(transformer: DFRTransformer, component: Dict[str, Any]) -> Dict[str, Any]:
+    '''
+    This function transforms one DFR EntryData component in place, one step after the other, with the helpers of transformer.
+
+    Returns:
+        Dict[str, Any]: The transformed component.
+    '''
+    data = component["props"]["data"]
+
+    # 2. Credential Subject Structure: adds "type": ["FacilityRecord"] to the original structure
+    credential_subject = data.get("credentialSubject", {})
+    facility = {k: v for k, v in credential_subject.items() if k != "conformityClaim"}
+    new_credential_subject = {
+        "type": ["FacilityRecord"],
+        "facility": facility,
+        "conformityClaim": credential_subject.get("conformityClaim", [])
+    }
+    data["credentialSubject"] = new_credential_subject
+
+    # 3. Issuer Identifier Structure: updates "otherIdentifier" to "facilityAlsoKnownAs"
+    issuer = data.get('issuer', {})
+    if "otherIdentifier" in issuer:
+        transformer._pop_and_replace_key(issuer, "otherIdentifier", "facilityAlsoKnownAs")
+
+    # 4. Facility Structure:
+    facility_new = new_credential_subject.get('facility', {})
+    if "otherIdentifier" in facility_new:
+        clean_data = transformer._pop_and_replace_key(facility_new, "otherIdentifier", "facilityAlsoKnownAs") # renames "otherIdentifier" to "facilityAlsoKnownAs" and retains the position
+        clean_data = transformer._clean_identifier_list(clean_data, ["type", "idScheme"]) # removes "type" and "idScheme" from clean_data
+        facility_new["facilityAlsoKnownAs"] = clean_data
+
+    operated_by_party = facility_new.get('operatedByParty', {})
+    clean_data2 = transformer._clean_identifier_list(operated_by_party, ["type", "idScheme"])  # removes "type" and "idScheme" from operated_by_party
+    facility_new["operatedByParty"] = clean_data2
+
+    # Conformity Claim Updates (see DFR_RULES)
+    RuleRegistry.apply("DFR", new_credential_subject)
+
+    # UNTP Schema Validation: if facilityAlsoKnownAs doesn't contain any values, for example facilityAlsoKnownAs = [{}], then change it to []
+    if "facilityAlsoKnownAs" in facility_new and (not facility_new["facilityAlsoKnownAs"] or all(not v for v in facility_new["facilityAlsoKnownAs"])):
+        facility_new["facilityAlsoKnownAs"] = []
+    # UNTP JSON-LD configuration: if facilityAlsoKnownAs not in facility, then add the field "facilityAlsoKnownAs": []
+    if "facilityAlsoKnownAs" not in facility_new:
+        facility_new["facilityAlsoKnownAs"] = []
+
+    # Reference Implementation Updates
+    # 1. Updates Schema URL to v0.6.0
+    schema = component["props"]["schema"]
+    schema["url"] = "https://jargon.sh/user/unece/DigitalFacilityRecord/v/0.6.0/artefacts/jsonSchemas/FacilityRecord.json?class=FacilityRecord"
+
+    # Flatten credentialSubject and clean top-level data
+    component_data = component["props"]["data"]
+    transformer._clean_identifier_list(component_data, ['type', '@context', 'issuer'])
+    transformer._flatten_credential_subject(component_data, 'credentialSubject')
+
+    return component
@@ -0,0 +1,221 @@
+'''
+Structural diff between an input app-config and its migrated output, written next to the output as <output>.diff.json:
+
+    {"summary": {"add": 12, "remove": 40, "replace": 31, "features": 30},
+     "changes": [{"op": "replace", "path": "/apps/0/features/3/components/0/props/schema/url", "feature": "Issue DFR",
+                  "before": "https://jargon.sh/.../v/0.5.0/...", "value": "https://jargon.sh/.../v/0.6.0/..."}, ...]}
+
+Ops follow JSON Patch naming: "add" and "replace" carry the new "value", "remove" and "replace" the old one as "before".
+Paths are JSON pointers into the output, except for "remove", which points into the input.
+Features are aligned by "id" (or "name") and components by "name" and "type", so an inserted or reordered feature is reported as
+one add instead of a change to every feature after it. Other lists of objects are aligned by "id" when all items have one, and
+remaining lists by content: equal items are matched first and only the rest are compared by position.
+The order of object keys and of aligned items is not compared: a reordering alone is no change.
+
+Identical subtrees are skipped without being walked: shared objects (the output of AppConfigProcessor.process_copy_on_write() shares
+every untouched subtree with its input) by identity, others by one C-level == comparison. Like json.loads, == treats 1, 1.0 and true as equal.
+'''
+
+from pathlib import Path
+from typing import Dict, Any, Callable, Hashable, List, Optional
+
+import json_backend
+
+DIFF_SUFFIX = ".diff.json"
+# list key -> item fields that identify an item across the input and the output; the first field present is used
+ALIGN_KEYS = {"features": (("id",), ("name",)), "components": (("name", "type"),)}
+
+Change = Dict[str, Any]
+
+
+def diff_path_for(output_path: Any) -> Path:
+    # transformed-app-config.json -> transformed-app-config.diff.json
+    output_path = Path(output_path)
+    return output_path.with_name(output_path.stem + DIFF_SUFFIX)
+
+
+def _pointer(path: List[Any]) -> str:
+    parts = [str(part) for part in path]
+    return "".join("/" + (part if "~" not in part and "/" not in part else part.replace("~", "~0").replace("/", "~1")) for part in parts)
+
+
+def _hashable(value: Any) -> Hashable:
+    # Names and ids are strings; other values are compared by their compact JSON
+    return value if value is None or isinstance(value, (str, int, float)) else json_backend.dumps_compact(value)
+
+
+# ---------- Diff ----------
+class _Differ:
+    def __init__(self):
+        self.changes: List[Change] = []
+        self.path: List[Any] = []
+        self.feature: Optional[str] = None # name of the feature being compared, added to its changes
+        self.feature_path = "" # its JSON pointer
+        self.changed_features = set() # JSON pointers of the features with changes
+
+    def emit(self, op: str, path: List[Any], before: Any = None, value: Any = None) -> None:
+        change = {"op": op, "path": _pointer(path)}
+        if self.feature is not None:
+            change["feature"] = self.feature
+            self.changed_features.add(self.feature_path)
+        if op != "add":
+            change["before"] = before
+        if op != "remove":
+            change["value"] = value
+        self.changes.append(change)
+
+    def diff(self, before: Any, after: Any) -> None:
+        if before is after:
+            return
+        if isinstance(before, dict) and isinstance(after, dict):
+            if before != after:
+                self._diff_dict(before, after)
+        elif isinstance(before, list) and isinstance(after, list):
+            if before != after:
+                self._diff_list(before, after)
+        elif type(before) is not type(after) or before != after:
+            self.emit("replace", self.path, before, after)
+
+    def _diff_dict(self, before: Dict[str, Any], after: Dict[str, Any]) -> None:
+        path = self.path
+        for key, value in before.items():
+            path.append(key)
+            if key in after:
+                self.diff(value, after[key])
+            else:
+                self.emit("remove", path, value)
+            path.pop()
+        for key, value in after.items():
+            if key not in before:
+                path.append(key)
+                self.emit("add", path, value=value)
+                path.pop()
+
+    def _diff_list(self, before: List[Any], after: List[Any]) -> None:
+        key_of = self._item_key(self.path[-1] if self.path else None, before, after)
+        if key_of is None:
+            self._diff_by_content(before, after)
+            return
+        positions = {}
+        for i, item in enumerate(before):
+            positions.setdefault(key_of(item), []).append(i)
+        matched = set()
+        for j, item in enumerate(after):
+            candidates = positions.get(key_of(item))
+            if candidates:
+                i = candidates.pop(0)
+                matched.add(i)
+                self._diff_item(j, before[i], item)
+            else:
+                self._diff_item(j, None, item, "add")
+        for i, item in enumerate(before):
+            if i not in matched:
+                self._diff_item(i, item, None, "remove")
+
+    def _diff_item(self, index: int, before: Any, after: Any, op: Optional[str] = None) -> None:
+        # Compares (or adds or removes) a list item; a feature labels the changes below it
+        path = self.path
+        path.append(index)
+        item = after if op != "remove" else before
+        is_feature = len(path) > 1 and path[-2] == "features" and self.feature is None and isinstance(item, dict)
+        if is_feature:
+            self.feature = item.get("name") or item.get("id")
+            self.feature_path = _pointer(path)
+        if op == "add":
+            self.emit(op, path, value=after)
+        elif op == "remove":
+            self.emit(op, path, before)
+        else:
+            self.diff(before, after)
+        if is_feature:
+            self.feature = None
+        path.pop()
+
+    def _diff_by_content(self, before: List[Any], after: List[Any]) -> None:
+        # Lists of the same length are compared by position. Otherwise equal items are matched first (by their compact JSON),
+        # so one inserted or removed item is reported once, and the remaining items are compared by position.
+        if len(before) == len(after):
+            for j, (old, new) in enumerate(zip(before, after)):
+                self._diff_item(j, old, new)
+            return
+        texts = {}
+        for i, item in enumerate(before):
+            texts.setdefault(json_backend.dumps_compact(item), []).append(i)
+        unmatched_after = []
+        matched = set()
+        for j, item in enumerate(after):
+            candidates = texts.get(json_backend.dumps_compact(item))
+            if candidates:
+                matched.add(candidates.pop(0))
+            else:
+                unmatched_after.append(j)
+        unmatched_before = [i for i in range(len(before)) if i not in matched]
+        for i, j in zip(unmatched_before, unmatched_after):
+            self._diff_item(j, before[i], after[j])
+        for j in unmatched_after[len(unmatched_before):]:
+            self._diff_item(j, None, after[j], "add")
+        for i in unmatched_before[len(unmatched_after):]:
+            self._diff_item(i, before[i], None, "remove")
+
+    @staticmethod
+    def _item_key(list_key: Any, before: List[Any], after: List[Any]) -> Optional[Callable[[Any], Hashable]]:
+        # The identity of the items of a list of objects, or None to align the list by content
+        if not all(isinstance(item, dict) for item in before) or not all(isinstance(item, dict) for item in after):
+            return None
+        for fields in ALIGN_KEYS.get(list_key, (("id",),)):
+            if all(fields[0] in item for item in before) and all(fields[0] in item for item in after):
+                return lambda item, fields=fields: tuple(_hashable(item.get(field)) for field in fields)
+        return None
+
+
+def diff_configs(before: Dict[str, Any], after: Dict[str, Any]) -> List[Change]:
+    '''
+    This function compares an input app-config with its migrated output.
+
+    Returns:
+        List[Change]: The changes in document order, as {"op", "path", "feature" (if inside a feature), "before" and/or "value"}.
+    '''
+    differ = _Differ()
+    differ.diff(before, after)
+    return differ.changes
+
+
+def diff_report(before: Dict[str, Any], after: Dict[str, Any]) -> Dict[str, Any]:
+    # The changes with a count per op and the number of changed features
+    differ = _Differ()
+    differ.diff(before, after)
+    summary = {"add": 0, "remove": 0, "replace": 0}
+    for change in differ.changes:
+        summary[change["op"]] += 1
+    summary["features"] = len(differ.changed_features)
+    return {"summary": summary, "changes": differ.changes}
+
+
+def write_diff(before: Dict[str, Any], after: Dict[str, Any], output_path: Any) -> Path:
+    '''
+    This function writes the diff report of a migration next to its output (<output>.diff.json) and returns its path.
+    '''
+    diff_path = diff_path_for(output_path)
+    json_backend.dump_file(diff_report(before, after), diff_path, indent=2)
+    return diff_path
+
+
+# ---------- Example Usage ----------
+'''
+This code diffs an app-config with a migrated output written earlier, e.g. by main_transformer.py, and prints the summary.
+'''
+if __name__ == "__main__":
+
+    ############## PARAMETERS & VARIABLES #####################
+
+    current_dir = Path(__file__).resolve().parent
+
+    input_path = current_dir.parent / "01_Data/app-config/RBTP" / "app-config.json"
+    output_path = current_dir.parent / "01_Data/app-config/RBTP" / "transformed-app-config-v5.json"
+
+    ###########################################################
+
+    diff_path = write_diff(json_backend.load_file(input_path), json_backend.load_file(output_path), output_path)
+    with open(diff_path, "r") as f:
+        print(json_backend.load(f)["summary"])
+    print(f"Diff written to {diff_path}")
@@ -0,0 +1,72 @@
+'''
+Structural sharing helpers for copy-on-write transformation.
+Instead of mutating the loaded config (process) or deep-copying it whole, only the paths a transformer writes to are copied;
+every other subtree is shared between the input and the output, so keeping both trees costs far less than 2x the memory.
+'''
+
+import copy
+from typing import Dict, Any, List, Sequence, Tuple
+
+Path = Tuple[str, ...]
+
+
+def copy_paths(node: Dict[str, Any], paths: Sequence[Path]) -> Dict[str, Any]:
+    '''
+    Returns a copy of node in which only the given paths are copied: dicts along each path are copied shallowly
+    and the value at the end of the path is deep-copied, so the transformer can mutate it freely. Everything else is shared.
+
+    Args:
+        node (Dict[str, Any]): The dict to copy, for example a component.
+        paths (Sequence[Path]): Key paths the transformer writes to, for example [("props", "data"), ("props", "schema")].
+
+    Returns:
+        Dict[str, Any]: The partially copied dict. node itself is not modified.
+    '''
+    new_node = node.copy() # keeps a lazily loaded node (lazy_json.LazyObject) lazy
+    fresh = {id(new_node)} # dicts created here, which can be modified without touching the input
+    for path in paths:
+        parent = new_node
+        for depth, key in enumerate(path):
+            child = parent.get(key)
+            if child is None:
+                break
+            if depth == len(path) - 1:
+                parent[key] = copy.deepcopy(child)
+                break
+            if not isinstance(child, dict):
+                break
+            if id(child) not in fresh:
+                child = child.copy()
+                parent[key] = child
+                fresh.add(id(child))
+            parent = child
+    return new_node
+
+
+def shared_subtrees(before: Any, after: Any) -> Tuple[int, int]:
+    '''
+    Counts the subtrees of after that are shared with before (same object) versus the containers that were copied,
+    to check how much sharing a transform kept.
+
+    Returns:
+        Tuple[int, int]: (shared subtrees, copied containers).
+    '''
+    before_ids = set()
+    stack: List[Any] = [before]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, (dict, list)):
+            before_ids.add(id(item))
+            stack.extend(item.values() if isinstance(item, dict) else item)
+
+    shared, copied = 0, 0
+    stack = [after]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, (dict, list)):
+            if id(item) in before_ids:
+                shared += 1 # a shared container's children are shared too, no need to descend
+                continue
+            copied += 1
+            stack.extend(item.values() if isinstance(item, dict) else item)
+    return shared, copied
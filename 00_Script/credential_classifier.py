@@ -0,0 +1,99 @@
+'''
+Credential-type classifier for app-config components.
+The schema URL of an EntryData component is a jargon.sh artefact URL, e.g.
+    https://jargon.sh/user/unece/DigitalFacilityRecord/v/0.5.0/artefacts/jsonSchemas/DigitalFacilityRecord.json?class=DigitalFacilityRecord
+classify_schema_url() parses it once into (credential type, version, class) with a precompiled pattern and caches the result per URL,
+so configs with thousands of components pay one dict lookup per component instead of a chain of substring scans.
+'''
+
+import re
+from functools import lru_cache
+from typing import Dict, Any, NamedTuple, Optional
+
+# jargon.sh model name -> UNTP credential type. 0.6.0 renamed some models, so both names are listed
+MODEL_TYPES = {
+    "DigitalFacilityRecord": "DFR",
+    "DigitalProductPassport": "DPP",
+    "ConformityCredential": "DCC",
+    "DigitalConformityCredential": "DCC",
+    "traceabilityEvents": "DTE",
+    "DigitalTraceabilityEvent": "DTE",
+    "DigitalIdentityAnchor": "DIA",
+}
+
+_SCHEMA_URL = re.compile(
+    r"https?://jargon\.sh/user/[^/]+/(?P<model>[^/]+)/v/(?P<version>[^/]+)/artefacts/jsonSchemas/(?P<file>[^/?#]+?)\.json"
+    r"(?:\?(?:[^#]*&)?class=(?P<class>[^&#]+))?"
+)
+# UNTP vocabulary contexts, e.g. https://test.uncefact.org/vocabulary/untp/dfr/0.5.0/ or https://vocabulary.uncefact.org/untp/dfr/0.5.0/ (as used in the @context of issued credentials)
+_CONTEXT_URL = re.compile(r"https?://[^/]*uncefact\.org/(?:vocabulary/)?untp/(?P<type>dfr|dpp|dcc|dte|dia)/(?P<version>[^/]+)/?")
+# Fallback for URLs not in the jargon.sh layout: the model name anywhere in the URL, as the substring checks did before
+_MODEL_NAME = re.compile("|".join(sorted(MODEL_TYPES, key=len, reverse=True)))
+
+
+class CredentialSchema(NamedTuple):
+    credential_type: str # DFR, DPP, DCC, DTE or DIA
+    version: Optional[str] # e.g. "0.5.0"; None when the URL is not a jargon.sh artefact URL
+    schema_class: Optional[str] # e.g. "DigitalFacilityRecord", from ?class= or the schema file name
+
+
+@lru_cache(maxsize=None)
+def classify_schema_url(schema_url: str) -> Optional[CredentialSchema]:
+    '''
+    This function classifies a schema URL. Results are cached per distinct URL.
+
+    Returns:
+        Optional[CredentialSchema]: The credential type, version and class, or None for URLs of unknown credential types.
+    '''
+    match = _SCHEMA_URL.match(schema_url)
+    if match and match["model"] in MODEL_TYPES:
+        return CredentialSchema(MODEL_TYPES[match["model"]], match["version"], match["class"] or match["file"])
+    match = _MODEL_NAME.search(schema_url)
+    if match:
+        return CredentialSchema(MODEL_TYPES[match.group()], None, None)
+    return None
+
+
+@lru_cache(maxsize=None)
+def classify_context_url(context_url: str) -> Optional[CredentialSchema]:
+    '''
+    This function classifies a UNTP vocabulary context URL. Results are cached per distinct URL.
+
+    Returns:
+        Optional[CredentialSchema]: The credential type and version (schema_class is None), or None for other contexts.
+    '''
+    match = _CONTEXT_URL.match(context_url)
+    if match:
+        return CredentialSchema(match["type"].upper(), match["version"], None)
+    return None
+
+
+def component_schema_url(component: Dict[str, Any]) -> Optional[str]:
+    '''
+    Returns the schema URL of an EntryData component, for both JSON structures: "LocalStorageLoader/NestedComponents" and standard "JsonForm".
+    Returns None when a LocalStorageLoader has multiple nested components, which is not supported.
+    '''
+    if component.get("name") == "LocalStorageLoader":
+        nestedcomponents = component['props']['nestedComponents']
+        if len(nestedcomponents) == 1: # Assumes single nested component
+            return nestedcomponents[0]["props"]["schema"]["url"]
+        return None
+    return component["props"]["schema"]["url"]
+
+
+def feature_credential_type(feature: Dict[str, Any]) -> Optional[str]:
+    '''
+    Returns the credential type of a feature ("apps" -> "features" -> feature) from the schema URL of its EntryData components,
+    whether or not a transformer is registered for it: the type of the last classified component, None when there is none.
+    A LocalStorageLoader with multiple nested components stops the search, as in the transformers.
+    '''
+    credential_type = None
+    for component in feature.get("components", []):
+        if component.get("type") == "EntryData":
+            schema_url = component_schema_url(component)
+            if schema_url is None:
+                break
+            schema = classify_schema_url(schema_url)
+            if schema:
+                credential_type = schema.credential_type
+    return credential_type
@@ -1,40 +1,44 @@
 
 
 # ---------- DPP Transformer ----------
+# @TransformerRegistry.register("DPP") # uncomment once the DPP migration is complete; no other wiring is needed
 class DPPTransformer(CredentialTransformer):
-    def transform(self) -> Dict[str, Any]:
+    def transform(self, component: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        component = self.component if component is None else component
         # Apply general migrations
-        self.component = GeneralMigrator.migrate_general_v_050_to_v_060(self.component)
+        component = GeneralMigrator.migrate_general_v_050_to_v_060(component)
         
         # Placeholder for DPP-specific migrations (add based on migration guide)
-        data = self.component["props"]["data"]
+        data = component["props"]["data"]
         # Example: Update schema URL to v0.6.0
-        schema = self.component["props"]["schema"]
+        schema = component["props"]["schema"]
         schema["url"] = schema["url"].replace("/v/0.5.0/", "/v/0.6.0/")
         
         # Clean and flatten as needed
         self._clean_identifier_list(data, ['type', '@context', 'issuer'])
         self._flatten_credential_subject(data, 'credentialSubject')
         
-        return self.component
+        return component
     
 
 
 # ---------- DCC Transformer ----------
+# @TransformerRegistry.register("DCC") # uncomment once the DCC migration is complete; no other wiring is needed
 class DCCTransformer(CredentialTransformer):
-    def transform(self) -> Dict[str, Any]:
+    def transform(self, component: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        component = self.component if component is None else component
         # Apply general migrations
-        self.component = GeneralMigrator.migrate_general_v_050_to_v_060(self.component)
+        component = GeneralMigrator.migrate_general_v_050_to_v_060(component)
         
         # Placeholder for DCC-specific migrations (add based on migration guide)
-        data = self.component["props"]["data"]
+        data = component["props"]["data"]
         # Example: Update schema URL to v0.6.0
-        schema = self.component["props"]["schema"]
+        schema = component["props"]["schema"]
         schema["url"] = schema["url"].replace("/v/0.5.0/", "/v/0.6.0/")
         
         # Clean and flatten as needed
         self._clean_identifier_list(data, ['type', '@context', 'issuer'])
         self._flatten_credential_subject(data, 'credentialSubject')
         
-        return self.component
+        return component
     
\ No newline at end of file
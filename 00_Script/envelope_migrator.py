@@ -0,0 +1,285 @@
+'''
+Batch migration of enveloped verifiable credentials.
+An EnvelopedVerifiableCredential carries the credential as a JWT in its id, e.g.
+    {"verifiableCredential": {"type": "EnvelopedVerifiableCredential", "id": "data:application/vc-ld+jwt,<header>.<payload>.<signature>"}}
+This code decodes the payloads in bulk, applies the registered transformer of the credential type (DFRTransformer for DFR)
+to the inner credential, and re-emits the unsigned 0.6.0 payloads together with an envelope from a signer.
+The default signer is LocalSignerStub, which produces an unsecured JWT ("alg": "none") so the output can be inspected
+and re-signed; it is not a valid credential until it is re-issued by a real signer such as VCkit.
+
+Throughput: the JWT segments are decoded with binascii (C) over one translation table and parsed from bytes by json_backend,
+and credentials are migrated over a ProcessPoolExecutor in chunks, so tens of thousands of stored credentials can be processed per run.
+JSON Lines inputs (one envelope per line) are read and written line by line.
+Outputs go to a separate folder (migrated-<input folder> next to the input folder by default), so the input folders are never written to.
+'''
+
+import binascii
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from glob import glob
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
+
+import json_backend
+import dfr # registers DFRTransformer
+from credential_classifier import classify_context_url
+from key_rename import rename_key
+from transformer_registry import TransformerRegistry
+
+ENVELOPE_TYPE = "EnvelopedVerifiableCredential"
+DATA_URL_PREFIXES = ("data:application/vc-ld+jwt,", "data:application/vc+jwt,")
+TARGET_VERSION = "0.6.0"
+# 0.6.0 vocabulary context per credential type, as set in the services by the transformers
+TARGET_CONTEXTS = {
+    "DFR": "https://test.uncefact.org/vocabulary/untp/dfr/0.6.0/",
+}
+OUTPUT_PREFIX = "migrated-"
+PAYLOAD_SUFFIX = ".payload"
+
+_URLSAFE_TO_STANDARD = bytes.maketrans(b"-_", b"+/") # base64url -> base64, shared by every decode
+
+
+# ---------- JWT ----------
+def _b64url_decode(segment: str) -> bytes:
+    # binascii ignores surplus padding, so "==" can always be appended instead of computing the exact amount
+    return binascii.a2b_base64(segment.encode("ascii").translate(_URLSAFE_TO_STANDARD) + b"==")
+
+
+def _b64url_encode(data: bytes) -> str:
+    return binascii.b2a_base64(data, newline=False).rstrip(b"=").translate(bytes.maketrans(b"+/", b"-_")).decode("ascii")
+
+
+def decode_envelope(envelope: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    '''
+    This function decodes the JWT of an EnvelopedVerifiableCredential. The signature is not verified.
+
+    Args:
+        envelope (Dict[str, Any]): The envelope itself, or a document holding it under "verifiableCredential".
+
+    Returns:
+        Tuple[Dict[str, Any], Dict[str, Any]]: The JWT header and the credential payload.
+    '''
+    envelope = envelope.get("verifiableCredential", envelope)
+    data_url = envelope.get("id", "")
+    for prefix in DATA_URL_PREFIXES:
+        if data_url.startswith(prefix):
+            break
+    else:
+        raise ValueError(f"Not an enveloped credential data URL: {data_url[:40]}")
+    segments = data_url[len(prefix):].split(".")
+    if len(segments) != 3:
+        raise ValueError(f"Expected a JWT with 3 segments, found {len(segments)}")
+    return json_backend.loads(_b64url_decode(segments[0])), json_backend.loads(_b64url_decode(segments[1]))
+
+
+class LocalSignerStub:
+    '''
+    Stand-in for the issuing service during migration runs. sign() builds an envelope with an unsecured JWT ("alg": "none",
+    empty signature) so migrated payloads can be inspected, diffed and handed over for re-signing.
+    '''
+    media_type = "application/vc-ld+jwt"
+
+    def sign(self, payload: Dict[str, Any], header: Dict[str, Any]) -> Dict[str, Any]:
+        unsigned_header = {key: value for key, value in header.items() if key not in ("alg", "kid")}
+        unsigned_header["alg"] = "none"
+        segments = [_b64url_encode(json_backend.dumps(part, indent=None).encode("utf-8")) for part in (unsigned_header, payload)]
+        return {
+            "@context": payload.get("@context", []),
+            "type": ENVELOPE_TYPE,
+            "id": f"data:{self.media_type},{segments[0]}.{segments[1]}.",
+        }
+
+
+# ---------- Migration ----------
+def credential_version(payload: Dict[str, Any]) -> Tuple[Optional[str], Optional[str]]:
+    # Credential type and version from the UNTP vocabulary context of the credential, e.g. ("DFR", "0.5.0")
+    for context in payload.get("@context", []):
+        schema = classify_context_url(context) if isinstance(context, str) else None
+        if schema:
+            return schema.credential_type, schema.version
+    return None, None
+
+
+def migrate_credential(payload: Dict[str, Any]) -> Dict[str, Any]:
+    '''
+    This function migrates a decoded 0.5.0 credential to 0.6.0 in place, using the registered transformer of its credential type.
+    The transformer works on app-config components, so credentialSubject is passed as the component data:
+    - a credentialSubject holding the whole 0.5.0 form data (as issued from the app-config, with a nested credentialSubject) is migrated as is;
+    - a plain 0.5.0 credentialSubject is wrapped first.
+    Either way the result is the 0.6.0 credentialSubject ({"type": ["FacilityRecord"], "facility": ..., "conformityClaim": ...} for DFR).
+    '''
+    credential_type, _ = credential_version(payload)
+    transformer = TransformerRegistry.get(credential_type)
+    credential_subject = payload.get("credentialSubject", {})
+    data = credential_subject if "credentialSubject" in credential_subject else {"credentialSubject": credential_subject}
+    component = transformer.transform({"props": {"data": data, "schema": {}}})
+    payload["credentialSubject"] = component["props"]["data"]
+
+    target_context = TARGET_CONTEXTS[credential_type]
+    payload["@context"] = [target_context if classify_context_url(context) else context for context in payload.get("@context", [])]
+    issuer = payload.get("issuer")
+    if isinstance(issuer, dict) and "otherIdentifier" in issuer: # as in the vckit issuer of the services
+        rename_key(issuer, "otherIdentifier", "issuerAlsoKnownAs")
+    return payload
+
+
+def migrate_envelope(envelope: Dict[str, Any], signer: Optional[LocalSignerStub] = None) -> Dict[str, Any]:
+    '''
+    This function migrates one enveloped credential and reports the outcome instead of raising, so one bad credential does not stop a batch.
+
+    Returns:
+        Dict[str, Any]: {"status": "migrated" | "skipped" | "failed", "error", "payload" (unsigned 0.6.0 credential), "envelope" (signed by signer)}
+    '''
+    signer = signer or LocalSignerStub()
+    result = {"status": "failed", "error": None, "payload": None, "envelope": None}
+    try:
+        header, payload = decode_envelope(envelope)
+        credential_type, version = credential_version(payload)
+        if version == TARGET_VERSION:
+            result["status"] = "skipped"
+            result["error"] = f"already {TARGET_VERSION}"
+        elif credential_type not in TransformerRegistry.transformers() or credential_type not in TARGET_CONTEXTS:
+            result["status"] = "skipped"
+            result["error"] = f"no transformer for credential type {credential_type} {version}"
+        else:
+            payload = migrate_credential(payload)
+            new_envelope = signer.sign(payload, header)
+            result.update(status="migrated", payload=payload, envelope={"verifiableCredential": new_envelope} if "verifiableCredential" in envelope else new_envelope)
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    return result
+
+
+def migrate_envelopes(envelopes: Iterable[Dict[str, Any]], max_workers: Optional[int] = None, batch_size: int = 1024) -> Iterator[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    '''
+    This function migrates many enveloped credentials over a ProcessPoolExecutor and yields (envelope, result) pairs in input order.
+    envelopes is consumed batch_size at a time, so arbitrarily long inputs (e.g. a JSON Lines file) are processed in bounded memory,
+    and each batch is sent to the workers in a few chunks per worker to keep the pickling overhead per credential low.
+    '''
+    envelopes = iter(envelopes)
+    workers = max_workers or os.cpu_count() or 1
+    if workers == 1: # no pool needed, avoids the process start-up cost
+        for envelope in envelopes:
+            yield envelope, migrate_envelope(envelope)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for batch in iter(lambda: list(islice(envelopes, batch_size)), []):
+            chunksize = max(1, len(batch) // (workers * 4))
+            yield from zip(batch, executor.map(migrate_envelope, batch, chunksize=chunksize))
+
+
+# ---------- Files ----------
+def read_jsonl(path: Path) -> Iterator[Dict[str, Any]]:
+    # One envelope per line; blank lines are ignored
+    with open(path, "rb") as f:
+        for line in f:
+            if line.strip():
+                yield json_backend.loads(line)
+
+
+def is_generated(path: Path) -> bool:
+    # Outputs of an earlier run: migrated-<name> and <name>.payload.json(l)
+    return path.name.startswith(OUTPUT_PREFIX) or Path(path.stem).suffix == PAYLOAD_SUFFIX
+
+
+def collect_envelope_paths(source: str) -> List[Path]:
+    '''
+    This function resolves a directory or a glob pattern to the list of .json and .jsonl files to migrate.
+    Outputs of earlier runs (see is_generated()) are left out, so a re-run never migrates its own outputs.
+    '''
+    source_path = Path(source)
+    if source_path.is_dir():
+        paths = [p for p in source_path.iterdir() if p.suffix in (".json", ".jsonl")]
+    else:
+        paths = [Path(p) for p in glob(str(source))]
+    return sorted(p for p in paths if not is_generated(p))
+
+
+def default_output_dir(input_path: Path) -> Path:
+    # migrated-<input folder> next to the input folder, e.g. 01_Data/migrated-testsuite_testing
+    return input_path.parent.parent / f"{OUTPUT_PREFIX}{input_path.parent.name}"
+
+
+def migrate_files(source: str, output_dir: Optional[str] = None, max_workers: Optional[int] = None) -> List[Dict[str, Any]]:
+    '''
+    This function migrates the enveloped credentials in every file matched by source (a directory or a glob).
+    A .json file holds one envelope or a list of them; a .jsonl file holds one envelope per line and is processed as a stream.
+    For each input with at least one migrated credential it writes OUTPUT_PREFIX + name with the new envelopes, in the same layout
+    as the input, and OUTPUT_PREFIX + name.payload with the unsigned 0.6.0 credentials for re-signing. Credentials that are skipped
+    or fail are kept unchanged in the envelope output and have no payload; a file without migrated credentials gets no output.
+    Outputs are written to output_dir, or to default_output_dir() of each input.
+
+    Returns:
+        List[Dict[str, Any]]: Per file: "input", "output" (None when nothing was written), "migrated", "skipped", "failed"
+        and the "errors" of failed credentials.
+    '''
+    summaries = []
+    for input_path in collect_envelope_paths(source):
+        target_dir = Path(output_dir) if output_dir else default_output_dir(input_path)
+        target_dir.mkdir(parents=True, exist_ok=True)
+        output_path = target_dir / f"{OUTPUT_PREFIX}{input_path.name}"
+        payload_path = output_path.with_suffix(PAYLOAD_SUFFIX + input_path.suffix)
+        summary = {"input": str(input_path), "output": None, "migrated": 0, "skipped": 0, "failed": 0, "errors": []}
+
+        if input_path.suffix == ".jsonl":
+            with open(output_path, "w", encoding="utf-8") as fout, open(payload_path, "w", encoding="utf-8") as fpayload:
+                for envelope, result in migrate_envelopes(read_jsonl(input_path), max_workers):
+                    _count(summary, result)
+                    fout.write(json_backend.dumps(result["envelope"] or envelope, indent=None) + "\n")
+                    if result["payload"] is not None:
+                        fpayload.write(json_backend.dumps(result["payload"], indent=None) + "\n")
+            if not summary["migrated"]: # streamed, so only known at the end
+                output_path.unlink()
+                payload_path.unlink()
+        else:
+            document = json_backend.load_file(input_path)
+            outputs, payloads = [], []
+            for envelope, result in migrate_envelopes(document if isinstance(document, list) else [document], max_workers):
+                _count(summary, result)
+                outputs.append(result["envelope"] or envelope)
+                if result["payload"] is not None:
+                    payloads.append(result["payload"])
+            if payloads:
+                if not isinstance(document, list): # keep the single-envelope layout of the input
+                    outputs, payloads = outputs[0], payloads[0]
+                json_backend.dump_file(outputs, output_path, indent=2)
+                json_backend.dump_file(payloads, payload_path, indent=2)
+        if summary["migrated"]:
+            summary["output"] = str(output_path)
+        summaries.append(summary)
+    return summaries
+
+
+def _count(summary: Dict[str, Any], result: Dict[str, Any]) -> None:
+    summary[result["status"]] += 1
+    if result["status"] == "failed":
+        summary["errors"].append(result["error"])
+
+
+# ---------- Example Usage ----------
+'''
+This code migrates the enveloped 0.5.0 test credentials in 01_Data/testsuite_testing and writes the new envelopes and the unsigned
+0.6.0 payloads to 01_Data/migrated-testsuite_testing.
+'''
+if __name__ == "__main__":
+
+    ############## PARAMETERS & VARIABLES #####################
+
+    current_dir = Path(__file__).resolve().parent
+
+    input_source = current_dir.parent / "01_Data/testsuite_testing" / "vc_050_regen_farmers_DFR - enveloped.json"
+    output_folder_name = None # None writes to a "migrated-<folder>" folder next to the input folder
+    max_workers = None # None uses one worker per CPU
+
+    ###########################################################
+
+    start = time.perf_counter()
+    summaries = migrate_files(str(input_source), output_folder_name, max_workers)
+    for summary in summaries:
+        print(f"{Path(summary['input']).name}: {summary['migrated']} migrated, {summary['skipped']} skipped, {summary['failed']} failed"
+              + (f" -> {summary['output']}" if summary["output"] else ""))
+        for error in summary["errors"]:
+            print(f"  {error}")
+    print(f"Envelope migration complete in {time.perf_counter() - start:.2f}s!")
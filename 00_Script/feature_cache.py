@@ -0,0 +1,135 @@
+'''
+Incremental re-migration cache.
+Between runs usually only a few features of a tenant config change, yet every run re-transforms and re-serializes all of them.
+AppConfigProcessor.process_incremental() hashes each feature: its components and services, which the transformers read and write,
+and its other keys (name, id, ...), which are part of the cached output text. When the hash was seen in the last run, the feature's output text
+is copied from the cache, skipping both the transformation and the JSON dump.
+
+The cache is saved next to the output as <output>.cache: a header line with the code fingerprint, then one record per feature,
+    <sha256 of the input feature>\\t<credential type>\\t<length>\\n<output text of the transformed feature>\\n
+Only the offsets of the previous records are kept in memory; the text of a record is read when its feature is unchanged.
+Any edit to the scripts in 00_Script or to the render templates, or a change of JSON backend, changes the fingerprint,
+and the next run transforms everything.
+'''
+
+import hashlib
+import os
+from pathlib import Path
+from typing import Dict, Any, BinaryIO, Optional, Tuple
+
+import json_backend
+from template_registry import TemplateRegistry
+
+CACHE_SUFFIX = ".cache"
+SOURCE_DIR = Path(__file__).resolve().parent
+
+
+def cache_path_for(output_path: Any) -> Path:
+    # transformed-app-config.json -> transformed-app-config.cache
+    output_path = Path(output_path)
+    return output_path.with_name(output_path.stem + CACHE_SUFFIX)
+
+
+def code_fingerprint() -> str:
+    # Hash of the migration scripts, render templates and JSON backend, so cached features are never reused after the transformation
+    # or the serialization changed: key() hashes backend-dependent text, and the cached output text was written with the backend
+    digest = hashlib.sha256()
+    digest.update(json_backend.backend_signature().encode("utf-8"))
+    for path in sorted(SOURCE_DIR.glob("*.py")):
+        digest.update(path.name.encode("utf-8"))
+        digest.update(path.read_bytes())
+    for credential_type, template in sorted(TemplateRegistry.load_all().items()):
+        digest.update(credential_type.encode("utf-8"))
+        digest.update(template.encode("utf-8"))
+    return digest.hexdigest()
+
+
+# ---------- Cache ----------
+class FeatureCache:
+    def __init__(self, output_path: Any, fingerprint: Optional[str] = None):
+        """
+        Initialize the cache of output_path, reading the record offsets of the last run if its fingerprint matches.
+        """
+        self.path = cache_path_for(output_path)
+        self.fingerprint = fingerprint or code_fingerprint()
+        self.hits = 0
+        self.misses = 0
+        self._previous: Dict[str, Tuple[Optional[str], int, int]] = {} # hash -> (credential type, offset, length) in the last run's cache
+        self._source: Optional[BinaryIO] = None
+        self._target: Optional[BinaryIO] = None # records of this run, written to a temporary file until save()
+        self._written = set()
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        source = open(self.path, "rb")
+        if source.readline().rstrip(b"\n").decode("ascii") != self.fingerprint:
+            source.close()
+            print(f"{self.path.name} was written by a different version of the scripts; transforming every feature")
+            return
+        for header in iter(source.readline, b""):
+            key, credential_type, length = header.rstrip(b"\n").decode("ascii").split("\t")
+            self._previous[key] = (credential_type or None, source.tell(), int(length))
+            source.seek(int(length) + 1, os.SEEK_CUR)
+        self._source = source
+
+    @staticmethod
+    def key(feature: Dict[str, Any]) -> str:
+        # The whole feature is hashed, not only its components and services, as its other keys are part of the cached output text.
+        # Key order is kept, as it is in the output
+        return hashlib.sha256(json_backend.dumps_compact(feature).encode("utf-8")).hexdigest()
+
+    def lookup(self, key: str) -> Optional[Tuple[Optional[str], str]]:
+        '''
+        This function looks up a feature hash from key().
+
+        Returns:
+            Optional[Tuple[Optional[str], str]]: The credential type and output text of the feature if it is unchanged since the last run, otherwise None.
+        '''
+        record = self._previous.get(key)
+        if record is None:
+            self.misses += 1
+            return None
+        credential_type, offset, length = record
+        self._source.seek(offset)
+        raw = self._source.read(length)
+        self._write(key, credential_type, raw)
+        self.hits += 1
+        return credential_type, raw.decode("utf-8")
+
+    def store(self, key: str, credential_type: Optional[str], text: str) -> None:
+        # text is the transformed feature as written to the output (JsonStreamWriter.serialize at the feature's depth)
+        self._write(key, credential_type, text.encode("utf-8"))
+
+    def _write(self, key: str, credential_type: Optional[str], raw: bytes) -> None:
+        if key in self._written: # identical features share one record
+            return
+        if self._target is None:
+            self._open_target()
+        self._target.write(f"{key}\t{credential_type or ''}\t{len(raw)}\n".encode("ascii") + raw + b"\n")
+        self._written.add(key)
+
+    def _open_target(self) -> None:
+        self._target = open(self._temporary_path(), "wb")
+        self._target.write(self.fingerprint.encode("ascii") + b"\n")
+
+    def _temporary_path(self) -> Path:
+        return self.path.with_name(self.path.name + ".tmp")
+
+    def save(self) -> Path:
+        '''
+        Replaces the cache of the last run with the features of this run. Call it once the output has been written.
+        '''
+        if self._target is None: # no features in this run
+            self._open_target()
+        self._target.close()
+        self._target = None
+        self.close()
+        os.replace(self._temporary_path(), self.path)
+        return self.path
+
+    def close(self) -> None:
+        if self._source:
+            self._source.close()
+            self._source = None
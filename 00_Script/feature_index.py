@@ -0,0 +1,188 @@
+'''
+Feature index sidecar for transformed app-configs.
+While AppConfigProcessor writes its output, the position of every feature ("apps" -> "features" -> feature) is recorded
+together with its credential type, and saved next to the output as <output>.index.json:
+
+    {"output": "transformed-app-config.json", "size": 1254395,
+     "features": [{"app": 0, "feature": 3, "name": "DFR - Producer", "credential_type": "DFR", "offset": 81234, "length": 30512}, ...],
+     "types": {"DFR": [3, 7]}}
+
+Extracting all features of a credential type, or writing each feature to its own file, is then a seek and a read of each feature
+instead of loading and re-classifying the whole config (see Helper Code/dfr_master_testing.py).
+The credential type is the one credential_classifier.feature_credential_type() finds, so every type (DFR, DPP, DCC, DTE, DIA) is indexed,
+not only the types with a registered transformer.
+'''
+
+import re
+from pathlib import Path
+from typing import Dict, Any, Callable, Iterator, List, Optional, Tuple
+
+import json_backend
+from credential_classifier import feature_credential_type
+from stream_io import JsonStreamWriter
+
+INDEX_SUFFIX = ".index.json"
+
+# (app index, feature index) -> credential type the feature was transformed as, None when no transformer applied
+FeatureTypes = Dict[Tuple[int, int], Optional[str]]
+# Writes one feature at the current position: write_feature(writer, app index, feature index, feature)
+FeatureWriter = Callable[[JsonStreamWriter, int, int, Any], None]
+
+
+def index_path_for(output_path: Any) -> Path:
+    # transformed-app-config.json -> transformed-app-config.index.json
+    output_path = Path(output_path)
+    return output_path.with_name(output_path.stem + INDEX_SUFFIX)
+
+
+# ---------- Index ----------
+class FeatureIndex:
+    def __init__(self, output_path: Any = None):
+        """
+        Initialize an empty index of the features in output_path. Entries are added in file order.
+        """
+        self.output_path = Path(output_path) if output_path else None
+        self.output_size: Optional[int] = None
+        self.entries: List[Dict[str, Any]] = []
+
+    def add(self, app_index: int, feature_index: int, name: Optional[str], credential_type: Optional[str], offset: int, length: int) -> None:
+        self.entries.append({
+            "app": app_index, "feature": feature_index, "name": name,
+            "credential_type": credential_type, "offset": offset, "length": length,
+        })
+
+    def by_type(self, credential_type: Optional[str]) -> List[Dict[str, Any]]:
+        return [entry for entry in self.entries if entry["credential_type"] == credential_type]
+
+    def credential_types(self) -> Dict[str, List[int]]:
+        # credential type -> positions in entries, as saved under "types"
+        types: Dict[str, List[int]] = {}
+        for position, entry in enumerate(self.entries):
+            if entry["credential_type"]:
+                types.setdefault(entry["credential_type"], []).append(position)
+        return types
+
+    # ---------- Sidecar ----------
+    def save(self, index_path: Any = None) -> Path:
+        index_path = Path(index_path) if index_path else index_path_for(self.output_path)
+        self.output_size = self.output_path.stat().st_size
+        document = {
+            "output": self.output_path.name,
+            "size": self.output_size,
+            "features": self.entries,
+            "types": self.credential_types(),
+        }
+        json_backend.dump_file(document, index_path, indent=2)
+        return index_path
+
+    @classmethod
+    def load(cls, index_path: Any) -> "FeatureIndex":
+        '''
+        Loads a sidecar. The output is expected next to it; a size mismatch means the output was rewritten after indexing.
+        '''
+        index_path = Path(index_path)
+        document = json_backend.load_file(index_path)
+        index = cls(index_path.parent / document["output"])
+        index.output_size = document["size"]
+        index.entries = document["features"]
+        if not index.output_path.exists() or index.output_path.stat().st_size != index.output_size:
+            raise ValueError(f"Index {index_path.name} is out of date with {index.output_path.name}; re-run the transformation")
+        return index
+
+    # ---------- Extraction ----------
+    def iter_features(self, entries: Optional[List[Dict[str, Any]]] = None) -> Iterator[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        '''
+        Yields (entry, feature) for the given entries (all by default), reading only the bytes of each feature.
+        '''
+        with open(self.output_path, "rb") as f:
+            for entry in self.entries if entries is None else entries:
+                f.seek(entry["offset"])
+                yield entry, json_backend.loads(f.read(entry["length"]))
+
+    def extract(self, credential_type: str) -> List[Dict[str, Any]]:
+        return [feature for _, feature in self.iter_features(self.by_type(credential_type))]
+
+    def write_features(self, output_dir: Any, credential_type: Optional[str] = None) -> List[Path]:
+        '''
+        Writes each feature (of credential_type, or all features) to its own file, so features can be tested individually.
+        Files are named "<app>-<feature> - <feature name>.json".
+        '''
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        entries = self.entries if credential_type is None else self.by_type(credential_type)
+        paths = []
+        for entry, feature in self.iter_features(entries):
+            safe_name = re.sub(r'[\\/:*?"<>|]+', "_", entry["name"] or "feature")
+            path = output_dir / f"{entry['app']}-{entry['feature']} - {safe_name}.json"
+            json_backend.dump_file(feature, path, indent=2)
+            paths.append(path)
+        return paths
+
+
+# ---------- Indexed output ----------
+def dump_indexed(config: Dict[str, Any], output_path: Any) -> FeatureIndex:
+    '''
+    This function writes config exactly like json_backend.dump_file(config, output_path, indent=2), feature by feature,
+    recording the offset and length of every feature, and saves the sidecar index next to the output.
+    '''
+    index = FeatureIndex(output_path)
+
+    def write_feature(writer: JsonStreamWriter, app_index: int, feature_index: int, feature: Any) -> None:
+        offset, length = writer.indexed_value(feature)
+        index.add(app_index, feature_index, feature_name(feature), feature_type(feature), offset, length)
+
+    dump_features(config, output_path, write_feature)
+    index.save()
+    return index
+
+
+def feature_name(feature: Any) -> Optional[str]:
+    return feature.get("name") if isinstance(feature, dict) else None
+
+
+def feature_type(feature: Any) -> Optional[str]:
+    # The credential type recorded in the index
+    return feature_credential_type(feature) if isinstance(feature, dict) else None
+
+
+def dump_features(config: Dict[str, Any], output_path: Any, write_feature: Optional[FeatureWriter] = None) -> None:
+    '''
+    This function writes config exactly like json_backend.dump_file(config, output_path, indent=2), handing every feature
+    ("apps" -> "features" -> feature) to write_feature, which must write it as writer.value() would.
+    By default each feature is written with writer.value(), so only one feature's text is held in memory at a time.
+    '''
+    write_feature = write_feature or _write_feature
+    with open(output_path, "w", encoding="utf-8") as f:
+        writer = JsonStreamWriter(f)
+        writer.begin_object()
+        for key, value in config.items():
+            writer.key(key)
+            if key == "apps" and isinstance(value, list):
+                writer.begin_array()
+                for app_index, app in enumerate(value):
+                    _write_app(writer, app, app_index, write_feature)
+                writer.end_array()
+            else:
+                writer.value(value)
+        writer.end_object()
+
+
+def _write_feature(writer: JsonStreamWriter, app_index: int, feature_index: int, feature: Any) -> None:
+    writer.value(feature)
+
+
+def _write_app(writer: JsonStreamWriter, app: Any, app_index: int, write_feature: FeatureWriter) -> None:
+    if not isinstance(app, dict):
+        writer.value(app)
+        return
+    writer.begin_object()
+    for key, value in app.items():
+        writer.key(key)
+        if key == "features" and isinstance(value, list):
+            writer.begin_array()
+            for feature_index, feature in enumerate(value):
+                write_feature(writer, app_index, feature_index, feature)
+            writer.end_array()
+        else:
+            writer.value(value)
+    writer.end_object()
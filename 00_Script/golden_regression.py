@@ -0,0 +1,258 @@
+'''
+Regression run of the current transformers against the playground-verified outputs in 01_Data/app-config/RBTP.
+The golden files are the credentials that passed the UNTP playground and the spot-checked features:
+- every credential in showcase-untp-playground-test-final
+- the credentials in untp-playground-test, untp-playground-test-v1 ... v4 whose file name says "passed" or "success"
+- spotcheck-0.6*.json, the expected 0.6.0 version of the feature in spotcheck-0.5.json
+
+The 0.5.0 features of the input files are migrated with AppConfigProcessor.transform_feature() (over worker processes for
+max_workers > 1) and each golden file is matched to the migrated features by subject id ("props" -> "data" -> "id" of the feature,
+"credentialSubject" -> "id" of the credential). A golden credential is compared with the credential issued from the feature
+(jsonld_check.credential_for()) on "@context", "type" and "credentialSubject"; a golden feature with the whole feature.
+Features of other versions are not inputs: they were migrated already, and migrating them again is not what the golden files verify.
+
+Both sides are canonicalised before comparing: object key order is ignored, 1.0 equals 1, and "type" values are sorted,
+since JSON-LD types are a set and the playground lists them in another order. Array order is compared.
+Each mismatch is reported as a JSON pointer with the expected and the actual value.
+'''
+
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from glob import glob
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+import json_backend
+from credential_classifier import classify_schema_url
+from envelope_migrator import decode_envelope
+from jsonld_check import credential_for
+from main_transformer import AppConfigProcessor
+
+CORPUS_DIR = Path(__file__).resolve().parent.parent / "01_Data" / "app-config" / "RBTP"
+GOLDEN_PATTERNS = (
+    "showcase-untp-playground-test-final/*.json",
+    "untp-playground-test/*.json",
+    "untp-playground-test-v*/*.json",
+    "spotcheck-0.6*.json",
+)
+VERIFIED_DIRS = ("showcase-untp-playground-test-final",) # every credential of the final showcase passed the playground
+PASSED_MARKERS = ("passed", "success")
+DEFAULT_INPUTS = (CORPUS_DIR / "app-config.json", CORPUS_DIR / "spotcheck-0.5.json")
+SOURCE_VERSIONS = ("0.5.0",)
+CREDENTIAL_FIELDS = ("@context", "type", "credentialSubject")
+
+# (input file, feature index in the file, feature) of one feature to migrate
+InputItem = Tuple[str, int, Dict[str, Any]]
+
+
+# ---------- Golden files ----------
+def collect_golden_paths(corpus_dir: Any = CORPUS_DIR) -> List[Path]:
+    # The golden files of the corpus: all of VERIFIED_DIRS, the files marked with PASSED_MARKERS in the other test folders, and the spot checks
+    corpus_dir = Path(corpus_dir)
+    paths = set()
+    for pattern in GOLDEN_PATTERNS:
+        for name in glob(str(corpus_dir / pattern)):
+            path = Path(name)
+            if path.name.startswith("spotcheck-") or path.parent.name in VERIFIED_DIRS or any(marker in path.name.lower() for marker in PASSED_MARKERS):
+                paths.add(path)
+    return sorted(paths)
+
+
+def load_golden(path: Path) -> Tuple[str, Optional[str], Dict[str, Any]]:
+    '''
+    This function loads a golden file, decoding enveloped credentials.
+
+    Returns:
+        Tuple[str, Optional[str], Dict[str, Any]]: The kind ("credential" or "feature"), the subject id to match inputs by, and the expected document.
+    '''
+    document = json_backend.load_file(path)
+    if "verifiableCredential" in document or "credentialSubject" in document:
+        credential = document.get("verifiableCredential", document)
+        if "credentialSubject" not in credential:
+            credential = decode_envelope(credential)[1]
+        subject = credential.get("credentialSubject", {})
+        return "credential", subject.get("id"), {field: credential[field] for field in CREDENTIAL_FIELDS if field in credential}
+    return "feature", feature_subject_id(document), document
+
+
+def entry_data(feature: Dict[str, Any]) -> Tuple[Optional[str], Any]:
+    # Schema URL and "props" -> "data" of the feature's EntryData component, for both "JsonForm" and "LocalStorageLoader/NestedComponents"
+    for component in feature.get("components", []):
+        if component.get("type") == "EntryData":
+            props = component.get("props", {})
+            if component.get("name") == "LocalStorageLoader":
+                nested = props.get("nestedComponents", [])
+                props = nested[0].get("props", {}) if len(nested) == 1 else {}
+            return props.get("schema", {}).get("url"), props.get("data")
+    return None, None
+
+
+def feature_subject_id(feature: Dict[str, Any]) -> Optional[str]:
+    data = entry_data(feature)[1]
+    return data.get("id") if isinstance(data, dict) else None
+
+
+# ---------- Inputs ----------
+def iter_input_items(input_paths: List[Any], versions: Tuple[str, ...] = SOURCE_VERSIONS) -> Iterator[InputItem]:
+    '''
+    Yields the features of the input files (app-configs or single features) whose EntryData schema is of one of versions.
+    Missing input files are skipped with a message.
+    '''
+    for input_path in input_paths:
+        input_path = Path(input_path)
+        if not input_path.exists():
+            print(f"Skipped input {input_path}: not found")
+            continue
+        document = json_backend.load_file(input_path)
+        features = [feature for app in document.get("apps", []) for feature in app.get("features", [])] if "apps" in document else [document]
+        for index, feature in enumerate(features):
+            schema_url = entry_data(feature)[0]
+            schema = classify_schema_url(schema_url) if schema_url else None
+            if schema and schema.version in versions:
+                yield str(input_path), index, feature
+
+
+def _migrate_items(items: List[InputItem]) -> List[Dict[str, Any]]:
+    # The migrated features, each transformed by a quiet processor whose progress messages are discarded
+    migrated = []
+    for input_path, _, feature in items:
+        processor = AppConfigProcessor(input_path, streaming=True, quiet=True) # nothing is loaded; the feature is passed in
+        migrated.append(processor.process_feature(feature))
+    return migrated
+
+
+# ---------- Comparison ----------
+def canonical(value: Any) -> Any:
+    # Key order is dropped by the comparison of dicts; integral floats become ints and "type" values sorted lists
+    if isinstance(value, dict):
+        return {key: _canonical_type(item) if key == "type" else canonical(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [canonical(item) for item in value]
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _canonical_type(value: Any) -> Any:
+    if isinstance(value, str):
+        return [value]
+    if isinstance(value, list) and all(isinstance(item, str) for item in value):
+        return sorted(value)
+    return canonical(value)
+
+
+def mismatches(expected: Any, actual: Any, path: str = "") -> Iterator[str]:
+    '''
+    Yields every difference between two canonical values as "<JSON pointer>: expected <value>, got <value>", comparing arrays by position.
+    '''
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        for key, value in expected.items():
+            child = f"{path}/{str(key).replace('~', '~0').replace('/', '~1')}"
+            if key in actual:
+                yield from mismatches(value, actual[key], child)
+            else:
+                yield f"{child}: expected {_short(value)}, missing"
+        for key in actual.keys() - expected.keys():
+            yield f"{path}/{str(key).replace('~', '~0').replace('/', '~1')}: unexpected {_short(actual[key])}"
+    elif isinstance(expected, list) and isinstance(actual, list):
+        for index, (old, new) in enumerate(zip(expected, actual)):
+            yield from mismatches(old, new, f"{path}/{index}")
+        for index in range(len(actual), len(expected)):
+            yield f"{path}/{index}: expected {_short(expected[index])}, missing"
+        for index in range(len(expected), len(actual)):
+            yield f"{path}/{index}: unexpected {_short(actual[index])}"
+    elif type(expected) is not type(actual) or expected != actual:
+        yield f"{path or '/'}: expected {_short(expected)}, got {_short(actual)}"
+
+
+def _short(value: Any, limit: int = 80) -> str:
+    text = json_backend.dumps_compact(value)
+    return text if len(text) <= limit else text[:limit - 3] + "..."
+
+
+def compare_golden(kind: str, expected: Dict[str, Any], feature: Dict[str, Any]) -> List[str]:
+    # The mismatches of a migrated feature against a golden credential or feature
+    if kind == "credential":
+        credential = credential_for(feature, entry_data(feature)[1])
+        actual = {field: credential[field] for field in CREDENTIAL_FIELDS if field in credential and field in expected}
+    else:
+        actual = feature
+    return list(mismatches(canonical(expected), canonical(actual)))
+
+
+# ---------- Runner ----------
+def run_corpus(corpus_dir: Any = CORPUS_DIR, input_paths: Optional[List[Any]] = None, max_workers: Optional[int] = None) -> List[Dict[str, Any]]:
+    '''
+    This function migrates the 0.5.0 features of the input files and compares them with every golden file of the corpus.
+
+    Args:
+        corpus_dir: The folder holding the golden files (see GOLDEN_PATTERNS).
+        input_paths (List, optional): App-configs or single features to migrate. Defaults to DEFAULT_INPUTS.
+        max_workers (int, optional): Worker processes to migrate in; None or 1 migrates in this process.
+
+    Returns:
+        List[Dict[str, Any]]: One result per golden file with "golden", "kind", "subject", "status" ("match", "mismatch" or "no input"),
+        "input" (the file and feature index compared with) and "mismatches". A golden file matched by several features is compared
+        with each of them, and the closest one is reported.
+    '''
+    corpus_dir = Path(corpus_dir)
+    items = list(iter_input_items(list(DEFAULT_INPUTS if input_paths is None else input_paths)))
+    workers = min(max_workers or 1, os.cpu_count() or 1, len(items))
+    if workers <= 1:
+        migrated = _migrate_items(items)
+    else:
+        size = max(1, len(items) // (workers * 4)) # a few chunks per worker keeps the pickling overhead low
+        chunks = [items[i:i + size] for i in range(0, len(items), size)]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            migrated = [feature for chunk in executor.map(_migrate_items, chunks) for feature in chunk]
+
+    by_subject: Dict[str, List[Tuple[str, Dict[str, Any]]]] = {}
+    for (input_path, index, _), feature in zip(items, migrated):
+        by_subject.setdefault(feature_subject_id(feature), []).append((f"{Path(input_path).name} feature {index}", feature))
+
+    results = []
+    for golden_path in collect_golden_paths(corpus_dir):
+        kind, subject, expected = load_golden(golden_path)
+        result = {"golden": str(golden_path.relative_to(corpus_dir)), "kind": kind, "subject": subject, "status": "no input", "input": None, "mismatches": []}
+        for label, feature in by_subject.get(subject, []) if subject else []:
+            found = compare_golden(kind, expected, feature)
+            if result["input"] is None or len(found) < len(result["mismatches"]):
+                result.update(input=label, mismatches=found, status="mismatch" if found else "match")
+        results.append(result)
+    return results
+
+
+def exit_status(results: List[Dict[str, Any]], strict: bool = False) -> int:
+    # 1 on any mismatch, and with strict also on any golden file without input, otherwise 0
+    failed = any(result["status"] == "mismatch" or (strict and result["status"] == "no input") for result in results)
+    return 1 if failed else 0
+
+
+# ---------- Example Usage ----------
+'''
+This code runs the golden corpus of 01_Data/app-config/RBTP against the current transformers and prints every mismatching path.
+Golden files whose subject is not among the migrated input features are listed as "no input"; add the app-config they were issued from to input_paths.
+The script exits with status 1 on any mismatch, and with strict = True also on any "no input", so it can gate a CI step.
+'''
+if __name__ == "__main__":
+
+    ############## PARAMETERS & VARIABLES #####################
+
+    corpus_dir = CORPUS_DIR
+    input_paths = list(DEFAULT_INPUTS) # 0.5.0 app-configs or features; files that do not exist are skipped
+    max_workers = None # e.g. os.cpu_count() for large inputs
+    strict = False # True also fails on golden files without input, e.g. once every input app-config is committed
+
+    ###########################################################
+
+    start = time.perf_counter()
+    results = run_corpus(corpus_dir, input_paths, max_workers)
+    for result in results:
+        print(f"{result['status'].upper():9} {result['golden']}" + (f" (vs {result['input']})" if result["input"] else ""))
+        for mismatch in result["mismatches"]:
+            print(f"    {mismatch}")
+    counts = {status: sum(result["status"] == status for result in results) for status in ("match", "mismatch", "no input")}
+    print(f"Golden corpus checked in {time.perf_counter() - start:.2f}s: {counts['match']} match, {counts['mismatch']} mismatch, {counts['no input']} without input.")
+    sys.exit(exit_status(results, strict))
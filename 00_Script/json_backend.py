@@ -0,0 +1,295 @@
+'''
+Pluggable JSON backend for loading and dumping app-configs.
+Uses orjson (or ujson for loading) when installed and falls back to the standard library otherwise.
+Output is always identical to json.dump(obj, f, indent=2): orjson's output is post-processed to match the standard library's
+ASCII escaping and float formatting, and anything orjson cannot encode exactly is written with the standard library instead.
+
+The backend can be forced with the UNTP_JSON_BACKEND environment variable ("orjson", "ujson" or "json") or set_backend().
+'''
+
+import codecs
+import json
+import mmap
+import os
+import re
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, TextIO
+
+try:
+    import orjson
+except ImportError: # optional dependency
+    orjson = None
+
+try:
+    import ujson
+except ImportError: # optional dependency
+    ujson = None
+
+MMAP_THRESHOLD = 8 * 1024 * 1024 # files from this size on are parsed from a memory map instead of a copy read into memory
+# From this size on, mapped files are parsed by the standard library: orjson's working buffer of about twice the file size
+# then costs more peak memory (about 3.3x the file size against 2.2x) than its speed is worth
+LOW_MEMORY_SIZE = 128 * 1024 * 1024
+
+# In indent=2 output every number sits alone on its line, either as an array item or after a key; strings never contain raw newlines
+_FLOAT_LINE = re.compile(r'( *(?:"(?:[^"\\]|\\.)*": )?)(-?\d+(?:\.\d+(?:[eE][-+]?\d+)?|[eE][-+]?\d+))(,?)')
+# orjson writes exponents as 1e16 / 1e-7 (the standard library writes 1e+16 / 1e-07) and 1e-5 as 0.00001 (1e-05)
+_EXPONENT = re.compile(r"e[-0-9]")
+
+
+def _json_escape_errors(error: UnicodeEncodeError):
+    # Codec error handler giving the same escapes as json.dumps with ensure_ascii=True, including surrogate pairs outside the BMP
+    escaped = []
+    for char in error.object[error.start:error.end]:
+        n = ord(char)
+        if n < 0x10000:
+            escaped.append(f"\\u{n:04x}")
+        else:
+            n -= 0x10000
+            escaped.append(f"\\u{0xd800 | (n >> 10):04x}\\u{0xdc00 | (n & 0x3ff):04x}")
+    return "".join(escaped), error.end
+
+
+codecs.register_error("untp_json_escape", _json_escape_errors)
+
+
+def _escape_non_ascii(text: str) -> str:
+    # The codec does the scanning in C; \x7f is ASCII to the codec and is escaped by _orjson_dumps() separately
+    return text.encode("ascii", "untp_json_escape").decode("ascii")
+
+
+def _format_floats(text: str) -> str:
+    '''
+    Rewrites the floats orjson formats differently from the standard library. Candidates are found with cheap literal searches,
+    and only their lines are checked, so documents without such floats are not re-scanned line by line.
+    '''
+    line_starts = set()
+    for match in _EXPONENT.finditer(text):
+        if text[match.start() - 1].isdigit():
+            line_starts.add(text.rfind("\n", 0, match.start()) + 1)
+    i = text.find("0.0000")
+    while i != -1:
+        line_starts.add(text.rfind("\n", 0, i) + 1)
+        i = text.find("0.0000", i + 1)
+    if not line_starts:
+        return text
+
+    parts, last = [], 0
+    for start in sorted(line_starts):
+        end = text.find("\n", start)
+        end = len(text) if end == -1 else end
+        match = _FLOAT_LINE.fullmatch(text, start, end)
+        if match:
+            parts += [text[last:start], match.group(1), repr(float(match.group(2))), match.group(3)]
+            last = end
+    parts.append(text[last:])
+    return "".join(parts)
+
+
+# ---------- Backends ----------
+def _stdlib_loads(text: Any) -> Any:
+    return json.loads(text)
+
+
+def _stdlib_dumps(obj: Any, indent: Optional[int]) -> str:
+    return json.dumps(obj, indent=indent)
+
+
+def _orjson_loads(text: Any) -> Any:
+    try:
+        return orjson.loads(text)
+    except orjson.JSONDecodeError:
+        # NaN/Infinity and integers beyond 64 bits are accepted by the standard library but not by orjson
+        return json.loads(text if isinstance(text, (str, bytes)) else str(text, "utf-8"))
+
+
+def _orjson_dumps(obj: Any, indent: Optional[int]) -> str:
+    if indent != 2: # orjson only has the 2-space layout; compact output uses different separators from json.dumps
+        return json.dumps(obj, indent=indent)
+    try:
+        text = orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode("utf-8")
+    except TypeError:
+        # Integers beyond 64 bits, non-string keys or other types orjson does not encode
+        return json.dumps(obj, indent=indent)
+    if "null" in text and _has_non_finite(obj):
+        return json.dumps(obj, indent=indent) # orjson writes NaN/Infinity as null
+    if not text.isascii():
+        text = _escape_non_ascii(text)
+    if "\x7f" in text: # ASCII, so an all-ASCII text may contain it too, but json.dumps escapes it
+        text = text.replace("\x7f", "\\u007f")
+    return _format_floats(text)
+
+
+def _has_non_finite(obj: Any) -> bool:
+    # Only called when orjson's output contains null, which is rare in app-configs
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, float) and (item != item or item in (float("inf"), float("-inf"))):
+            return True
+        if isinstance(item, dict):
+            stack.extend(item.values())
+        elif isinstance(item, list):
+            stack.extend(item)
+    return False
+
+
+def _ujson_loads(text: Any) -> Any:
+    try:
+        return ujson.loads(text)
+    except (ValueError, OverflowError):
+        return json.loads(text)
+
+
+# name -> (loads, dumps). ujson is only used for loading, as its float and escaping rules differ from the standard library
+BACKENDS: Dict[str, Any] = {"json": (_stdlib_loads, _stdlib_dumps)}
+if orjson:
+    BACKENDS["orjson"] = (_orjson_loads, _orjson_dumps)
+if ujson:
+    BACKENDS["ujson"] = (_ujson_loads, _orjson_dumps if orjson else _stdlib_dumps)
+
+_backend_name = ""
+_loads: Callable[[Any], Any] = _stdlib_loads
+_dumps: Callable[[Any, Optional[int]], str] = _stdlib_dumps
+
+
+def set_backend(name: Optional[str] = None) -> str:
+    '''
+    Selects the JSON backend. Without a name, picks UNTP_JSON_BACKEND if set, otherwise the fastest installed backend.
+
+    Returns:
+        str: The name of the selected backend.
+    '''
+    global _backend_name, _loads, _dumps
+    name = name or os.environ.get("UNTP_JSON_BACKEND") or ("orjson" if orjson else "ujson" if ujson else "json")
+    if name not in BACKENDS:
+        raise ValueError(f"JSON backend not available: {name} (available: {', '.join(BACKENDS)})")
+    _backend_name = name
+    _loads, _dumps = BACKENDS[name]
+    return name
+
+
+def get_backend() -> str:
+    return _backend_name
+
+
+def backend_signature() -> str:
+    # The selected backend and the versions of the optional parsers; dumps_compact() uses orjson whenever it is installed
+    orjson_version = getattr(orjson, "__version__", "none") if orjson else "none"
+    ujson_version = getattr(ujson, "__version__", "none") if ujson else "none"
+    return f"{_backend_name} orjson={orjson_version} ujson={ujson_version}"
+
+
+set_backend()
+
+
+# ---------- Load / dump ----------
+def loads(text: Any) -> Any:
+    return _loads(text)
+
+
+def dumps(obj: Any, indent: Optional[int] = 2) -> str:
+    '''
+    Serializes obj exactly like json.dumps(obj, indent=indent).
+    '''
+    return _dumps(obj, indent)
+
+
+def dumps_compact(obj: Any) -> str:
+    '''
+    Serializes obj on a single line. Unlike dumps(), the output depends on the backend: it only has to load back to the same object,
+    e.g. for cache entries and content hashes.
+    '''
+    if orjson and _backend_name != "json":
+        try:
+            text = orjson.dumps(obj).decode("utf-8")
+            if "null" not in text or not _has_non_finite(obj):
+                return text
+        except TypeError:
+            pass
+    return json.dumps(obj, separators=(",", ":"))
+
+
+def load(f: TextIO) -> Any:
+    # Reads the whole file, as json.load does
+    return _loads(f.read())
+
+
+def dump(obj: Any, f: TextIO, indent: Optional[int] = 2) -> None:
+    f.write(_dumps(obj, indent))
+
+
+def load_file(path: Any, use_mmap: Optional[bool] = None) -> Any:
+    '''
+    Loads a JSON file. Files of MMAP_THRESHOLD bytes or more (any non-empty file with use_mmap=True) are parsed from a read-only
+    memory map instead of a bytes copy of the file: orjson parses the mapped pages directly, and the other backends, or any backend
+    for files of LOW_MEMORY_SIZE bytes or more, decode them to str once and unmap them before parsing.
+    '''
+    with open(path, "rb") as f: # orjson and ujson parse bytes directly, skipping the decode to str
+        size = _mapped_size(f, use_mmap)
+        if size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped, memoryview(mapped) as view:
+                if _backend_name == "orjson" and size < LOW_MEMORY_SIZE:
+                    return _loads(view)
+                text = str(view, "utf-8")
+            return _loads(text) if _backend_name == "ujson" else json.loads(text)
+        data = f.read()
+    return _loads(data if _backend_name != "json" else data.decode("utf-8"))
+
+
+def read_text(path: Any, use_mmap: Optional[bool] = None) -> str:
+    # The file as str, decoded from a memory map under the same rule as load_file(), so the bytes and the str are never both held
+    with open(path, "rb") as f:
+        if _mapped_size(f, use_mmap):
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped, memoryview(mapped) as view:
+                return str(view, "utf-8")
+        return f.read().decode("utf-8")
+
+
+def _mapped_size(f: Any, use_mmap: Optional[bool]) -> int:
+    # The size of f if it is to be memory mapped, otherwise 0 (empty files cannot be mapped)
+    size = os.fstat(f.fileno()).st_size
+    return size if use_mmap or (use_mmap is None and size >= MMAP_THRESHOLD) else 0
+
+
+def dump_file(obj: Any, path: Any, indent: Optional[int] = 2) -> None:
+    with open(path, "w", encoding="utf-8") as f: # the output is ASCII unless a backend leaves characters unescaped
+        f.write(_dumps(obj, indent))
+
+
+# ---------- Example Usage ----------
+'''
+This code compares load and dump times of the available backends on the repo's sample files and checks the outputs are identical.
+'''
+if __name__ == "__main__":
+
+    ############## PARAMETERS & VARIABLES #####################
+
+    current_dir = Path(__file__).resolve().parent
+    sample_files = [
+        "01_Data/app-config/RBTP/untp-playground-test-v2&3/app-config.json",
+        "01_Data/app-config/RBTP/transformed-app-config-dfr-only-v4.json",
+        "01_Data/app-config/RegenFarmers/transformed-app-config.json",
+    ]
+    repeats = 5
+
+    ###########################################################
+
+    for sample_file in sample_files:
+        path = current_dir.parent / sample_file
+        with open(path, "rb") as f:
+            raw = f.read()
+        reference = json.dumps(json.loads(raw), indent=2)
+        print(f"{sample_file} ({len(raw) / 1e6:.2f} MB)")
+        for name in BACKENDS:
+            set_backend(name)
+            start = time.perf_counter()
+            for _ in range(repeats):
+                data = loads(raw if name != "json" else raw.decode("utf-8"))
+            load_time = (time.perf_counter() - start) / repeats
+            start = time.perf_counter()
+            for _ in range(repeats):
+                text = dumps(data)
+            dump_time = (time.perf_counter() - start) / repeats
+            print(f"  {name:>6}: load {load_time * 1000:7.2f} ms, dump {dump_time * 1000:7.2f} ms, identical output: {text == reference}")
+    set_backend()
@@ -0,0 +1,254 @@
+'''
+Offline JSON-LD expansion check of migrated app-configs.
+The UNTP playground rejects credentials whose JSON-LD expansion fails ("failed JSON-LD Document Expansion"), e.g. because of a term
+the contexts do not define, a "type" that does not expand to an IRI or a redefinition of a protected term. DFRTransformer fixes the
+cases found so far one by one (see DFR_RULES); this check finds such failures during migration instead of after an upload.
+
+Each migrated EntryData component is wrapped in the credential the reference implementation issues from it:
+    {"@context": ["https://www.w3.org/ns/credentials/v2", <service context>], "type": ["VerifiableCredential", <service type>],
+     "issuer": <vckit issuer>, "credentialSubject": <props.data>}
+and expanded with pyld. The contexts are read from a local cache directory that mirrors their URLs, e.g.
+    <cache>/test.uncefact.org/vocabulary/untp/dfr/0.6.0/index.json for https://test.uncefact.org/vocabulary/untp/dfr/0.6.0/
+Loaded documents stay in memory (OfflineDocumentLoader) and pyld keeps the processed contexts in its resolved-context cache,
+so a config with thousands of credentials parses each context once. fetch_contexts() fills the cache once with network access.
+The cache (01_Data/contexts) is not committed: a credential whose contexts are not cached cannot be checked, and check_config() raises
+ContextNotCached instead of passing it, unless allow_skipped=True, which returns the skipped credentials with the results.
+Needs the pyld package (pip install pyld).
+'''
+
+import os
+import sys
+import urllib.request
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+from urllib.parse import urldefrag, urlsplit
+
+import json_backend
+from schema_validation import TARGET_VERSIONS, iter_validation_items
+
+try:
+    from pyld import jsonld
+except ImportError: # optional dependency, only needed for the check
+    jsonld = None
+
+CONTEXT_DIR = Path(__file__).resolve().parent.parent / "01_Data" / "contexts"
+VC_CONTEXT = "https://www.w3.org/ns/credentials/v2"
+DEFAULT_CONTEXTS = [VC_CONTEXT, "https://test.uncefact.org/vocabulary/untp/dfr/0.6.0/"]
+
+# (app index, feature index, feature name, credential type, credential document) of one component to check
+CheckItem = Tuple[int, int, Optional[str], str, Dict[str, Any]]
+
+
+def context_cache_path(url: str, cache_dir: Any = CONTEXT_DIR) -> Path:
+    # https://test.uncefact.org/vocabulary/untp/dfr/0.6.0/ -> <cache_dir>/test.uncefact.org/vocabulary/untp/dfr/0.6.0/index.json
+    parts = urlsplit(urldefrag(url)[0])
+    path = parts.path.lstrip("/")
+    if not path or path.endswith("/"):
+        path += "index.json"
+    return Path(cache_dir) / parts.netloc / path
+
+
+def fetch_contexts(urls: List[str], cache_dir: Any = CONTEXT_DIR) -> List[Path]:
+    '''
+    This function downloads contexts into the cache, skipping files already cached. It is the only function of this module that uses the network.
+    Contexts the downloaded ones refer to are reported by check_config() as not cached; fetch those URLs the same way.
+    '''
+    fetched = []
+    for url in urls:
+        path = context_cache_path(url, cache_dir)
+        if path.exists():
+            continue
+        request = urllib.request.Request(url, headers={"Accept": "application/ld+json, application/json"})
+        with urllib.request.urlopen(request, timeout=30) as response:
+            data = response.read()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+        fetched.append(path)
+    return fetched
+
+
+# ---------- Document loader ----------
+class ContextNotCached(FileNotFoundError):
+    pass
+
+
+class OfflineDocumentLoader:
+    def __init__(self, cache_dir: Any = CONTEXT_DIR):
+        """
+        Initialize a pyld document loader that reads from cache_dir only. Each document is parsed once and kept in memory.
+        """
+        if jsonld is None:
+            raise ImportError("The JSON-LD check needs the pyld package: pip install pyld")
+        self.cache_dir = Path(cache_dir)
+        self.documents: Dict[str, Any] = {} # URL -> parsed document
+
+    def __call__(self, url: str, options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        document = self.documents.get(url)
+        if document is None:
+            path = context_cache_path(url, self.cache_dir)
+            if not path.exists():
+                raise ContextNotCached(f"Context {url} is not in the cache ({path}); run fetch_contexts() once with network access")
+            document = self.documents[url] = json_backend.load_file(path)
+        return {"contextUrl": None, "documentUrl": url, "document": document}
+
+
+@lru_cache(maxsize=None)
+def get_loader(cache_dir: str = str(CONTEXT_DIR)) -> OfflineDocumentLoader:
+    # One loader per cache directory and process, so every worker reads each context once
+    return OfflineDocumentLoader(cache_dir)
+
+
+# ---------- Check ----------
+def check_document(document: Dict[str, Any], loader: OfflineDocumentLoader) -> List[str]:
+    '''
+    This function expands a JSON-LD document and returns what makes its expansion fail in safe mode (as in the UNTP playground):
+    the expansion error, every property dropped because it is not defined by the contexts, and every "type" or "id" left as a relative IRI.
+    Raises ContextNotCached when a context the document needs is not in the cache.
+    '''
+    dropped = []
+    try:
+        expanded = jsonld.expand(document, {"documentLoader": loader}, on_property_dropped=dropped.append)
+    except jsonld.JsonLdError as e:
+        cause = e.__cause__
+        while cause is not None:
+            if isinstance(cause, ContextNotCached):
+                raise cause
+            cause = cause.__cause__
+        term = e.details.get("term") if isinstance(e.details, dict) else None
+        return [f"{e.code or e.type}: {e.args[0] if e.args else e}" + (f" ({term})" if term else "")]
+    problems = [f"undefined term dropped: {term}" for term in dict.fromkeys(dropped)]
+    return problems + [f"relative IRI: {iri}" for iri in _relative_iris(expanded)]
+
+
+def _relative_iris(expanded: Any) -> Iterator[str]:
+    # "@type" and "@id" values that did not expand to absolute IRIs (blank nodes "_:..." have a ":" too)
+    stack = [expanded]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, dict):
+            types = item.get("@type", [])
+            for value in types if isinstance(types, list) else [types]:
+                if isinstance(value, str) and ":" not in value and not value.startswith("@"):
+                    yield f'@type "{value}"'
+            value = item.get("@id")
+            if isinstance(value, str) and ":" not in value:
+                yield f'@id "{value}"'
+            stack.extend(item.values())
+        elif isinstance(item, list):
+            stack.extend(item)
+
+
+def credential_for(feature: Dict[str, Any], data: Dict[str, Any]) -> Dict[str, Any]:
+    '''
+    This function builds the credential the reference implementation issues from a component's data, taking the context, type and
+    issuer from the feature's "process..." service: the parameter with "context" and "type" (e.g. "digitalFacilityRecord") and "vckit".
+    Without such a service the DFR 0.6.0 context is used.
+    '''
+    contexts, types, issuer = DEFAULT_CONTEXTS[1:], [], None
+    for service in feature.get("services", []):
+        if not service.get("name", "").startswith("process"):
+            continue
+        for parameters in service.get("parameters", []):
+            for value in parameters.values():
+                if isinstance(value, dict) and "context" in value and "type" in value:
+                    contexts, types = value["context"], value["type"]
+            issuer = parameters.get("vckit", {}).get("issuer", issuer)
+    credential = {"@context": [VC_CONTEXT] + [url for url in contexts if url != VC_CONTEXT], "type": ["VerifiableCredential"] + list(types)}
+    if issuer is not None:
+        credential["issuer"] = issuer
+    credential["credentialSubject"] = data
+    return credential
+
+
+def iter_check_items(config: Dict[str, Any], versions: Tuple[str, ...] = TARGET_VERSIONS) -> Iterator[CheckItem]:
+    # The credential of every migrated EntryData component (the components schema_validation.py validates)
+    apps = config.get("apps", [])
+    for app_index, feature_index, name, credential_type, _, data in iter_validation_items(config, versions):
+        yield app_index, feature_index, name, credential_type, credential_for(apps[app_index]["features"][feature_index], data)
+
+
+def _check_items(cache_dir: str, items: List[CheckItem]) -> List[Any]:
+    # The problems of each item, or the reason it could not be checked (str) when a context is not cached
+    loader = get_loader(cache_dir)
+    results = []
+    for *_, document in items:
+        try:
+            results.append(check_document(document, loader))
+        except ContextNotCached as e:
+            results.append(str(e))
+    return results
+
+
+def check_config(config: Dict[str, Any], cache_dir: Any = CONTEXT_DIR, max_workers: Optional[int] = None,
+                 versions: Tuple[str, ...] = TARGET_VERSIONS, allow_skipped: bool = False) -> Tuple[int, List[Dict[str, Any]], Dict[str, int]]:
+    '''
+    This function expands the credential of every migrated EntryData component of config with the cached contexts.
+
+    Args:
+        config (Dict[str, Any]): A transformed app-config, e.g. the output of AppConfigProcessor.process().
+        cache_dir: The context cache (see fetch_contexts()).
+        max_workers (int, optional): Worker processes to check in; None or 1 checks in this process.
+        versions: Schema versions of the components to check; components of other versions were not migrated and are skipped.
+        allow_skipped (bool): Return the credentials needing a context that is not cached as skipped instead of raising ContextNotCached.
+
+    Returns:
+        Tuple[int, List[Dict[str, Any]], Dict[str, int]]: The number of credentials checked, one entry per failing credential with
+        "app", "feature", "name", "credential_type" and "errors", and the number of skipped credentials per reason.
+    '''
+    cache_dir = str(cache_dir)
+    items = list(iter_check_items(config, versions))
+    workers = min(max_workers or 1, os.cpu_count() or 1, len(items))
+    if workers <= 1:
+        results = _check_items(cache_dir, items)
+    else:
+        size = max(1, len(items) // (workers * 4)) # a few chunks per worker keeps the pickling overhead low
+        chunks = [items[i:i + size] for i in range(0, len(items), size)]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = [problems for chunk in executor.map(_check_items, [cache_dir] * len(chunks), chunks) for problems in chunk]
+
+    failures, skipped = [], {}
+    for (app_index, feature_index, name, credential_type, _), problems in zip(items, results):
+        if isinstance(problems, str):
+            skipped[problems] = skipped.get(problems, 0) + 1
+        elif problems:
+            failures.append({"app": app_index, "feature": feature_index, "name": name, "credential_type": credential_type, "errors": problems})
+    if skipped and not allow_skipped:
+        raise ContextNotCached(f"{sum(skipped.values())}/{len(items)} credential(s) could not be checked: " + "; ".join(skipped))
+    return len(items) - sum(skipped.values()), failures, skipped
+
+
+# ---------- Example Usage ----------
+'''
+This code expands the credentials of a transformed app-config with the cached contexts and prints the ones that fail.
+Set fetch = True once, with network access, to fill the cache with the W3C VC v2 and UNTP DFR 0.6.0 contexts.
+The script exits with status 1 when a credential fails, and raises ContextNotCached when one cannot be checked (see allow_skipped).
+'''
+if __name__ == "__main__":
+
+    ############## PARAMETERS & VARIABLES #####################
+
+    current_dir = Path(__file__).resolve().parent
+
+    input_path = current_dir.parent / "01_Data/app-config/RBTP" / "transformed-app-config-v5.json"
+    context_dir = CONTEXT_DIR
+    max_workers = None # e.g. os.cpu_count() for large configs
+    fetch = False
+    allow_skipped = False # True reports credentials whose contexts are not cached instead of failing
+
+    ###########################################################
+
+    if fetch:
+        for path in fetch_contexts(DEFAULT_CONTEXTS, context_dir):
+            print(f"Cached {path}")
+    checked, failures, skipped = check_config(json_backend.load_file(input_path), context_dir, max_workers, allow_skipped=allow_skipped)
+    for reason, count in skipped.items():
+        print(f"Skipped {count} credential(s): {reason}")
+    for failure in failures:
+        print(f"app {failure['app']} feature {failure['feature']} ({failure['name']}, {failure['credential_type']}):")
+        for error in failure["errors"]:
+            print(f"  {error}")
+    print(f"JSON-LD check complete! {checked - len(failures)}/{checked} credentials expand.")
+    if failures:
+        sys.exit(1)
@@ -0,0 +1,60 @@
+'''
+Order-preserving key renames.
+The original _pop_and_replace_key copied the whole dict into a new dict, cleared it and updated it again for every rename.
+- rename_key() renames in place and only re-inserts the keys after the renamed one, so no copy of the dict is built.
+- rename_keys() applies several renames to one dict in a single pass.
+'''
+
+from typing import Dict, Any
+
+
+# ---------- Plain dict renames ----------
+def rename_key(d: Dict[str, Any], old_key: str, new_key: str) -> Any:
+    """
+    Works like dict.pop(), but renames the key in-place while keeping its original position in the dict.
+    Only the keys after old_key are moved (walking from the end of the dict), so renames near the end cost almost nothing
+    and no copy of the dict is made.
+
+    Returns:
+        Any: The value of the renamed key, or None if old_key is not in the dict.
+    """
+    if old_key not in d:
+        return None
+    value = d[old_key]
+    if old_key == new_key:
+        return value
+    if new_key in d: # rare collision: keep exactly what the copy-based rename produced
+        rename_keys(d, {old_key: new_key})
+        return value
+    tail = []
+    for key in reversed(d):
+        if key == old_key:
+            break
+        tail.append(key)
+    tail_items = [(key, d.pop(key)) for key in reversed(tail)]
+    del d[old_key]
+    d[new_key] = value
+    d.update(tail_items)
+    return value
+
+
+def rename_keys(d: Dict[str, Any], renames: Dict[str, str]) -> Dict[str, Any]:
+    """
+    Renames several keys of d in one pass, keeping their positions. Cheaper than one rename_key() call per key.
+    """
+    if any(key in d for key in renames):
+        items = [(renames.get(key, key), value) for key, value in d.items()]
+        d.clear()
+        d.update(items)
+    return d
+
+
+# ---------- Example Usage ----------
+'''
+This code renames "otherIdentifier" to "facilityAlsoKnownAs" in a 0.5.0 facility object and prints the keys in their new order.
+'''
+if __name__ == "__main__":
+
+    facility = {"id": "https://example.com/facility/1", "name": "Regen Farm", "otherIdentifier": [], "address": {}}
+    rename_key(facility, "otherIdentifier", "facilityAlsoKnownAs")
+    print(list(facility))
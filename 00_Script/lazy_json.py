@@ -0,0 +1,216 @@
+'''
+Lazy JSON documents.
+The DFR migration only reads and writes the components and some services of each feature, yet a full load parses, and a full dump
+re-serializes, every sibling blob such as "styles", "assets", "generalFeatures" and the services of features without a credential type.
+
+load_lazy() only builds the containers on the lazy paths (by default the document, its apps and their features, "apps[].features[]").
+Every other value is kept as a RawJson slice of the source text and parsed the first time it is read through the dict API, e.g.
+feature["components"] or feature.get("services"). The parsed value replaces the slice, so transformers always work on plain dicts and lists.
+JsonStreamWriter writes RawJson slices back verbatim, so untouched values are never parsed into objects or serialized again.
+
+The slices keep their input formatting, so the output is the same JSON as an eager load and dump, and the same text when the input
+is in json.dump(indent=2) layout (e.g. a config written by this pipeline).
+Finding the end of a skipped value uses the C scanner of the json module; its result is discarded straight away.
+'''
+
+import json
+import re
+from json.decoder import scanstring
+from json.scanner import make_scanner
+from typing import Dict, Any, Iterable, List, Tuple
+
+import json_backend
+
+DEFAULT_LAZY_PATHS = ("apps[].features[]",)
+
+_scan_once = make_scanner(json.JSONDecoder())
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+# key -> (is an array of objects, lazy paths below it)
+PathTree = Dict[str, Tuple[bool, "PathTree"]]
+
+
+class RawJson:
+    __slots__ = ("text",)
+
+    def __init__(self, text: str):
+        self.text = text # the value exactly as it appears in the source
+
+    def parse(self) -> Any:
+        return json_backend.loads(self.text)
+
+
+class LazyArray(list):
+    # Array on a lazy path; its objects are LazyObjects
+    pass
+
+
+class LazyObject(dict):
+    '''
+    dict whose values may still be RawJson slices. Reading a value parses it once and stores the result in place of the slice.
+    dict.__getitem__(obj, key) returns a value without parsing it, as the writer does.
+    dict(obj) and {**obj} bypass the overrides and return a plain dict holding the slices, which only JsonStreamWriter can write;
+    copy with obj.copy() (or copy.copy(obj)) instead, which returns a LazyObject carrying the unparsed slices along.
+    '''
+
+    def __getitem__(self, key: str) -> Any:
+        value = dict.__getitem__(self, key)
+        if type(value) is RawJson:
+            value = value.parse()
+            dict.__setitem__(self, key, value)
+        return value
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self[key] if key in self else default
+
+    def pop(self, key: str, *default: Any) -> Any:
+        if key in self:
+            value = self[key]
+            dict.__delitem__(self, key)
+            return value
+        return dict.pop(self, key, *default)
+
+    def setdefault(self, key: str, default: Any = None) -> Any:
+        if key in self:
+            return self[key]
+        dict.__setitem__(self, key, default)
+        return default
+
+    def values(self) -> List[Any]:
+        return [self[key] for key in self]
+
+    def items(self) -> List[Tuple[str, Any]]:
+        return [(key, self[key]) for key in self]
+
+    def copy(self) -> "LazyObject":
+        # Shallow copy that shares the RawJson slices (they are never modified) and parses them when read, like the original
+        new = LazyObject()
+        for key in self:
+            dict.__setitem__(new, key, dict.__getitem__(self, key))
+        return new
+
+    __copy__ = copy
+
+    def is_parsed(self, key: str) -> bool:
+        return type(dict.__getitem__(self, key)) is not RawJson
+
+
+# ---------- Loading ----------
+def _path_tree(lazy_paths: Iterable[str]) -> PathTree:
+    # "apps[].features[]" -> {"apps": (True, {"features": (True, {})})}
+    tree: PathTree = {}
+    for path in lazy_paths:
+        node = tree
+        for segment in path.split("."):
+            key, iterate = (segment[:-2], True) if segment.endswith("[]") else (segment, False)
+            if key not in node:
+                node[key] = (iterate, {})
+            node = node[key][1]
+    return tree
+
+
+def _skip_whitespace(text: str, pos: int) -> int:
+    return _WHITESPACE.match(text, pos).end()
+
+
+def _error(message: str, text: str, pos: int) -> json.JSONDecodeError:
+    return json.JSONDecodeError(message, text, pos)
+
+
+def _raw_value(text: str, pos: int) -> Tuple[RawJson, int]:
+    try:
+        _, end = _scan_once(text, pos)
+    except StopIteration:
+        raise _error("Expecting value", text, pos) from None
+    return RawJson(text[pos:end]), end
+
+
+def _parse_object(text: str, pos: int, tree: PathTree) -> Tuple[LazyObject, int]:
+    # text[pos] is "{"
+    obj = LazyObject()
+    pos = _skip_whitespace(text, pos + 1)
+    if text.startswith("}", pos):
+        return obj, pos + 1
+    while True:
+        if not text.startswith('"', pos):
+            raise _error("Expecting property name enclosed in double quotes", text, pos)
+        key, pos = scanstring(text, pos + 1)
+        pos = _skip_whitespace(text, pos)
+        if not text.startswith(":", pos):
+            raise _error("Expecting ':' delimiter", text, pos)
+        pos = _skip_whitespace(text, pos + 1)
+        if key in tree:
+            value, pos = _parse_lazy(text, pos, *tree[key])
+        else:
+            value, pos = _raw_value(text, pos)
+        dict.__setitem__(obj, key, value)
+        pos = _skip_whitespace(text, pos)
+        if text.startswith(",", pos):
+            pos = _skip_whitespace(text, pos + 1)
+        elif text.startswith("}", pos):
+            return obj, pos + 1
+        else:
+            raise _error("Expecting ',' delimiter", text, pos)
+
+
+def _parse_array(text: str, pos: int, tree: PathTree) -> Tuple[LazyArray, int]:
+    # text[pos] is "["; objects are parsed lazily, anything else is kept raw
+    array = LazyArray()
+    pos = _skip_whitespace(text, pos + 1)
+    if text.startswith("]", pos):
+        return array, pos + 1
+    while True:
+        item, pos = _parse_object(text, pos, tree) if text.startswith("{", pos) else _raw_value(text, pos)
+        array.append(item)
+        pos = _skip_whitespace(text, pos)
+        if text.startswith(",", pos):
+            pos = _skip_whitespace(text, pos + 1)
+        elif text.startswith("]", pos):
+            return array, pos + 1
+        else:
+            raise _error("Expecting ',' delimiter", text, pos)
+
+
+def _parse_lazy(text: str, pos: int, iterate: bool, tree: PathTree) -> Tuple[Any, int]:
+    # A value on a lazy path: an object, or an array of objects for "key[]"; anything else on the path is kept raw
+    if iterate and text.startswith("[", pos):
+        return _parse_array(text, pos, tree)
+    if not iterate and text.startswith("{", pos):
+        return _parse_object(text, pos, tree)
+    return _raw_value(text, pos)
+
+
+def load_lazy(text: str, lazy_paths: Iterable[str] = DEFAULT_LAZY_PATHS) -> Any:
+    '''
+    This function loads a JSON document, building only the objects on lazy_paths (rule_engine path syntax, "key[]" for an array of objects).
+
+    Returns:
+        Any: A LazyObject for an object document; values not on the lazy paths are RawJson slices until read.
+    '''
+    pos = _skip_whitespace(text, 0)
+    value, pos = _parse_lazy(text, pos, False, _path_tree(lazy_paths))
+    if _skip_whitespace(text, pos) != len(text):
+        raise _error("Extra data", text, pos)
+    return value
+
+
+def load_file(path: Any, lazy_paths: Iterable[str] = DEFAULT_LAZY_PATHS) -> Any:
+    text = json_backend.read_text(path) # decoded from a memory map for large files
+    if "\r" in text: # newlines as a text-mode open() reads them, since RawJson slices are written back as they are
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return load_lazy(text, lazy_paths)
+
+
+def unparsed_size(value: Any) -> int:
+    # Characters of source text still held as RawJson below value, i.e. the part of the document nothing has read
+    total = 0
+    stack = [value]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, LazyObject):
+            stack.extend(dict.values(item))
+        elif isinstance(item, LazyArray):
+            stack.extend(item)
+        elif type(item) is RawJson:
+            total += len(item.text)
+    return total
@@ -1,7 +1,22 @@
-import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, Any, List
-from dfr import DFRTransformer, CredentialTransformer
+from typing import Dict, Any, List, Optional, Tuple
+import config_diff
+import json_backend
+import lazy_json
+from dfr import CredentialTransformer # importing dfr registers DFRTransformer
+from transformer_registry import TransformerRegistry
+from stream_io import JsonStreamReader, JsonStreamWriter
+from copy_on_write import copy_paths
+from credential_classifier import MODEL_TYPES, classify_schema_url, component_schema_url
+from feature_cache import FeatureCache
+from feature_index import FeatureIndex, FeatureTypes, dump_features, dump_indexed, feature_name, feature_type
+from metrics import MetricsCollector, NULL_METRICS
+from schema_validation import SCHEMA_DIR, validate_config
+from jsonld_check import CONTEXT_DIR, check_config
+from template_registry import TemplateRegistry, TEMPLATES_KEY, reference_feature_templates, share_templates
 
 
 
@@ -36,102 +51,394 @@ class GeneralMigrator:
 # ---------- Orchestrator / Master Function ----------
 # This class processes the entire app-config.json, applies transformations based on credential types
 class AppConfigProcessor:
-    def __init__(self, config_path: str):
+    def __init__(self, config_path: str, streaming: bool = False, metrics: Optional[MetricsCollector] = None, lazy: bool = False, quiet: bool = False):
         self.config_path = Path(config_path)
-        self.config_data = self.load_config()
+        # With quiet=True progress messages are kept in self.messages instead of printed, e.g. when several configs are transformed in threads
+        self.quiet = quiet
+        self.messages: List[str] = []
+        # With lazy=True only the apps and features are built up front; everything else is parsed when read (see lazy_json.py)
+        self.lazy = lazy
+        # Stage durations and counters are reported to metrics (see metrics.py); the default collector records nothing
+        self.metrics = metrics or NULL_METRICS
+        # (app index, feature index) -> credential type the last process run transformed the feature as, None without a registered transformer.
+        # The index records the classified type of every feature instead (see feature_index.py)
+        self.feature_types: FeatureTypes = {}
+        # In streaming mode the config is read feature by feature in process_streaming(), so it is not loaded up front
+        self.config_data = None if streaming else self.load_config()
 
     def load_config(self) -> Dict[str, Any]:
-        # This function loads the app-config from a JSON file.
-        with open(self.config_path, "r") as f:
-            return json.load(f)
+        # This function loads the app-config from a JSON file, using the fastest installed JSON backend and a memory map for large files (see json_backend.py).
+        with self.metrics.stage("load"):
+            if self.lazy:
+                return lazy_json.load_file(self.config_path)
+            return json_backend.load_file(self.config_path)
 
-    def process(self) -> Dict[str, Any]:
+    def process(self, max_workers: Optional[int] = None) -> Dict[str, Any]:
         # This function processes the app configuration and applies necessary transformations.
+        # With max_workers > 1 the features are transformed concurrently (see _process_parallel)
         # json_list = []
+        if max_workers and max_workers > 1:
+            return self._process_parallel(max_workers)
+
         apps = self.config_data.get("apps", [])
         
-        for app in apps:
+        for app_index, app in enumerate(apps):
             features = app.get("features", [])
-            for feature in features:
-                components = feature.get("components", [])
-                services = feature.get("services", [])
-
-                # Initialize credential_type to None
-                credential_type = None
-
-                for component in components: # update component
-                    if component.get("type") == "EntryData": #only process 
-                        # Identifies either 2 types of JSON structures: "LocalStorageLoader/NestedComponents" and standard "JsonForm"
-                        # If "LocalStorageLoader" is found, then processes nested components. Otherwise, processes standard "JsonForm"
-                        if component.get("name") == "LocalStorageLoader": 
-                            nestedcomponents = component['props']['nestedComponents']
-                            if len(nestedcomponents) == 1: # Assumes single nested component
-                                schema_url = nestedcomponents[0]["props"]["schema"]["url"]
-                            else:
-                                print('Multiple nested components found. Please investigate')
-                                break
-                        else:
-                            schema_url = component["props"]["schema"]["url"]
-                        # Detect type from schema URL
-                        if "DigitalFacilityRecord" in schema_url:
-                            credential_type = "DFR"
-                        # elif "DigitalTraceabilityEvent" in schema_url:
-                        #     credential_type = "DTE"
-                        # elif "DigitalProductPassport" in schema_url:
-                        #     credential_type = "DPP"
-                        # elif "DigitalConformityCredential" in schema_url:
-                        #     credential_type = "DCC"
-                        # elif "DigitalIdentityAnchor" in schema_url:
-                        #     credential_type = "DIA"
-                        else:
-                            print('Unknown type of credential. Please investigate')
-                            continue  # Skip unknown
-                        
-                        # This transformer applies structural changes to "apps" -> "features" -> "components"
-                        transformer = TransformerFactory.get_transformer(credential_type, component) # Gets the transformer name, such as DFRTransformer
-                        transformed_component = transformer.transform()
+            for feature_index, feature in enumerate(features):
+                _, self.feature_types[(app_index, feature_index)] = self.transform_feature(feature)
+        return self.config_data #, json_list
+
+    def _process_parallel(self, max_workers: int) -> Dict[str, Any]:
+        '''
+        Transforms the features over a ProcessPoolExecutor. Each feature only touches its own subtree, so features are independent.
+        executor.map returns results in submission order, and each result is written back to its original position,
+        so the output is identical to the serial loop.
+        The workers do not share the metrics collector, so only the per-feature stages of the serial fallback are recorded.
+        The workers run quietly and return their progress messages with each result; they are logged here in feature order.
+        '''
+        feature_lists = [app.get("features", []) for app in self.config_data.get("apps", [])]
+        features = [feature for feature_list in feature_lists for feature in feature_list]
+        if not features:
+            return self.config_data
+
+        workers = min(max_workers, os.cpu_count() or 1, len(features))
+        if workers == 1: # a single worker would only add pickling overhead to the serial loop
+            return self.process()
+        chunksize = max(1, len(features) // (workers * 4)) # a few chunks per worker keeps the pickling overhead low
+        worker_processor = AppConfigProcessor(self.config_path, streaming=True, quiet=True) # lightweight copy without the loaded config, sent to the workers
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = iter(executor.map(worker_processor._transform_feature_logged, features, chunksize=chunksize))
+            for app_index, feature_list in enumerate(feature_lists):
+                for i in range(len(feature_list)):
+                    feature_list[i], self.feature_types[(app_index, i)], messages = next(results)
+                    for message in messages: # logged here, in feature order, so quiet runs keep them in self.messages
+                        self.log(message)
+        return self.config_data
+
+    def _transform_feature_logged(self, feature: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[str], List[str]]:
+        # Worker side of _process_parallel: transform_feature() plus the messages it logged, which would otherwise stay in the worker's copy
+        start = len(self.messages)
+        feature, credential_type = self.transform_feature(feature)
+        messages = self.messages[start:]
+        del self.messages[start:]
+        return feature, credential_type, messages
+
+    def log(self, message: str) -> None:
+        # Prints a progress message, or keeps it in self.messages when quiet
+        if self.quiet:
+            self.messages.append(message)
+        else:
+            print(message)
+
+    def process_feature(self, feature: Dict[str, Any]) -> Dict[str, Any]:
+        '''
+        This function applies the transformations to a single feature ("apps" -> "features" -> feature) in place.
+        Each feature only touches its own components and services, so it can be processed independently of the rest of the config.
+        '''
+        return self.transform_feature(feature)[0]
+
+    def transform_feature(self, feature: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[str]]:
+        # Same as process_feature(), also returning the credential type found in the feature (None if there is none)
+        metrics = self.metrics
+        components = feature.get("components", [])
+
+        # Initialize credential_type to None
+        credential_type = None
+
+        for component in components: # update component
+            if component.get("type") == "EntryData": #only process 
+                with metrics.stage("type_detection"):
+                    schema_url = component_schema_url(component)
+                    detected_type = self._detect_credential_type(schema_url) if schema_url is not None else None
+                if schema_url is None:
+                    metrics.count("components.skipped", credential_type)
+                    self.log('Multiple nested components found. Please investigate')
+                    break
+                if detected_type is None:
+                    metrics.count("components.unknown")
+                    self.log('Unknown type of credential. Please investigate')
+                    continue  # Skip unknown
+                credential_type = detected_type
+                
+                # This transformer applies structural changes to "apps" -> "features" -> "components"
+                with metrics.stage("component_transform"):
+                    transformer = TransformerFactory.get_transformer(credential_type) # Gets the shared transformer, such as DFRTransformer
+                    transformed_component = transformer.transform(component)
+                    # Update the component in place
+                    component.update(transformed_component)
+                metrics.count("components.transformed", credential_type)
+            else:
+                metrics.count("components.skipped")
+
+        if credential_type: # If a valid credential type was found
+            # The below transformer applies structural changes to "apps" -> "features" -> "services"
+            for service in feature.get("services", []): # update services (read only now, so lazily loaded services of untyped features stay unparsed)
+                if service['name'].startswith('process'):
+                    # Apply transformation for services specific to the credential types
+                    with metrics.stage("service_transform"):
+                        transformer = TransformerFactory.get_transformer(credential_type)
+                        transformed_component = transformer.transform_services(service)
                         # Update the component in place
-                        component.update(transformed_component)
-
-                if credential_type: # If a valid credential type was found
-                    # The below transformer applies structural changes to "apps" -> "features" -> "services"
-                    for service in services: # update services 
-                        if service['name'].startswith('process'):
-                            # Apply transformation for services specific to the credential types
-                            transformer = TransformerFactory.get_transformer(credential_type, service)
-                            transformed_component = transformer.transform_services()
-                            # Update the component in place
-                            service.update(transformed_component)
-                            # Apply general migration transformation to all credential types
-                            transformed_component = GeneralMigrator.migrate_general_v_050_to_v_060(service)
-                            # Update the component in place
-                            service.update(transformed_component)
+                        service.update(transformed_component)
+                    # Apply general migration transformation to all credential types
+                    with metrics.stage("general_migration"):
+                        transformed_component = GeneralMigrator.migrate_general_v_050_to_v_060(service)
+                        # Update the component in place
+                        service.update(transformed_component)
+                    metrics.count("services.transformed", credential_type)
                 else:
-                    print("No valid credential type found.")
-        return self.config_data #, json_list
+                    metrics.count("services.skipped", credential_type)
+            metrics.count("features.transformed", credential_type)
+        else:
+            metrics.count("features.untyped")
+            self.log("No valid credential type found.")
+        return feature, credential_type
+
+    @staticmethod
+    def _detect_credential_type(schema_url: str) -> Optional[str]:
+        # Detect type from schema URL (see credential_classifier.py); types without a registered transformer are treated as unknown
+        schema = classify_schema_url(schema_url)
+        if schema and schema.credential_type in TransformerFactory.transformers:
+            return schema.credential_type
+        return None
+
+    def process_copy_on_write(self) -> Dict[str, Any]:
+        '''
+        Copy-on-write version of process(): returns the transformed config and leaves self.config_data untouched.
+        Only the parts of each component and service a transformer writes to are copied (see TransformerFactory.write_paths);
+        every other subtree is shared between the input and the output, so both can be kept for diffing or rollback.
+        In lazy mode a feature whose unparsed components name no model with a registered transformer is shared as it is, so its
+        components and services stay unparsed in both (see _may_transform).
+        '''
+        component_paths, service_paths = TransformerFactory.write_paths()
+        # .copy() and type(...)() keep a lazily loaded config lazy: its unparsed values are carried to the output as RawJson slices
+        output = self.config_data.copy()
+        apps = output.get("apps", [])
+        output["apps"] = type(apps)()
+        for app_index, app in enumerate(apps):
+            new_app = app.copy()
+            features = app.get("features", [])
+            new_app["features"] = type(features)()
+            for feature_index, feature in enumerate(features):
+                if not self._may_transform(feature):
+                    self.metrics.count("features.untyped")
+                    self.feature_types[(app_index, feature_index)] = None
+                    new_app["features"].append(feature)
+                    continue
+                new_feature, self.feature_types[(app_index, feature_index)] = self.transform_feature(
+                    self._copy_feature_for_write(feature, component_paths, service_paths))
+                new_app["features"].append(new_feature)
+            output["apps"].append(new_app)
+        return output
+
+    @staticmethod
+    def _may_transform(feature: Any) -> bool:
+        # False for a lazily loaded feature without components, or whose components are still a RawJson slice that mentions no model
+        # name of a registered transformer, which transform_feature() would leave unchanged; parsed features are always transformed
+        if not isinstance(feature, lazy_json.LazyObject):
+            return True
+        if "components" not in feature:
+            return False
+        if feature.is_parsed("components"):
+            return True
+        raw = dict.__getitem__(feature, "components").text
+        return any(model in raw for model in TransformerFactory.model_names())
+
+    def _copy_feature_for_write(self, feature: Dict[str, Any], component_paths: List[Tuple[str, ...]], service_paths: List[Tuple[str, ...]]) -> Dict[str, Any]:
+        # Copies only what process_feature can modify: the EntryData components and the "process..." services.
+        # Unparsed RawJson slices are not copied: reading one through the copy parses fresh objects into the copy only
+        new_feature = feature.copy()
+        lazy = isinstance(feature, lazy_json.LazyObject)
+        if "components" in feature and (not lazy or feature.is_parsed("components")):
+            new_feature["components"] = [
+                copy_paths(component, component_paths) if component.get("type") == "EntryData" else component
+                for component in feature["components"]
+            ]
+        if "services" in feature and (not lazy or feature.is_parsed("services")):
+            new_feature["services"] = [
+                copy_paths(service, service_paths) if service['name'].startswith('process') else service
+                for service in feature["services"]
+            ]
+        return new_feature
+
+    def write_output(self, output: Dict[str, Any], output_path: str, index: bool = False) -> Optional[FeatureIndex]:
+        '''
+        Writes the transformed config to output_path feature by feature, so the text of the whole config is never built in memory.
+        With index=True a sidecar index (<output>.index.json) also maps each feature to its credential type and byte range,
+        so features can be extracted without re-parsing. The output file is the same either way.
+        An eagerly loaded config is written exactly as json.dump(indent=2) writes it. A lazily loaded config is written with its
+        unparsed values copied verbatim, which is the same JSON, and the same text when the input was in json.dump(indent=2) layout.
+        '''
+        with self.metrics.stage("dump"):
+            if index:
+                return dump_indexed(output, output_path)
+            if isinstance(output, lazy_json.LazyObject):
+                with open(output_path, "w", encoding="utf-8") as f:
+                    JsonStreamWriter(f).value(output)
+            else:
+                dump_features(output, output_path)
+        return None
+
+    def validate(self, output: Dict[str, Any], schema_dir: Any = SCHEMA_DIR, max_workers: Optional[int] = None) -> List[Dict[str, Any]]:
+        '''
+        Validates the migrated "props" -> "data" of every component in output against the cached 0.6.0 schemas, without network access
+        (see schema_validation.py), and returns one failure per invalid component with its app, feature and errors.
+        Raises SchemaNotCached when a component cannot be validated because its schema is not in schema_dir.
+        '''
+        with self.metrics.stage("validate"):
+            validated, failures, _ = validate_config(output, schema_dir, max_workers)
+        self.metrics.count("components.validated", n=validated)
+        for failure in failures:
+            self.metrics.count("components.invalid", failure["credential_type"])
+        return failures
+
+    def check_jsonld(self, output: Dict[str, Any], context_dir: Any = CONTEXT_DIR, max_workers: Optional[int] = None) -> List[Dict[str, Any]]:
+        '''
+        Expands the credential issued from every migrated component in output with the cached JSON-LD contexts, without network access
+        (see jsonld_check.py), and returns one failure per credential whose expansion fails, with its app, feature and errors.
+        Raises ContextNotCached when a credential cannot be checked because a context it needs is not in context_dir.
+        '''
+        with self.metrics.stage("jsonld_check"):
+            checked, failures, _ = check_config(output, context_dir, max_workers)
+        self.metrics.count("credentials.expanded", n=checked)
+        for failure in failures:
+            self.metrics.count("credentials.expansion_failed", failure["credential_type"])
+        return failures
+
+    def write_diff(self, output: Dict[str, Any], output_path: str) -> Path:
+        '''
+        Writes the structural diff of self.config_data and output next to the output (<output>.diff.json, see config_diff.py) and returns its path.
+        process() transforms self.config_data in place, so output must come from process_copy_on_write().
+        Not supported for a lazily loaded config, whose unparsed values would be compared as RawJson slices instead of JSON values.
+        '''
+        if self.lazy:
+            raise ValueError("write_diff() needs an eagerly loaded config; create the AppConfigProcessor with lazy=False")
+        with self.metrics.stage("diff"):
+            diff_path = config_diff.write_diff(self.config_data, output, output_path)
+        return diff_path
+
+    def process_incremental(self, output_path: str, cache: FeatureCache, index: bool = False) -> Optional[FeatureIndex]:
+        '''
+        Incremental version of process() + write_output(): a feature that is unchanged since the last run
+        is copied as output text from the cache (see feature_cache.py), so only the changed features are transformed and serialized.
+        The output is byte-identical to a full run, and the cache is saved for the next run once the output is written.
+        self.config_data is left as loaded for the cached features.
+        '''
+        written_index = FeatureIndex(output_path) if index else None
+        metrics = self.metrics
+
+        def write_feature(writer: JsonStreamWriter, app_index: int, feature_index: int, feature: Dict[str, Any]) -> None:
+            with metrics.stage("cache_lookup"):
+                key = cache.key(feature)
+                cached = cache.lookup(key)
+            if cached:
+                credential_type, text = cached
+                metrics.count("features.cached", credential_type)
+            else:
+                _, credential_type = self.transform_feature(feature)
+                with metrics.stage("dump"):
+                    text = writer.serialize(feature)
+                cache.store(key, credential_type, text)
+            self.feature_types[(app_index, feature_index)] = credential_type
+            offset, length = writer.raw_value(text)
+            if written_index:
+                written_index.add(app_index, feature_index, feature_name(feature), feature_type(feature), offset, length)
+
+        dump_features(self.config_data, output_path, write_feature)
+        cache.save()
+        if written_index:
+            written_index.save()
+        return written_index
+
+    def process_streaming(self, output_path: str, shared_templates: bool = False, index: bool = False) -> Optional[FeatureIndex]:
+        '''
+        Streaming version of process(): reads "apps" -> "features" one feature at a time, transforms it and writes it straight to output_path.
+        Only one feature is held in memory at a time, and the output is byte-identical to json.dump(process(), f, indent=2).
+        With shared_templates=True the render templates are written once at the end, as share_templates() does for the batch output.
+        With index=True the sidecar index is written as by write_output(index=True) and returned.
+        '''
+        self._index = FeatureIndex(output_path) if index else None
+        self._template_lookup = None
+        self._referenced_templates = set()
+        if shared_templates:
+            self._template_lookup = {template: credential_type for credential_type, template in TemplateRegistry.load_all().items()}
+
+        with open(self.config_path, "r", encoding="utf-8") as fin, open(output_path, "w", encoding="utf-8") as fout:
+            reader = JsonStreamReader(fin)
+            writer = JsonStreamWriter(fout)
+            writer.begin_object()
+            for key in reader.iter_object():
+                writer.key(key)
+                if key == "apps" and reader.peek() == "[":
+                    writer.begin_array()
+                    for app_index in reader.iter_array():
+                        self._stream_app(reader, writer, app_index)
+                    writer.end_array()
+                else:
+                    writer.value(reader.read_value())
+            if self._referenced_templates:
+                writer.key(TEMPLATES_KEY)
+                writer.value({credential_type: TemplateRegistry.get(credential_type) for credential_type in sorted(self._referenced_templates)})
+            writer.end_object()
+        if self._index:
+            self._index.save()
+        return self._index
+
+    def _stream_app(self, reader: JsonStreamReader, writer: JsonStreamWriter, app_index: int) -> None:
+        # Copies one app to the output, transforming its features one by one
+        if reader.peek() != "{":
+            writer.value(reader.read_value())
+            return
+        writer.begin_object()
+        for key in reader.iter_object():
+            writer.key(key)
+            if key == "features" and reader.peek() == "[":
+                writer.begin_array()
+                for feature_index in reader.iter_array():
+                    feature = self.process_feature(reader.read_value())
+                    if self._template_lookup:
+                        self._referenced_templates |= reference_feature_templates(feature, self._template_lookup)
+                    if self._index:
+                        offset, length = writer.indexed_value(feature)
+                        self._index.add(app_index, feature_index, feature_name(feature), feature_type(feature), offset, length)
+                    else:
+                        writer.value(feature)
+                writer.end_array()
+            else:
+                writer.value(reader.read_value())
+        writer.end_object()
 
 
 
 # ---------- Factory ----------
 class TransformerFactory:
+    # credential type -> shared transformer instance. Transformers register themselves with @TransformerRegistry.register (see transformer_registry.py),
+    # e.g. DFRTransformer in dfr.py; the DPP, DCC, DTE and DIA drafts in dte_draft.py only need the same decorator
+    transformers = TransformerRegistry.transformers()
+
     @staticmethod
-    def get_transformer(credential_type: str, component: Dict[str, Any]) -> CredentialTransformer:
-        '''
-        This function takes credential_type and retrieves the appropriate transformer for a given credential type.
-        '''
-        transformers = {
-            "DFR": DFRTransformer
-            # "DPP": DPPTransformer,
-            # "DCC": DCCTransformer,
-            # "DIA": DIATransformer,
-            # "DTE": DTETransformer
-        }
-        # If the credential type is in the dictionary keys, extracts the value to get transformer name
-        # For example: if "DFR" is in the dictionary keys, then get the transformer name
-        if credential_type in transformers: 
-            return transformers[credential_type](component) # Returns the value of input key
-        else:
-            raise ValueError(f"Unknown credential type: {credential_type}")
+    def get_transformer(credential_type: str) -> CredentialTransformer:
+        '''
+        This function takes credential_type and retrieves the registered transformer for a given credential type.
+        The same stateless instance is returned for every component and service, so no transformer is created per call.
+        '''
+        return TransformerRegistry.get(credential_type) # raises ValueError for unknown credential types
+
+    @staticmethod
+    def model_names() -> List[str]:
+        # The jargon.sh model names (see credential_classifier.MODEL_TYPES) of the credential types with a registered transformer
+        return [model for model, credential_type in MODEL_TYPES.items() if credential_type in TransformerFactory.transformers]
+
+    @staticmethod
+    def write_paths() -> Tuple[List[Tuple[str, ...]], List[Tuple[str, ...]]]:
+        '''
+        Returns the component and service paths any registered transformer may write to (used for copy-on-write transformation).
+        '''
+        component_paths, service_paths = [], [("parameters",)] # GeneralMigrator updates the service parameters
+        for transformer in TransformerFactory.transformers.values():
+            component_paths += [path for path in transformer.component_paths if path not in component_paths]
+            service_paths += [path for path in transformer.service_paths if path not in service_paths]
+        return component_paths, service_paths
 
 
 # ---------- Example Usage ----------
@@ -148,15 +455,54 @@ if __name__ == "__main__":
     input_folder_name = "01_Data/app-config/RBTP"
     file_name = "app-config.json"
     output_file_name = "transformed-app-config-v5.json"
+    streaming = False # set to True for large configs: features are transformed and written one at a time
+    max_workers = None # set to e.g. os.cpu_count() to transform the features of a large config in parallel (batch mode only)
+    shared_templates = False # set to True to write each render template once under "renderTemplates" and reference it from the services
+    metrics_file_name = None # e.g. "migration-metrics.json" to record stage timings and counters (see metrics.py)
+    lazy = False # set to True to parse only the parts of the config the transformers read; the rest is copied to the output verbatim
+    write_index = False # True writes <output>.index.json, used by Helper Code/dfr_master_testing.py to extract features without re-parsing
+    incremental = False # set to True to copy the features unchanged since the last run from <output>.cache instead of transforming them again (batch mode, without shared templates)
+    validate_schemas = False # set to True to validate the migrated data against the cached 0.6.0 schemas in 01_Data/schemas (batch mode, needs jsonschema)
+    check_jsonld = False # set to True to expand the issued credentials with the cached contexts in 01_Data/contexts (batch mode, needs pyld)
+    write_diff = False # set to True to write <output>.diff.json, the changes the migration made to each feature (batch mode)
     
     ###########################################################
 
-    processor = AppConfigProcessor(current_dir.parent / input_folder_name / file_name)
-    output = processor.process()
-
+    if lazy and write_diff:
+        raise ValueError("write_diff needs the whole input parsed; set lazy = False")
     output_path = current_dir.parent / input_folder_name / output_file_name
-    with open(output_path, "w") as f:
-        json.dump(output, f, indent=2)
+    metrics = MetricsCollector() if metrics_file_name else None
+    if incremental:
+        processor = AppConfigProcessor(current_dir.parent / input_folder_name / file_name, metrics=metrics)
+        cache = FeatureCache(output_path)
+        start = time.perf_counter()
+        processor.process_incremental(output_path, cache, write_index)
+        print(f"Copied {cache.hits} unchanged features from {cache.path.name} and transformed {cache.misses} in {time.perf_counter() - start:.2f}s")
+    elif streaming:
+        processor = AppConfigProcessor(current_dir.parent / input_folder_name / file_name, streaming=True, metrics=metrics)
+        processor.process_streaming(output_path, shared_templates, write_index)
+    else:
+        processor = AppConfigProcessor(current_dir.parent / input_folder_name / file_name, metrics=metrics, lazy=lazy)
+        start = time.perf_counter()
+        output = processor.process_copy_on_write() if write_diff else processor.process(max_workers) # the diff needs the untouched input
+        print(f"Transformed features in {time.perf_counter() - start:.2f}s (max_workers={max_workers})")
+        if validate_schemas:
+            failures = processor.validate(output, max_workers=max_workers)
+            for failure in failures:
+                print(f"Schema validation failed for feature {failure['feature']} of app {failure['app']} ({failure['name']}): {failure['errors']}")
+        if check_jsonld:
+            for failure in processor.check_jsonld(output, max_workers=max_workers):
+                print(f"JSON-LD expansion failed for feature {failure['feature']} of app {failure['app']} ({failure['name']}): {failure['errors']}")
+        if write_diff:
+            print(f"Diff written to {processor.write_diff(output, output_path)}")
+        if shared_templates:
+            share_templates(output)
+
+        processor.write_output(output, output_path, write_index)
+
+    if metrics:
+        with open(current_dir.parent / input_folder_name / metrics_file_name, "w") as f:
+            f.write(metrics.to_json())
     
     print("Transformation complete!")
 
@@ -0,0 +1,182 @@
+'''
+Multi-hop version migration graph.
+Each edge migrates one credential type from one version to the next, e.g. ("DFR", "0.5.0") -> ("DFR", "0.6.0"), and is either
+- a list of rules (see rule_engine.py), or
+- a transform function taking the component and returning it, such as the registered DFRTransformer.
+
+plan() finds the shortest chain of edges between any two versions of a credential type, and migrate() runs it on a component;
+both raise MigrationPathError when the versions are not connected.
+Consecutive rule edges are fused: their rules are concatenated and compiled into one plan, so a chain of rule edges such as
+0.6.0 -> 0.7.0 -> 0.8.0 walks each document once instead of once per hop. Compiled chains are cached per (type, from, to).
+
+Fusing stops at transform edges, which run on their own. The only registered hop, DFR 0.5.0 -> 0.6.0, is such an edge:
+DFRTransformer.transform() restructures credentialSubject into "facility" (copying, renaming and cleaning identifiers), which the
+rule operations cannot express, so only its conformityClaim updates are rules (dfr.DFR_RULES, applied inside the transform).
+A chain starting at 0.5.0 therefore takes one walk for that hop plus one for each run of rule edges after it.
+
+Adding a version only needs one register() call, e.g.
+    MigrationGraph.register("DFR", "0.6.0", "0.7.0", rules=[{"op": "rename", "path": "props.data.credentialSubject.facility.name", "to": "facilityName"}])
+'''
+
+from collections import deque
+from pathlib import Path
+from typing import Dict, Any, List, Callable, NamedTuple, Optional, Tuple
+
+import json_backend
+import dfr # registers DFRTransformer, used by the 0.5.0 -> 0.6.0 edge
+from credential_classifier import classify_schema_url, component_schema_url
+from rule_engine import compile_rules, apply_plan
+from transformer_registry import TransformerRegistry
+
+
+# No chain of registered edges connects the two versions
+class MigrationPathError(LookupError):
+    pass
+
+
+class MigrationEdge(NamedTuple):
+    credential_type: str
+    from_version: str
+    to_version: str
+    rules: Optional[List[Dict[str, Any]]] # rule edges can be fused with their neighbours
+    transform: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]]
+
+
+# ---------- Graph ----------
+class MigrationGraph:
+    _edges: Dict[Tuple[str, str], List[MigrationEdge]] = {} # (credential type, from version) -> outgoing edges
+    _chains: Dict[Tuple[str, str, str], List[Any]] = {} # (credential type, from, to) -> compiled steps
+
+    @classmethod
+    def register(cls, credential_type: str, from_version: str, to_version: str,
+                 rules: Optional[List[Dict[str, Any]]] = None, transform: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None) -> None:
+        '''
+        Registers one migration hop. Exactly one of rules and transform must be given; rules are relative to the component.
+        A later registration of the same hop replaces the earlier one.
+        '''
+        if (rules is None) == (transform is None):
+            raise ValueError("A migration edge needs either rules or a transform function")
+        edge = MigrationEdge(credential_type, from_version, to_version, list(rules) if rules is not None else None, transform)
+        outgoing = cls._edges.setdefault((credential_type, from_version), [])
+        outgoing[:] = [e for e in outgoing if e.to_version != to_version] + [edge]
+        cls._chains.clear() # a new edge can shorten existing chains
+
+    @classmethod
+    def versions(cls, credential_type: str) -> List[str]:
+        found = set()
+        for (edge_type, from_version), outgoing in cls._edges.items():
+            if edge_type == credential_type:
+                found.add(from_version)
+                found.update(edge.to_version for edge in outgoing)
+        return sorted(found)
+
+    @classmethod
+    def plan(cls, credential_type: str, from_version: str, to_version: str) -> List[MigrationEdge]:
+        '''
+        This function finds the shortest chain of edges from from_version to to_version (breadth-first, every hop costs the same).
+
+        Returns:
+            List[MigrationEdge]: The edges in order; empty when from_version == to_version.
+        '''
+        previous: Dict[str, Optional[MigrationEdge]] = {from_version: None} # version -> edge it was first reached by
+        queue = deque([from_version])
+        while queue and to_version not in previous:
+            version = queue.popleft()
+            for edge in cls._edges.get((credential_type, version), []):
+                if edge.to_version not in previous:
+                    previous[edge.to_version] = edge
+                    queue.append(edge.to_version)
+        if to_version not in previous:
+            raise MigrationPathError(f"No migration path for {credential_type} from {from_version} to {to_version}")
+
+        chain = []
+        edge = previous[to_version]
+        while edge is not None:
+            chain.append(edge)
+            edge = previous[edge.from_version]
+        return chain[::-1]
+
+    @classmethod
+    def compile(cls, credential_type: str, from_version: str, to_version: str) -> List[Any]:
+        '''
+        Compiles the chain into steps: runs of consecutive rule edges become one rule plan, transform edges stay as they are
+        and split the rule edges around them into separate plans.
+        '''
+        key = (credential_type, from_version, to_version)
+        if key not in cls._chains:
+            steps: List[Any] = []
+            pending_rules: List[Dict[str, Any]] = []
+            for edge in cls.plan(credential_type, from_version, to_version):
+                if edge.rules is not None:
+                    pending_rules += edge.rules
+                    continue
+                if pending_rules:
+                    steps.append(compile_rules(pending_rules))
+                    pending_rules = []
+                steps.append(edge.transform)
+            if pending_rules:
+                steps.append(compile_rules(pending_rules))
+            cls._chains[key] = steps
+        return cls._chains[key]
+
+    @classmethod
+    def migrate(cls, credential_type: str, component: Dict[str, Any], from_version: str, to_version: str) -> Dict[str, Any]:
+        '''
+        Migrates a component between any two connected versions, in place. Raises MigrationPathError if there is no path.
+        '''
+        for step in cls.compile(credential_type, from_version, to_version):
+            if callable(step):
+                component = step(component)
+            else:
+                apply_plan(step, component)
+        return component
+
+
+# ---------- Registered migrations ----------
+# 0.5.0 -> 0.6.0 is the component transform of the registered DFR transformer (dfr.py)
+def _register_transformer_edge(credential_type: str, from_version: str, to_version: str) -> None:
+    MigrationGraph.register(credential_type, from_version, to_version, transform=TransformerRegistry.get(credential_type).transform)
+
+
+_register_transformer_edge("DFR", "0.5.0", "0.6.0")
+
+
+def migrate_component(component: Dict[str, Any], to_version: str) -> Dict[str, Any]:
+    '''
+    This function migrates an EntryData component to to_version, reading its credential type and current version from the schema URL.
+    Components already at to_version are returned unchanged.
+    '''
+    schema_url = component_schema_url(component)
+    schema = classify_schema_url(schema_url) if schema_url else None
+    if schema is None or schema.version is None:
+        raise ValueError(f"Cannot detect the credential type and version of schema: {schema_url}")
+    return MigrationGraph.migrate(schema.credential_type, component, schema.version, to_version)
+
+
+# ---------- Example Usage ----------
+'''
+This code migrates every DFR component of an app-config to the target version along the shortest registered path.
+'''
+if __name__ == "__main__":
+
+    ############## PARAMETERS & VARIABLES #####################
+
+    current_dir = Path(__file__).resolve().parent
+
+    input_path = current_dir.parent / "01_Data/app-config/RegenFarmers/app-config.json"
+    credential_type = "DFR"
+    to_version = "0.6.0"
+
+    ###########################################################
+
+    config = json_backend.load_file(input_path)
+    for app in config.get("apps", []):
+        for feature in app.get("features", []):
+            for component in feature.get("components", []):
+                if component.get("type") != "EntryData":
+                    continue
+                schema = classify_schema_url(component_schema_url(component) or "")
+                if schema and schema.credential_type == credential_type and schema.version != to_version:
+                    chain = " -> ".join([schema.version] + [edge.to_version for edge in MigrationGraph.plan(credential_type, schema.version, to_version)])
+                    migrate_component(component, to_version)
+                    print(f"{feature.get('name')}: {chain}")
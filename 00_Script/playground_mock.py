@@ -0,0 +1,245 @@
+'''
+Local stand-in for the UNTP playground (tests-untp): a verification service that applies the offline checks of schema_validation.py
+and jsonld_check.py to submitted credentials, and a client that submits many credentials at once.
+
+    POST /verify   body: a credential, or an EnvelopedVerifiableCredential (also under "verifiableCredential") whose JWT is decoded
+                   response: {"status": "pass" | "fail" | "skipped", "credential_type": "DFR", "version": "0.6.0",
+                              "checks": {"schema": {"status": ..., "errors": [...]}, "jsonld": {"status": ..., "errors": [...]}}}
+
+The schema check validates "credentialSubject" against the cached schema of the credential's type and version (CREDENTIAL_SCHEMAS,
+found from its UNTP context), and the JSON-LD check expands the credential with the cached contexts. A check whose schema or
+contexts are not cached is "skipped" instead of failing; a credential passes when every check ran and passed.
+Nothing is signed or resolved over the network, so the service does not check proofs or status lists like the hosted playground.
+
+The service is a ThreadingHTTPServer speaking HTTP/1.1 keep-alive. VerificationClient.verify_all() submits credentials from a
+thread pool in which every thread keeps one connection open, so a batch costs one TCP connection per thread instead of one per
+credential. The checks run in the server threads, which share the compiled validators and loaded contexts.
+verify_credential() runs the same checks in-process, without the service.
+'''
+
+import http.client
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+import json_backend
+from envelope_migrator import credential_version, decode_envelope
+from main_transformer import AppConfigProcessor
+from jsonld_check import CONTEXT_DIR, ContextNotCached, check_document, get_loader, iter_check_items
+from schema_validation import SCHEMA_DIR, get_store
+
+try:
+    from referencing.exceptions import Unresolvable
+except ImportError: # optional dependency, only needed for the schema check
+    Unresolvable = FileNotFoundError
+
+# (credential type, version) -> schema of credentialSubject, as in the EntryData components of migrated app-configs
+CREDENTIAL_SCHEMAS = {
+    ("DFR", "0.6.0"): "https://jargon.sh/user/unece/DigitalFacilityRecord/v/0.6.0/artefacts/jsonSchemas/FacilityRecord.json?class=FacilityRecord",
+}
+VERIFY_PATH = "/verify"
+
+
+# ---------- Checks ----------
+def _check(run: Any) -> Dict[str, Any]:
+    # {"status", "errors"} of one check; a check that cannot run for lack of a cached file or package is skipped with the reason
+    try:
+        errors = run()
+    except (FileNotFoundError, ContextNotCached, Unresolvable, ImportError) as e:
+        return {"status": "skipped", "errors": [f"{type(e).__name__}: {e}"]}
+    return {"status": "fail" if errors else "pass", "errors": errors}
+
+
+def verify_credential(document: Dict[str, Any], schema_dir: Any = SCHEMA_DIR, context_dir: Any = CONTEXT_DIR) -> Dict[str, Any]:
+    '''
+    This function applies the schema and JSON-LD checks to a credential, as the service does for each submission.
+
+    Args:
+        document (Dict[str, Any]): A credential, or an enveloped credential (also under "verifiableCredential").
+        schema_dir, context_dir: The schema and context caches (see schema_validation.fetch_schemas() and jsonld_check.fetch_contexts()).
+
+    Returns:
+        Dict[str, Any]: "status" ("pass", "fail" or "skipped" when a check could not run), "credential_type", "version" and "checks".
+    '''
+    credential = document.get("verifiableCredential", document)
+    if "credentialSubject" not in credential:
+        credential = decode_envelope(credential)[1]
+    credential_type, version = credential_version(credential)
+    schema_url = CREDENTIAL_SCHEMAS.get((credential_type, version))
+
+    if schema_url is None:
+        schema_check = {"status": "skipped", "errors": [f"No schema for {credential_type} {version}"]}
+    else:
+        schema_check = _check(lambda: get_store(str(schema_dir)).errors(schema_url, credential.get("credentialSubject", {})))
+    jsonld_check = _check(lambda: check_document(credential, get_loader(str(context_dir))))
+
+    checks = {"schema": schema_check, "jsonld": jsonld_check}
+    statuses = {check["status"] for check in checks.values()}
+    status = "fail" if "fail" in statuses else "skipped" if "skipped" in statuses else "pass"
+    return {"status": status, "credential_type": credential_type, "version": version, "checks": checks}
+
+
+# ---------- Service ----------
+class VerificationHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1" # keeps connections open between requests
+
+    def do_POST(self) -> None:
+        if self.path != VERIFY_PATH:
+            self._reply(404, {"error": f"Unknown path {self.path}; submit credentials to {VERIFY_PATH}"})
+            return
+        try:
+            document = json_backend.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            result = verify_credential(document, self.server.schema_dir, self.server.context_dir)
+        except (ValueError, KeyError, TypeError, AttributeError) as e: # not JSON, or not a credential
+            self._reply(400, {"error": f"{type(e).__name__}: {e}"})
+            return
+        self._reply(200, result)
+
+    def _reply(self, code: int, body: Dict[str, Any]) -> None:
+        data = json_backend.dumps_compact(body).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass # one line per credential would drown the results
+
+
+class VerificationServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int] = ("127.0.0.1", 0), schema_dir: Any = SCHEMA_DIR, context_dir: Any = CONTEXT_DIR):
+        """
+        Initialize the service on address (port 0 picks a free port, see server_address) with the caches to verify against.
+        """
+        super().__init__(address, VerificationHandler)
+        self.schema_dir = schema_dir
+        self.context_dir = context_dir
+
+    def start(self) -> "VerificationServer":
+        # Serves from a daemon thread, so a script can run the service and its client together; stop with shutdown()
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+# ---------- Client ----------
+class VerificationClient:
+    def __init__(self, host: str, port: int, max_connections: int = 8, timeout: float = 60):
+        """
+        Initialize a client of the service at host:port, submitting over at most max_connections kept-alive connections.
+        """
+        self.host = host
+        self.port = port
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self._local = threading.local() # one connection per submitting thread
+        self._connections: List[http.client.HTTPConnection] = []
+        self._lock = threading.Lock()
+        # The submitting threads live as long as the client, so their connections are reused by every batch
+        self._executor = ThreadPoolExecutor(max_workers=max_connections)
+
+    def _connection(self) -> http.client.HTTPConnection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._local.connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    def verify(self, document: Dict[str, Any]) -> Dict[str, Any]:
+        '''
+        Submits one credential and returns the service's result; a connection the service closed is reopened once.
+        Errors are returned as {"status": "error", "error": ...} instead of raised, so one bad submission does not stop a batch.
+        '''
+        body = json_backend.dumps_compact(document).encode("utf-8")
+        for attempt in range(2):
+            connection = self._connection()
+            try:
+                connection.request("POST", VERIFY_PATH, body, {"Content-Type": "application/json"})
+                response = connection.getresponse()
+                result = json_backend.loads(response.read())
+                if response.status != 200:
+                    return {"status": "error", "error": result.get("error", response.reason)}
+                return result
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError) as e:
+                connection.close() # reconnects on the next request
+                if attempt:
+                    return {"status": "error", "error": f"{type(e).__name__}: {e}"}
+            except (OSError, http.client.HTTPException, ValueError) as e:
+                connection.close()
+                return {"status": "error", "error": f"{type(e).__name__}: {e}"}
+
+    def verify_all(self, documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # Submits every credential concurrently and returns the results in submission order
+        return list(self._executor.map(self.verify, documents))
+
+    def close(self) -> None:
+        self._executor.shutdown()
+        with self._lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections.clear()
+
+
+def credentials_from_config(config: Dict[str, Any]) -> List[Tuple[str, Dict[str, Any]]]:
+    # ("app <i> feature <j> (<name>)", credential) for every credential issued from a migrated config, as jsonld_check.py builds them
+    return [(f"app {app} feature {feature} ({name})", credential) for app, feature, name, _, credential in iter_check_items(config)]
+
+
+def credentials_from_files(paths: List[Any]) -> List[Tuple[str, Dict[str, Any]]]:
+    # (file name, document) for credential files such as the per-GTIN playground downloads
+    return [(Path(path).name, json_backend.load_file(path)) for path in paths]
+
+
+# ---------- Example Usage ----------
+'''
+This code migrates an app-config as main_transformer.py does (or reads one it wrote), starts the service on a free local port,
+submits every credential issued from the migrated config over pooled connections, and prints pass/fail per credential, e.g. as a CI
+step after the migration.
+The script exits with status 1 when a credential fails or cannot be submitted, and when nothing was verified because every
+check was skipped (no cached schemas or contexts, see schema_validation.fetch_schemas() and jsonld_check.fetch_contexts()).
+'''
+if __name__ == "__main__":
+
+    ############## PARAMETERS & VARIABLES #####################
+
+    current_dir = Path(__file__).resolve().parent
+
+    input_path = current_dir.parent / "01_Data/app-config/RegenFarmers" / "app-config.json"
+    migrate = True # False when input_path is already a transformed app-config, e.g. one written by main_transformer.py
+    credential_files = [] # e.g. per-GTIN downloads such as "09359502222047 - 14.json", submitted as well
+    schema_dir = SCHEMA_DIR
+    context_dir = CONTEXT_DIR
+    max_connections = 8
+
+    ###########################################################
+
+    config = AppConfigProcessor(input_path, quiet=True).process() if migrate else json_backend.load_file(input_path)
+    submissions = credentials_from_config(config) + credentials_from_files(credential_files)
+    server = VerificationServer(("127.0.0.1", 0), schema_dir, context_dir).start()
+    client = VerificationClient(*server.server_address, max_connections=max_connections)
+    start = time.perf_counter()
+    try:
+        results = client.verify_all([document for _, document in submissions])
+    finally:
+        client.close()
+        server.shutdown()
+    seconds = time.perf_counter() - start
+
+    for (label, _), result in zip(submissions, results):
+        print(f"{result['status'].upper():7} {label}")
+        for name, check in result.get("checks", {}).items():
+            for error in check["errors"] if check["status"] != "pass" else []:
+                print(f"    {name}: {json_backend.dumps_compact(error) if isinstance(error, dict) else error}")
+        if "error" in result:
+            print(f"    {result['error']}")
+    counts = {status: sum(result["status"] == status for result in results) for status in ("pass", "fail", "skipped", "error")}
+    print(f"Verified {len(results)} credentials in {seconds:.2f}s over {max_connections} connections: " + ", ".join(f"{count} {status}" for status, count in counts.items()))
+    if counts["fail"] or counts["error"] or not counts["pass"]:
+        sys.exit(1)
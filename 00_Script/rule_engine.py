@@ -0,0 +1,172 @@
+'''
+Data-driven migration rules. Each credential type's 0.5.0 -> 0.6.0 changes are written as a list of rules (a path plus an operation),
+and compile_rules() merges all rules of a type into one traversal plan, so every document is walked once no matter how many rules apply.
+
+Paths are dot-separated keys; a segment ending in "[]" visits every item of that list, e.g. "conformityClaim[].assessmentCriteria[].status".
+The last segment is the key the operation acts on. Supported operations:
+- set:     node[key] = value (overwrites; keeps the key position if it already exists)
+- default: node[key] = value if the key is missing or empty
+- delete:  removes node[key] if present
+- rename:  renames key to "to", keeping its position in the dict
+- move:    renames key to "to" by popping it, so the new key is added at the end of the dict
+- first:   replaces a list with its first item ({} for an empty list)
+- flatten: merges the dict at node[key] into node and removes key
+rename and move also accept "first": True to keep only the first item of the moved list.
+'''
+
+import copy
+from typing import Dict, Any, List, Callable, Tuple
+
+from key_rename import rename_key
+
+# A plan is an ordered list of steps: ("op", function, rule) applied to the current dict, or ("descend", key, iterate, sub_plan)
+Plan = List[Tuple]
+
+
+# ---------- Operations ----------
+def _fresh(value: Any) -> Callable[[], Any]:
+    # Mutable values are copied on every use so documents never share a list or dict
+    if isinstance(value, (dict, list)):
+        items = value.values() if isinstance(value, dict) else value
+        if not any(isinstance(item, (dict, list)) for item in items): # e.g. [] or {"unit": "", "value": 0}: a shallow copy is enough
+            return value.copy
+        return lambda: copy.deepcopy(value)
+    return lambda: value
+
+
+def _first(value: Any) -> Any:
+    if isinstance(value, list):
+        return value[0] if value else {}
+    return value
+
+
+def _compile_op(rule: Dict[str, Any], key: str) -> Callable[[Dict[str, Any]], None]:
+    '''
+    Turns one rule into a function applied to the dict that holds key.
+    '''
+    op = rule["op"]
+    if op == "set":
+        make = _fresh(rule["value"])
+        def apply(node):
+            node[key] = make()
+    elif op == "default":
+        make = _fresh(rule["value"])
+        def apply(node):
+            if not node.get(key):
+                node[key] = make()
+    elif op == "delete":
+        def apply(node):
+            node.pop(key, None)
+    elif op == "rename":
+        new_key, first = rule["to"], rule.get("first", False)
+        def apply(node):
+            if key in node:
+                value = rename_key(node, key, new_key)
+                if first:
+                    node[new_key] = _first(value)
+    elif op == "move":
+        new_key, first = rule["to"], rule.get("first", False)
+        def apply(node):
+            if key in node:
+                value = node.pop(key)
+                node[new_key] = _first(value) if first else value
+    elif op == "first":
+        def apply(node):
+            if key in node:
+                node[key] = _first(node[key])
+    elif op == "flatten":
+        def apply(node):
+            if isinstance(node.get(key), dict):
+                node.update(node.pop(key))
+    else:
+        raise ValueError(f"Unknown rule operation: {op}")
+    return apply
+
+
+# ---------- Compiler ----------
+def _parse_path(path: str) -> List[Tuple[str, bool]]:
+    # "a[].b.c" -> [("a", True), ("b", False), ("c", False)]
+    return [(segment[:-2], True) if segment.endswith("[]") else (segment, False) for segment in path.split(".")]
+
+
+def _touches(rule: Dict[str, Any], key: str) -> bool:
+    # True if the operation can replace or remove node[key], so a later descent into key must not be merged with an earlier one
+    target = _parse_path(rule["path"])[-1][0]
+    return rule["op"] == "flatten" or key in (target, rule.get("to"))
+
+
+def _add_rule(plan: Plan, segments: List[Tuple[str, bool]], rule: Dict[str, Any]) -> None:
+    if len(segments) == 1:
+        plan.append(("op", _compile_op(rule, segments[0][0]), rule))
+        return
+    key, iterate = segments[0]
+    # Reuse the latest descent into the same key, unless an operation after it replaces or removes that subtree
+    for step in reversed(plan):
+        if step[0] == "descend" and step[1] == key and step[2] == iterate:
+            _add_rule(step[3], segments[1:], rule)
+            return
+        if step[0] == "op" and _touches(step[2], key):
+            break
+    sub_plan: Plan = []
+    plan.append(("descend", key, iterate, sub_plan))
+    _add_rule(sub_plan, segments[1:], rule)
+
+
+def compile_rules(rules: List[Dict[str, Any]]) -> Plan:
+    '''
+    This function compiles a list of rules into a single traversal plan.
+    Rules that share a path prefix are merged into one descent, as long as no rule in between replaces that subtree,
+    so the result is the same as applying the rules one after the other.
+    '''
+    plan: Plan = []
+    for rule in rules:
+        _add_rule(plan, _parse_path(rule["path"]), rule)
+    return plan
+
+
+def apply_plan(plan: Plan, node: Any) -> Any:
+    '''
+    Applies a compiled plan to a document in place, walking it once. Missing keys and unexpected types are skipped.
+    '''
+    if not isinstance(node, dict):
+        return node
+    for step in plan:
+        if step[0] == "op":
+            step[1](node)
+            continue
+        _, key, iterate, sub_plan = step
+        child = node.get(key)
+        if iterate:
+            if isinstance(child, list):
+                for item in child:
+                    apply_plan(sub_plan, item)
+        else:
+            apply_plan(sub_plan, child)
+    return node
+
+
+# ---------- Registry ----------
+class RuleRegistry:
+    _rules: Dict[str, List[Dict[str, Any]]] = {} # credential type -> rules
+    _plans: Dict[str, Plan] = {} # credential type -> compiled plan
+
+    @classmethod
+    def register(cls, credential_type: str, rules: List[Dict[str, Any]]) -> None:
+        '''
+        Registers the migration rules of a credential type, e.g. RuleRegistry.register("DPP", DPP_RULES).
+        '''
+        cls._rules[credential_type] = list(rules)
+        cls._plans.pop(credential_type, None)
+
+    @classmethod
+    def get_plan(cls, credential_type: str) -> Plan:
+        # Compiles the rules of a credential type on first use
+        if credential_type not in cls._plans:
+            if credential_type not in cls._rules:
+                raise ValueError(f"No migration rules registered for credential type: {credential_type}")
+            cls._plans[credential_type] = compile_rules(cls._rules[credential_type])
+        return cls._plans[credential_type]
+
+    @classmethod
+    def apply(cls, credential_type: str, document: Dict[str, Any]) -> Dict[str, Any]:
+        return apply_plan(cls.get_plan(credential_type), document)
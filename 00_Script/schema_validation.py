@@ -0,0 +1,250 @@
+'''
+Offline UNTP schema validation of migrated app-configs.
+Every EntryData component whose schema URL is a 0.6.0 jargon.sh schema, e.g.
+    https://jargon.sh/user/unece/DigitalFacilityRecord/v/0.6.0/artefacts/jsonSchemas/FacilityRecord.json?class=FacilityRecord
+has its "props" -> "data" validated against that JSON Schema, read from a local cache directory instead of the network.
+The cache mirrors the URLs without their query, e.g. <cache>/jargon.sh/user/unece/DigitalFacilityRecord/v/0.6.0/artefacts/jsonSchemas/FacilityRecord.json,
+and "$ref"s to other URLs are resolved from the cache the same way. fetch_schemas() fills it once on a machine with network access.
+
+Each validator is compiled once per process (SchemaStore.validator()), so validating thousands of components costs one schema load per URL.
+validate_config() can spread the components over worker processes; each worker compiles its own validators once.
+The cache (01_Data/schemas) is not committed: a component whose schema is not cached cannot be validated, and validate_config() raises
+SchemaNotCached instead of passing it, unless allow_skipped=True, which returns the skipped components with the results.
+Needs the jsonschema package (pip install jsonschema).
+'''
+
+import os
+import sys
+import urllib.request
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+from urllib.parse import urldefrag, urljoin, urlsplit
+
+import json_backend
+from credential_classifier import classify_schema_url
+
+try:
+    import jsonschema
+    from referencing import Registry, Resource
+    from referencing.exceptions import Unresolvable
+    from referencing.jsonschema import DRAFT202012
+except ImportError: # optional dependency, only needed for validation
+    jsonschema = None
+
+SCHEMA_DIR = Path(__file__).resolve().parent.parent / "01_Data" / "schemas"
+TARGET_VERSIONS = ("0.6.0",)
+
+# (app index, feature index, feature name, credential type, schema URL, props.data) of one component to validate
+ValidationItem = Tuple[int, int, Optional[str], str, str, Any]
+
+
+def schema_cache_path(url: str, cache_dir: Any = SCHEMA_DIR) -> Path:
+    # https://jargon.sh/user/...FacilityRecord.json?class=FacilityRecord -> <cache_dir>/jargon.sh/user/...FacilityRecord.json
+    parts = urlsplit(urldefrag(url)[0])
+    return Path(cache_dir) / parts.netloc / parts.path.lstrip("/")
+
+
+def fetch_schemas(urls: List[str], cache_dir: Any = SCHEMA_DIR) -> List[Path]:
+    '''
+    This function downloads schemas into the cache, together with the schemas they "$ref", skipping files already cached.
+    It is the only function of this module that uses the network.
+    '''
+    pending, fetched, seen = list(urls), [], set()
+    while pending:
+        url = urldefrag(pending.pop())[0].split("?")[0]
+        if url in seen:
+            continue
+        seen.add(url)
+        path = schema_cache_path(url, cache_dir)
+        if not path.exists():
+            with urllib.request.urlopen(url, timeout=30) as response:
+                data = response.read()
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(data)
+            fetched.append(path)
+        pending += [ref for ref in _external_refs(json_backend.load_file(path), url) if ref not in seen]
+    return fetched
+
+
+def _external_refs(schema: Any, base_url: str) -> Iterator[str]:
+    # Absolute URLs of the other documents schema refers to
+    stack = [schema]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, dict):
+            ref = item.get("$ref")
+            if isinstance(ref, str) and not ref.startswith("#"):
+                yield urljoin(base_url, urldefrag(ref)[0])
+            stack.extend(item.values())
+        elif isinstance(item, list):
+            stack.extend(item)
+
+
+# ---------- Validators ----------
+class SchemaNotCached(FileNotFoundError):
+    pass
+
+
+class SchemaStore:
+    def __init__(self, cache_dir: Any = SCHEMA_DIR):
+        """
+        Initialize a store reading schemas from cache_dir. Validators are compiled on first use and kept for the life of the store.
+        """
+        if jsonschema is None:
+            raise ImportError("Schema validation needs the jsonschema package: pip install jsonschema")
+        self.cache_dir = Path(cache_dir)
+        self.validators: Dict[str, Any] = {} # schema URL without query -> compiled validator
+        self.registry = Registry(retrieve=self._retrieve) # resolves "$ref"s to other documents from the cache
+
+    def load_schema(self, url: str) -> Dict[str, Any]:
+        path = schema_cache_path(url, self.cache_dir)
+        if not path.exists():
+            raise SchemaNotCached(f"Schema {url} is not in the cache ({path}); run fetch_schemas() once with network access")
+        schema = json_backend.load_file(path)
+        if isinstance(schema, dict):
+            schema.setdefault("$id", url) # relative "$ref"s resolve against the URL the schema was fetched from
+        return schema
+
+    def _retrieve(self, uri: str) -> "Resource":
+        return Resource.from_contents(self.load_schema(uri), default_specification=DRAFT202012)
+
+    def validator(self, url: str) -> Any:
+        '''
+        Returns the validator of a schema URL, compiling it the first time: the schema is loaded from the cache, checked against its
+        metaschema ("$schema", 2020-12 by default) and bound to the registry of cached schemas.
+        '''
+        key = url.split("?")[0]
+        validator = self.validators.get(key)
+        if validator is None:
+            schema = self.load_schema(key)
+            validator_class = jsonschema.validators.validator_for(schema, default=jsonschema.Draft202012Validator)
+            validator_class.check_schema(schema)
+            validator = validator_class(schema, registry=self.registry)
+            self.validators[key] = validator
+        return validator
+
+    def errors(self, url: str, data: Any) -> List[Dict[str, str]]:
+        # Every violation of data, as {"path": JSON pointer in data, "message": ...}, in the order the schema checks them
+        return [
+            {"path": "/" + "/".join(str(part) for part in error.absolute_path), "message": error.message}
+            for error in self.validator(url).iter_errors(data)
+        ]
+
+
+@lru_cache(maxsize=None)
+def get_store(cache_dir: str = str(SCHEMA_DIR)) -> SchemaStore:
+    # One store per cache directory and process, so every worker compiles each validator once
+    return SchemaStore(cache_dir)
+
+
+# ---------- Validation ----------
+def iter_validation_items(config: Dict[str, Any], versions: Tuple[str, ...] = TARGET_VERSIONS) -> Iterator[ValidationItem]:
+    '''
+    Yields the EntryData components of config whose schema URL is a jargon.sh schema of one of versions, with the data to validate.
+    '''
+    for app_index, app in enumerate(config.get("apps", [])):
+        for feature_index, feature in enumerate(app.get("features", [])):
+            for component in feature.get("components", []):
+                if component.get("type") != "EntryData":
+                    continue
+                props = component.get("props", {})
+                if component.get("name") == "LocalStorageLoader":
+                    nested = props.get("nestedComponents", [])
+                    props = nested[0].get("props", {}) if len(nested) == 1 else {}
+                schema_url = props.get("schema", {}).get("url")
+                schema = classify_schema_url(schema_url) if schema_url else None
+                if schema and schema.version in versions and "data" in props:
+                    yield app_index, feature_index, feature.get("name"), schema.credential_type, schema_url, props["data"]
+
+
+def _validate_items(cache_dir: str, items: List[ValidationItem]) -> List[Any]:
+    # The errors of each item, or the reason it could not be validated (str) when its schema or a schema it refers to is not cached
+    store = get_store(cache_dir)
+    results = []
+    for *_, schema_url, data in items:
+        try:
+            results.append(store.errors(schema_url, data))
+        except (FileNotFoundError, Unresolvable) as e:
+            results.append(f"{type(e).__name__}: {e}")
+    return results
+
+
+def validate_config(config: Dict[str, Any], cache_dir: Any = SCHEMA_DIR, max_workers: Optional[int] = None,
+                    versions: Tuple[str, ...] = TARGET_VERSIONS, allow_skipped: bool = False) -> Tuple[int, List[Dict[str, Any]], Dict[str, int]]:
+    '''
+    This function validates the "props" -> "data" of every migrated EntryData component of config against its cached schema.
+
+    Args:
+        config (Dict[str, Any]): A transformed app-config, e.g. the output of AppConfigProcessor.process().
+        cache_dir: The schema cache (see fetch_schemas()).
+        max_workers (int, optional): Worker processes to validate in; None or 1 validates in this process.
+        versions: Schema versions to validate; components of other versions were not migrated and are skipped.
+        allow_skipped (bool): Return the components whose schemas are not cached as skipped instead of raising SchemaNotCached.
+
+    Returns:
+        Tuple[int, List[Dict[str, Any]], Dict[str, int]]: The number of components validated, one entry per invalid component with
+        "app", "feature", "name", "credential_type", "schema_url" and "errors" ([{"path": ..., "message": ...}]) in config order,
+        and the number of skipped components per "<schema URL>: <reason>".
+    '''
+    cache_dir = str(cache_dir)
+    items = list(iter_validation_items(config, versions))
+    workers = min(max_workers or 1, os.cpu_count() or 1, len(items))
+    if workers <= 1:
+        results = _validate_items(cache_dir, items)
+    else:
+        size = max(1, len(items) // (workers * 4)) # a few chunks per worker keeps the pickling overhead low
+        chunks = [items[i:i + size] for i in range(0, len(items), size)]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = [errors for chunk in executor.map(_validate_items, [cache_dir] * len(chunks), chunks) for errors in chunk]
+
+    failures, skipped = [], {}
+    for (app_index, feature_index, name, credential_type, schema_url, _), errors in zip(items, results):
+        if isinstance(errors, str):
+            reason = f"{schema_url}: {errors}"
+            skipped[reason] = skipped.get(reason, 0) + 1
+        elif errors:
+            failures.append({
+                "app": app_index, "feature": feature_index, "name": name, "credential_type": credential_type,
+                "schema_url": schema_url, "errors": errors,
+            })
+    if skipped and not allow_skipped:
+        raise SchemaNotCached(f"{sum(skipped.values())}/{len(items)} component(s) could not be validated: " + "; ".join(skipped))
+    return len(items) - sum(skipped.values()), failures, skipped
+
+
+# ---------- Example Usage ----------
+'''
+This code validates a transformed app-config against the cached 0.6.0 schemas and prints the invalid features.
+Set fetch = True once, with network access, to fill the cache with the DFR schema and the schemas it refers to.
+The script exits with status 1 when a component is invalid, and raises SchemaNotCached when one cannot be validated (see allow_skipped).
+'''
+if __name__ == "__main__":
+
+    ############## PARAMETERS & VARIABLES #####################
+
+    current_dir = Path(__file__).resolve().parent
+
+    input_path = current_dir.parent / "01_Data/app-config/RBTP" / "transformed-app-config-v5.json"
+    schema_dir = SCHEMA_DIR
+    max_workers = None # e.g. os.cpu_count() for large configs
+    fetch = False
+    schema_urls = ["https://jargon.sh/user/unece/DigitalFacilityRecord/v/0.6.0/artefacts/jsonSchemas/FacilityRecord.json"]
+    allow_skipped = False # True reports components whose schemas are not cached instead of failing
+
+    ###########################################################
+
+    if fetch:
+        for path in fetch_schemas(schema_urls, schema_dir):
+            print(f"Cached {path}")
+    validated, failures, skipped = validate_config(json_backend.load_file(input_path), schema_dir, max_workers, allow_skipped=allow_skipped)
+    for reason, count in skipped.items():
+        print(f"Skipped {count} component(s) of {reason}")
+    for failure in failures:
+        print(f"app {failure['app']} feature {failure['feature']} ({failure['name']}, {failure['credential_type']}): {len(failure['errors'])} error(s)")
+        for error in failure["errors"]:
+            print(f"  {error['path']}: {error['message']}")
+    print(f"Validation complete! {validated - len(failures)}/{validated} components valid.")
+    if failures:
+        sys.exit(1)
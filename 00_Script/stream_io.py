@@ -0,0 +1,248 @@
+'''
+Incremental JSON reading and writing used by the streaming mode of AppConfigProcessor.
+The reader walks the app-config one container at a time, so only a single feature needs to be decoded at once.
+The writer reproduces the exact layout of json.dump(..., indent=2), so streamed output is byte-identical to the batch output.
+'''
+
+import json
+from typing import Any, Iterable, Iterator, List, TextIO, Tuple
+
+import json_backend
+from lazy_json import LazyArray, LazyObject, RawJson
+
+WHITESPACE = " \t\n\r"
+
+
+# ---------- Reader ----------
+class JsonStreamReader:
+    def __init__(self, f: TextIO, chunk_size: int = 65536):
+        """
+        Initialize with an open text file. Only the unread part of the file is kept in the buffer.
+        """
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self, size: int) -> bool:
+        # Drops the consumed part of the buffer and appends the next chunk of the file.
+        if self.eof:
+            return False
+        chunk = self.f.read(size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        '''
+        Skips whitespace and returns the next character without consuming it ('' at the end of the file).
+        '''
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill(self.chunk_size):
+                return ""
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise json.JSONDecodeError(f"Expecting '{char}'", self.buffer, self.pos)
+        self.pos += 1
+
+    def read_value(self) -> Any:
+        '''
+        Decodes the complete JSON value at the cursor, reading more of the file until the value is complete.
+        The read size doubles on every retry, so large values are still read in linear time.
+        '''
+        self.peek()
+        size = self.chunk_size
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill(size):
+                    raise
+                size *= 2
+                continue
+            # A number or literal that ends with the buffer may continue in the next chunk
+            if end == len(self.buffer) and self._fill(size):
+                continue
+            self.pos = end
+            return value
+
+    def iter_object(self) -> Iterator[str]:
+        '''
+        Yields the keys of the object at the cursor.
+        The caller must consume the value of each key (read_value or a nested iter_*) before asking for the next key.
+        '''
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.read_value()
+            if not isinstance(key, str):
+                raise json.JSONDecodeError("Expecting property name", self.buffer, self.pos)
+            self.expect(":")
+            yield key
+            if self._end_item("}") == "}":
+                return
+
+    def iter_array(self) -> Iterator[int]:
+        '''
+        Yields the index of each item of the array at the cursor.
+        The caller must consume each item before asking for the next one.
+        '''
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        index = 0
+        while True:
+            yield index
+            index += 1
+            if self._end_item("]") == "]":
+                return
+
+    def _end_item(self, closing: str) -> str:
+        # Consumes and returns the ',' between items or the closing bracket of the container.
+        char = self.peek()
+        if char not in (",", closing):
+            raise json.JSONDecodeError(f"Expecting ',' or '{closing}'", self.buffer, self.pos)
+        self.pos += 1
+        return char
+
+
+# ---------- Writer ----------
+class JsonStreamWriter:
+    def __init__(self, f: TextIO, indent: int = 2):
+        """
+        Initialize with an open text file. Containers are opened and closed explicitly; complete values are written with value().
+        """
+        self.f = f
+        self.indent = indent
+        self.stack: List[List[Any]] = [] # one [bracket, item count] entry per open container
+        # UTF-8 bytes written so far; tell() of a text file is an opaque cookie, not a byte offset, so offsets are counted instead
+        self.position = 0
+
+    def _write(self, text: str):
+        self.f.write(text)
+        self.position += len(text) if text.isascii() else len(text.encode("utf-8"))
+
+    def _separator(self):
+        # Writes the separator and indentation that json.dump puts before each item of a container.
+        count = self.stack[-1][1]
+        self._write((",\n" if count else "\n") + " " * (self.indent * len(self.stack)))
+        self.stack[-1][1] = count + 1
+
+    def _before_value(self):
+        # Object values follow their key directly; array items need a separator first.
+        if self.stack and self.stack[-1][0] == "[":
+            self._separator()
+
+    def _open(self, bracket: str):
+        self._before_value()
+        self._write(bracket)
+        self.stack.append([bracket, 0])
+
+    def _close(self, bracket: str):
+        _, count = self.stack.pop()
+        if count: # empty containers are written as {} and [] by json.dump
+            self._write("\n" + " " * (self.indent * len(self.stack)))
+        self._write(bracket)
+
+    def begin_object(self):
+        self._open("{")
+
+    def end_object(self):
+        self._close("}")
+
+    def begin_array(self):
+        self._open("[")
+
+    def end_array(self):
+        self._close("]")
+
+    def key(self, key: str):
+        self._separator()
+        self._write(json.dumps(key) + ": ")
+
+    def value(self, value: Any):
+        '''
+        Writes a complete value at the current depth, indented the same way json.dump would indent it in place.
+        '''
+        self._before_value()
+        self._write_value(value)
+
+    def indexed_value(self, value: Any) -> Tuple[int, int]:
+        '''
+        Writes a complete value like value() and returns its (offset, length) in bytes, so it can later be read back with seek() from a
+        binary file. Offsets count the UTF-8 bytes written by this writer, so the file must be opened with encoding="utf-8" and be new.
+        '''
+        self._before_value()
+        start = self.position
+        self._write_value(value)
+        return start, self.position - start
+
+    def serialize(self, value: Any) -> str:
+        # The text value() would write for value at the current depth
+        text = json_backend.dumps(value, indent=self.indent)
+        return text.replace("\n", "\n" + " " * (self.indent * len(self.stack)))
+
+    def raw_value(self, text: str) -> Tuple[int, int]:
+        '''
+        Writes text returned by serialize() at the same depth, e.g. kept from an earlier run, and returns its (offset, length) like indexed_value().
+        '''
+        self._before_value()
+        start = self.position
+        self._write(text)
+        return start, self.position - start
+
+    def _write_value(self, value: Any):
+        if isinstance(value, (RawJson, LazyObject, LazyArray)):
+            self._write_lazy(value)
+        else:
+            self._write(self.serialize(value))
+
+    def _write_lazy(self, value: Any):
+        # Lazy documents (see lazy_json.py): containers are written item by item and unparsed RawJson slices verbatim
+        if type(value) is RawJson:
+            self._write(value.text)
+            return
+        bracket = "{" if isinstance(value, LazyObject) else "["
+        self._write(bracket)
+        self.stack.append([bracket, 0])
+        if bracket == "{":
+            for key in value:
+                self.key(key)
+                self._write_value(dict.__getitem__(value, key)) # without parsing RawJson values
+        else:
+            for item in value:
+                self._separator()
+                self._write_value(item)
+        self._close("}" if bracket == "{" else "]")
+
+
+def dump_array(items: Iterable[Any], path: Any) -> int:
+    '''
+    This function writes items exactly like json_backend.dump_file(list(items), path, indent=2), one item at a time,
+    so neither the list nor the text of the whole array has to be held in memory. Items can come from a generator.
+
+    Returns:
+        int: The number of items written.
+    '''
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        writer = JsonStreamWriter(f)
+        writer.begin_array()
+        for item in items:
+            writer.value(item)
+            count += 1
+        writer.end_array()
+    return count
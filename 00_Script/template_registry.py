@@ -0,0 +1,149 @@
+'''
+Registry of the 0.6.0 Handlebars render templates, loaded once per run and shared by every service.
+Before, DFRTransformer.transform_services built the whole template literal on every call; now every renderTemplate item
+references the same interned string, and the output can optionally store each template once and reference it.
+'''
+
+import sys
+from pathlib import Path
+from typing import Dict, Any, Optional, Set
+
+TEMPLATE_DIR = Path(__file__).resolve().parent / "templates"
+DOCUMENTATION_TEMPLATE_DIR = Path(__file__).resolve().parent.parent / "03_Documentation" / "v0.6.0_template"
+
+# Folder / file name of each credential type's template, as in 03_Documentation/v0.6.0_template
+TEMPLATE_NAMES = {
+    "DFR": "digital_facility_record",
+    "DPP": "digital_product_passport",
+    "DCC": "digital_conformity_credential",
+    "DTE": "digital_traceability_event",
+    "DIA": "digital_identity_anchor",
+}
+
+# Top-level key and reference prefix used when the output stores each template once
+TEMPLATES_KEY = "renderTemplates"
+REFERENCE_PREFIX = f"#/{TEMPLATES_KEY}/"
+
+
+# ---------- Registry ----------
+class TemplateRegistry:
+    _templates: Dict[str, str] = {} # credential type -> loaded template
+    _paths: Dict[str, Path] = {} # credential type -> template file overriding the default location
+
+    @classmethod
+    def register(cls, credential_type: str, template_path: str) -> None:
+        '''
+        Uses template_path as the template for credential_type, for example the template.hbs the Phase 1 script read.
+        '''
+        cls._paths[credential_type] = Path(template_path)
+        cls._templates.pop(credential_type, None)
+
+    @classmethod
+    def template_path(cls, credential_type: str) -> Path:
+        '''
+        Resolves the template file: a registered path first, then the bundled templates/<name>.hbs,
+        then the reference template in 03_Documentation/v0.6.0_template/<name>/template.hbs.
+        '''
+        if credential_type in cls._paths:
+            return cls._paths[credential_type]
+        if credential_type not in TEMPLATE_NAMES:
+            raise ValueError(f"No render template known for credential type: {credential_type}")
+        name = TEMPLATE_NAMES[credential_type]
+        bundled = TEMPLATE_DIR / f"{name}.hbs"
+        if bundled.exists():
+            return bundled
+        return DOCUMENTATION_TEMPLATE_DIR / name / "template.hbs"
+
+    @classmethod
+    def get(cls, credential_type: str) -> str:
+        '''
+        Returns the template for credential_type. The file is read once per run; every later call returns the same interned string.
+        '''
+        template = cls._templates.get(credential_type)
+        if template is None:
+            with open(cls.template_path(credential_type), "r", encoding="utf-8", newline="") as f:
+                template = sys.intern(f.read())
+            cls._templates[credential_type] = template
+        return template
+
+    @classmethod
+    def load_all(cls) -> Dict[str, str]:
+        '''
+        Loads every credential type's template that is available (registered, bundled or documented) and returns them by credential type.
+        '''
+        for credential_type in set(TEMPLATE_NAMES) | set(cls._paths):
+            if cls.template_path(credential_type).exists():
+                cls.get(credential_type)
+        return dict(cls._templates)
+
+    @classmethod
+    def clear(cls) -> None:
+        # Forgets the loaded templates and registered paths
+        cls._templates.clear()
+        cls._paths.clear()
+
+
+# ---------- Shared templates in the output ----------
+def _render_template_items(feature: Dict[str, Any]):
+    # Yields every renderTemplate item of the feature's services ("services" -> "parameters" -> <credential> -> "renderTemplate")
+    for service in feature.get("services", []):
+        for param in service.get("parameters", []):
+            for value in param.values():
+                if isinstance(value, dict) and isinstance(value.get("renderTemplate"), list):
+                    for item in value["renderTemplate"]:
+                        if isinstance(item, dict):
+                            yield item
+
+
+def reference_feature_templates(feature: Dict[str, Any], by_template: Optional[Dict[str, str]] = None) -> Set[str]:
+    '''
+    Replaces every registry template in the feature with a reference ("#/renderTemplates/DFR") in place.
+
+    Args:
+        feature (Dict[str, Any]): The feature to update.
+        by_template (Dict[str, str], optional): Template -> credential type lookup. Defaults to every available template.
+
+    Returns:
+        Set[str]: The credential types referenced by the feature.
+    '''
+    if by_template is None:
+        by_template = {template: credential_type for credential_type, template in TemplateRegistry.load_all().items()}
+    referenced = set()
+    for item in _render_template_items(feature):
+        template = item.get("template")
+        credential_type = by_template.get(template) if isinstance(template, str) else None
+        if credential_type:
+            item["template"] = REFERENCE_PREFIX + credential_type
+            referenced.add(credential_type)
+    return referenced
+
+
+def share_templates(config: Dict[str, Any]) -> Dict[str, Any]:
+    '''
+    Writes each template once under config["renderTemplates"] and references it from every service, so the output size
+    and serialization time no longer grow with the number of services. Updates the config in place.
+    '''
+    by_template = {template: credential_type for credential_type, template in TemplateRegistry.load_all().items()}
+    referenced = set()
+    for app in config.get("apps", []):
+        for feature in app.get("features", []):
+            referenced |= reference_feature_templates(feature, by_template)
+    if referenced:
+        config[TEMPLATES_KEY] = {credential_type: TemplateRegistry.get(credential_type) for credential_type in sorted(referenced)}
+    return config
+
+
+def expand_templates(config: Dict[str, Any], templates: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    '''
+    Inverse of share_templates(): replaces the references with the full templates and removes config["renderTemplates"].
+    Updates the config in place.
+    '''
+    if templates is None:
+        templates = config.pop(TEMPLATES_KEY, {})
+    for app in config.get("apps", []):
+        for feature in app.get("features", []):
+            for item in _render_template_items(feature):
+                template = item.get("template")
+                if isinstance(template, str) and template.startswith(REFERENCE_PREFIX):
+                    item["template"] = templates[template[len(REFERENCE_PREFIX):]]
+    return config
@@ -0,0 +1,62 @@
+'''
+The migration diff (config_diff.py and AppConfigProcessor.write_diff()): features are aligned by id, so an inserted or reordered feature
+is one change, changes are labelled with their feature, and a lazily loaded config is rejected.
+Run with: python -m pytest 00_Script/tests
+'''
+
+import copy
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parent.parent)) # 00_Script
+import json_backend
+from config_diff import diff_configs, diff_path_for, diff_report
+from main_transformer import AppConfigProcessor
+
+CONFIG_PATH = Path(__file__).resolve().parent.parent.parent / "01_Data" / "app-config" / "RegenFarmers" / "app-config.json"
+
+
+def _config(*features):
+    return {"apps": [{"name": "app", "features": list(features)}]}
+
+
+def _feature(feature_id, **data):
+    return {"id": feature_id, "name": f"Feature {feature_id}", "components": [{"name": "JsonForm", "type": "EntryData", "props": {"data": data}}]}
+
+
+def test_identical_and_reordered_configs_have_no_changes():
+    before = _config(_feature("a", x=1), _feature("b", x=2))
+    assert diff_configs(before, copy.deepcopy(before)) == []
+    assert diff_configs(before, _config(_feature("b", x=2), _feature("a", x=1))) == []
+
+
+def test_changes_are_aligned_and_labelled():
+    before = _config(_feature("a", x=1, old=True), _feature("b", x=2))
+    after = _config(_feature("new", x=0), _feature("a", x=10, added="y"), _feature("b", x=2))
+    assert diff_configs(before, after) == [
+        {"op": "add", "path": "/apps/0/features/0", "feature": "Feature new", "value": _feature("new", x=0)},
+        {"op": "replace", "path": "/apps/0/features/1/components/0/props/data/x", "feature": "Feature a", "before": 1, "value": 10},
+        {"op": "remove", "path": "/apps/0/features/1/components/0/props/data/old", "feature": "Feature a", "before": True},
+        {"op": "add", "path": "/apps/0/features/1/components/0/props/data/added", "feature": "Feature a", "value": "y"},
+    ]
+    assert diff_report(before, after)["summary"] == {"add": 2, "remove": 1, "replace": 1, "features": 2}
+
+
+def test_write_diff_of_migration(tmp_path):
+    processor = AppConfigProcessor(CONFIG_PATH, quiet=True)
+    output_path = tmp_path / "transformed-app-config.json"
+    diff_path = processor.write_diff(processor.process_copy_on_write(), output_path)
+
+    assert diff_path == diff_path_for(output_path) == tmp_path / "transformed-app-config.diff.json"
+    report = json_backend.load_file(diff_path)
+    assert report["summary"]["features"] > 0
+    assert any(change["path"].endswith("/props/schema/url") and "0.6.0" in change["value"] for change in report["changes"])
+
+
+def test_write_diff_rejects_lazy_config(tmp_path):
+    processor = AppConfigProcessor(CONFIG_PATH, lazy=True, quiet=True)
+    with pytest.raises(ValueError, match="eagerly loaded"):
+        processor.write_diff(processor.process_copy_on_write(), tmp_path / "transformed-app-config.json")
+    assert not diff_path_for(tmp_path / "transformed-app-config.json").exists()
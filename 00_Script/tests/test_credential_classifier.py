@@ -0,0 +1,76 @@
+'''
+The credential-type classifier (credential_classifier.py): schema and context URLs of all five UNTP credential types are classified
+with their version and class, for both the JsonForm and the LocalStorageLoader component layouts.
+Run with: python -m pytest 00_Script/tests
+'''
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parent.parent)) # 00_Script
+from credential_classifier import (CredentialSchema, classify_context_url, classify_schema_url, component_schema_url,
+                                   feature_credential_type)
+
+JARGON = "https://jargon.sh/user/unece"
+
+
+@pytest.mark.parametrize("schema_url, expected", [
+    (f"{JARGON}/DigitalFacilityRecord/v/0.5.0/artefacts/jsonSchemas/DigitalFacilityRecord.json?class=DigitalFacilityRecord",
+     ("DFR", "0.5.0", "DigitalFacilityRecord")),
+    (f"{JARGON}/DigitalFacilityRecord/v/0.6.0/artefacts/jsonSchemas/FacilityRecord.json?class=FacilityRecord", ("DFR", "0.6.0", "FacilityRecord")),
+    (f"{JARGON}/DigitalProductPassport/v/0.5.0/artefacts/jsonSchemas/DigitalProductPassport.json?class=DigitalProductPassport",
+     ("DPP", "0.5.0", "DigitalProductPassport")),
+    (f"{JARGON}/ConformityCredential/v/0.5.0/artefacts/jsonSchemas/DigitalConformityCredential.json?class=DigitalConformityCredential",
+     ("DCC", "0.5.0", "DigitalConformityCredential")),
+    (f"{JARGON}/DigitalConformityCredential/v/0.6.0/artefacts/jsonSchemas/ConformityAttestation.json", ("DCC", "0.6.0", "ConformityAttestation")),
+    (f"{JARGON}/traceabilityEvents/v/0.5.0/artefacts/jsonSchemas/TransformationEvent.json?class=TransformationEvent",
+     ("DTE", "0.5.0", "TransformationEvent")),
+    (f"{JARGON}/DigitalIdentityAnchor/v/0.6.0/artefacts/jsonSchemas/RegisteredIdentity.json?class=RegisteredIdentity",
+     ("DIA", "0.6.0", "RegisteredIdentity")),
+])
+def test_schema_url_of_every_type(schema_url, expected):
+    assert classify_schema_url(schema_url) == CredentialSchema(*expected)
+
+
+def test_schema_url_fallback_and_unknown():
+    # Outside the jargon.sh layout only the type is known; other models are not credentials
+    assert classify_schema_url("https://example.com/schemas/DigitalProductPassport.json") == CredentialSchema("DPP", None, None)
+    assert classify_schema_url(f"{JARGON}/SomethingElse/v/0.5.0/artefacts/jsonSchemas/SomethingElse.json") is None
+
+
+@pytest.mark.parametrize("credential_type", ["dfr", "dpp", "dcc", "dte", "dia"])
+def test_context_url_of_every_type(credential_type):
+    expected = CredentialSchema(credential_type.upper(), "0.5.0", None)
+    assert classify_context_url(f"https://test.uncefact.org/vocabulary/untp/{credential_type}/0.5.0/") == expected
+    assert classify_context_url(f"https://vocabulary.uncefact.org/untp/{credential_type}/0.5.0/") == expected
+
+
+def test_context_url_unknown():
+    assert classify_context_url("https://www.w3.org/ns/credentials/v2") is None
+
+
+def _json_form(schema_url):
+    return {"name": "JsonForm", "type": "EntryData", "props": {"schema": {"url": schema_url}}}
+
+
+def _local_storage_loader(*schema_urls):
+    nested = [{"props": {"schema": {"url": schema_url}}} for schema_url in schema_urls]
+    return {"name": "LocalStorageLoader", "type": "EntryData", "props": {"nestedComponents": nested}}
+
+
+def test_component_layouts():
+    dpp = f"{JARGON}/DigitalProductPassport/v/0.5.0/artefacts/jsonSchemas/DigitalProductPassport.json"
+    assert component_schema_url(_json_form(dpp)) == dpp
+    assert component_schema_url(_local_storage_loader(dpp)) == dpp
+    assert component_schema_url(_local_storage_loader(dpp, dpp)) is None # multiple nested components are not supported
+
+
+def test_feature_credential_type():
+    dfr = f"{JARGON}/DigitalFacilityRecord/v/0.5.0/artefacts/jsonSchemas/DigitalFacilityRecord.json"
+    dte = f"{JARGON}/traceabilityEvents/v/0.5.0/artefacts/jsonSchemas/TransformationEvent.json"
+    assert feature_credential_type({"components": [_json_form(dfr), _json_form(dte)]}) == "DTE" # the last classified component
+    assert feature_credential_type({"components": [_json_form(dfr), _json_form("https://example.com/other.json")]}) == "DFR"
+    assert feature_credential_type({"components": [_local_storage_loader(dte, dte), _json_form(dfr)]}) is None # the search stops
+    assert feature_credential_type({"components": [{"name": "Header", "type": "Layout"}]}) is None
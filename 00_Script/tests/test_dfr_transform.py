@@ -0,0 +1,62 @@
+'''
+The single-pass DFRTransformer.transform() (dfr.py) writes exactly what the step-by-step reference in benchmarks/dfr_multipass.py writes,
+key order included, for every DFR EntryData component of the 0.5.0 inputs and for variants with the optional fields the rules rewrite.
+Run with: python -m pytest 00_Script/tests
+'''
+
+import copy
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parent.parent)) # 00_Script
+import json_backend
+from benchmarks.dfr_multipass import transform_multipass
+from dfr import DFRTransformer
+
+DATA_DIR = Path(__file__).resolve().parent.parent.parent / "01_Data" / "app-config"
+CONFIG_PATHS = [DATA_DIR / "RegenFarmers" / "app-config.json", DATA_DIR / "RBTP" / "untp-playground-test-v2&3" / "app-config.json"]
+
+
+def _dfr_components():
+    components = []
+    for config_path in CONFIG_PATHS:
+        for app in json_backend.load_file(config_path).get("apps", []):
+            for feature in app.get("features", []):
+                for component in feature.get("components", []):
+                    if component.get("type") == "EntryData" and "DigitalFacilityRecord" in component["props"].get("schema", {}).get("url", ""):
+                        components.append(component)
+    return components
+
+
+def _with_optional_fields(component):
+    # Threshold values, declaredValues without metricValue and identifiers on the facility and the issuer
+    component = copy.deepcopy(component)
+    credential_subject = component["props"]["data"].setdefault("credentialSubject", {})
+    for claim in credential_subject.get("conformityClaim", []):
+        for criterion in claim.get("assessmentCriteria", []):
+            criterion["thresholdValues"] = [{"a": 1}, {"b": 2}]
+        if "declaredValue" in claim:
+            claim["declaredValues"] = claim.pop("declaredValue")
+        for declared in claim.get("declaredValues", []):
+            declared.pop("metricValue", None)
+    credential_subject["otherIdentifier"] = [{"type": ["Identifier"], "id": "a", "idScheme": {}}]
+    component["props"]["data"].setdefault("issuer", {})["otherIdentifier"] = [{"id": "b"}]
+    return component
+
+
+COMPONENTS = _dfr_components()
+
+
+@pytest.mark.parametrize("component", COMPONENTS + [_with_optional_fields(component) for component in COMPONENTS])
+def test_transform_matches_multipass_reference(component):
+    transformer = DFRTransformer()
+    fused = transformer.transform(copy.deepcopy(component))
+    reference = transform_multipass(transformer, copy.deepcopy(component))
+    assert json.dumps(fused) == json.dumps(reference) # json.dumps keeps the key order
+
+
+def test_corpus_has_dfr_components():
+    assert COMPONENTS
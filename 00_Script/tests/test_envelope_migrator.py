@@ -0,0 +1,33 @@
+'''
+Batch migration of enveloped credentials (envelope_migrator.py): outputs go to a separate folder, re-runs do not pick up earlier
+outputs, and skipped credentials produce no files.
+Run with: python -m pytest 00_Script/tests
+'''
+
+import shutil
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent)) # 00_Script
+from envelope_migrator import migrate_files
+
+TESTSUITE_DIR = Path(__file__).resolve().parent.parent.parent / "01_Data" / "testsuite_testing"
+
+
+def test_migrate_files_writes_outside_the_input_folder_and_only_for_migrated_credentials(tmp_path):
+    source = tmp_path / "testsuite"
+    shutil.copytree(TESTSUITE_DIR, source)
+    inputs = sorted(path.name for path in source.iterdir())
+
+    for _ in range(2): # the second run must not migrate the outputs of the first
+        summaries = migrate_files(str(source), max_workers=1)
+        assert [Path(summary["input"]).name for summary in summaries] == inputs
+        assert sorted(path.name for path in source.iterdir()) == inputs
+
+    output_dir = tmp_path / "migrated-testsuite"
+    written = sorted(path.name for path in output_dir.iterdir())
+    migrated = [Path(summary["input"]).name for summary in summaries if summary["migrated"]]
+    assert migrated and len(migrated) < len(inputs) # the 0.6.0 credentials are skipped
+    assert written == sorted(name for input_name in migrated
+                             for name in (f"migrated-{input_name}", f"migrated-{Path(input_name).stem}.payload.json"))
+    assert all(summary["output"] is None for summary in summaries if not summary["migrated"])
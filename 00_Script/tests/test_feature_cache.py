@@ -0,0 +1,24 @@
+'''
+The incremental re-migration cache (feature_cache.py): features written by another JSON backend are never reused.
+Run with: python -m pytest 00_Script/tests
+'''
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent)) # 00_Script
+import json_backend
+from feature_cache import code_fingerprint
+
+
+def test_fingerprint_covers_json_backend():
+    selected = json_backend.get_backend()
+    fingerprints = {}
+    try:
+        for name in json_backend.BACKENDS:
+            json_backend.set_backend(name)
+            fingerprints[name] = code_fingerprint()
+    finally:
+        json_backend.set_backend(selected)
+    assert len(set(fingerprints.values())) == len(fingerprints)
+    assert code_fingerprint() == fingerprints[selected]
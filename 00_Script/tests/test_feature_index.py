@@ -0,0 +1,66 @@
+'''
+The feature index sidecar (feature_index.py): indexed lookups return the same features as classifying the whole output, for every
+credential type, whichever way the output was written.
+Run with: python -m pytest 00_Script/tests
+'''
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parent.parent)) # 00_Script
+import json_backend
+from credential_classifier import MODEL_TYPES, classify_schema_url, component_schema_url
+from feature_cache import FeatureCache
+from feature_index import FeatureIndex, index_path_for
+from main_transformer import AppConfigProcessor
+
+CONFIG_PATH = Path(__file__).resolve().parent.parent.parent / "01_Data" / "app-config" / "RegenFarmers" / "app-config.json"
+
+
+def _scan(config, credential_type):
+    # The scan of Helper Code/dfr_master_testing.py: the type of the last classified EntryData component of each feature
+    found = []
+    for app in config.get("apps", []):
+        for feature in app.get("features", []):
+            feature_type = None
+            for component in feature.get("components", []):
+                if component.get("type") == "EntryData":
+                    schema_url = component_schema_url(component)
+                    if schema_url is None:
+                        break
+                    schema = classify_schema_url(schema_url)
+                    if schema:
+                        feature_type = schema.credential_type
+            if feature_type == credential_type:
+                found.append(feature)
+    return found
+
+
+def _write_output(output_path):
+    processor = AppConfigProcessor(CONFIG_PATH, quiet=True)
+    processor.write_output(processor.process(), output_path, index=True)
+
+
+def _write_streaming(output_path):
+    AppConfigProcessor(CONFIG_PATH, streaming=True, quiet=True).process_streaming(output_path, index=True)
+
+
+def _write_incremental(output_path):
+    for _ in range(2): # the second run writes every feature from the cache
+        cache = FeatureCache(output_path)
+        AppConfigProcessor(CONFIG_PATH, quiet=True).process_incremental(output_path, cache, index=True)
+    assert cache.hits and not cache.misses
+
+
+@pytest.mark.parametrize("write", [_write_output, _write_streaming, _write_incremental])
+def test_indexed_lookup_matches_scan_for_every_type(tmp_path, write):
+    output_path = tmp_path / "transformed-app-config.json"
+    write(output_path)
+    index = FeatureIndex.load(index_path_for(output_path))
+    output = json_backend.load_file(output_path)
+
+    for credential_type in sorted(set(MODEL_TYPES.values())):
+        assert index.extract(credential_type) == _scan(output, credential_type), credential_type
+    assert {"DFR", "DPP", "DCC", "DTE"} <= set(index.credential_types()) # not only the types with a registered transformer
@@ -0,0 +1,43 @@
+'''
+The golden corpus run (golden_regression.py): a golden feature that matches the migrated input passes, a changed value fails,
+and a golden file without input only fails in strict mode.
+Run with: python -m pytest 00_Script/tests
+'''
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent)) # 00_Script
+import json_backend
+from golden_regression import CORPUS_DIR, entry_data, exit_status, run_corpus
+
+INPUT_PATH = CORPUS_DIR / "spotcheck-0.5.json"
+GOLDEN_PATH = CORPUS_DIR / "spotcheck-0.6.json" # the expected 0.6.0 version of the spot-checked feature
+
+
+def _run(tmp_path, edit=None):
+    golden = json_backend.load_file(GOLDEN_PATH)
+    if edit:
+        edit(entry_data(golden)[1])
+    json_backend.dump_file(golden, tmp_path / "spotcheck-0.6.json", indent=2)
+    return run_corpus(tmp_path, [INPUT_PATH])
+
+
+def test_matching_golden_file_passes(tmp_path):
+    results = _run(tmp_path)
+    assert [result["status"] for result in results] == ["match"]
+    assert exit_status(results) == 0 and exit_status(results, strict=True) == 0
+
+
+def test_changed_value_fails(tmp_path):
+    results = _run(tmp_path, lambda data: data["facility"].update(name="Another facility"))
+    assert [result["status"] for result in results] == ["mismatch"]
+    assert any(mismatch.startswith("/components/") for mismatch in results[0]["mismatches"])
+    assert exit_status(results) == 1
+
+
+def test_golden_file_without_input_fails_only_when_strict(tmp_path):
+    results = _run(tmp_path, lambda data: data.update(id="https://example.com/no-such-subject"))
+    assert [result["status"] for result in results] == ["no input"]
+    assert exit_status(results) == 0
+    assert exit_status(results, strict=True) == 1
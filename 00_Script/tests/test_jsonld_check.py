@@ -0,0 +1,26 @@
+'''
+Offline JSON-LD check (jsonld_check.py): a credential whose contexts are not cached is never passed silently.
+Run with: python -m pytest 00_Script/tests
+'''
+
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("pyld")
+sys.path.append(str(Path(__file__).resolve().parent.parent)) # 00_Script
+from jsonld_check import ContextNotCached, check_config
+from main_transformer import AppConfigProcessor
+
+CONFIG_PATH = Path(__file__).resolve().parent.parent.parent / "01_Data" / "app-config" / "RegenFarmers" / "app-config.json"
+
+
+def test_missing_context_cache_fails_unless_skipping_is_allowed(tmp_path):
+    output = AppConfigProcessor(CONFIG_PATH, quiet=True).process()
+    with pytest.raises(ContextNotCached):
+        check_config(output, tmp_path)
+
+    checked, failures, skipped = check_config(output, tmp_path, allow_skipped=True)
+    assert (checked, failures) == (0, [])
+    assert sum(skipped.values()) == 2 # the credentials of the two DFR components of RegenFarmers
@@ -0,0 +1,64 @@
+'''
+Lazy loading (lazy_json.py) together with AppConfigProcessor.process_copy_on_write(): the output carries the unparsed values of the
+input along, is written exactly like an eager process() run, leaves the lazily loaded input untouched, and shares the features without
+a registered transformer unparsed.
+Run with: python -m pytest 00_Script/tests
+'''
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent)) # 00_Script
+import json_backend
+import lazy_json
+from credential_classifier import feature_credential_type
+from main_transformer import AppConfigProcessor, TransformerFactory
+from stream_io import JsonStreamWriter
+
+CONFIG_PATH = Path(__file__).resolve().parent.parent.parent / "01_Data" / "app-config" / "RegenFarmers" / "app-config.json"
+
+
+def _write_lazy(document, path):
+    with open(path, "w", encoding="utf-8") as f:
+        JsonStreamWriter(f).value(document)
+
+
+def test_lazy_object_copy_keeps_raw_slices():
+    document = lazy_json.load_lazy('{"a": {"b": 1}, "c": [1, 2]}', lazy_paths=())
+    copied = document.copy()
+    assert isinstance(copied, lazy_json.LazyObject)
+    assert not copied.is_parsed("a") and not document.is_parsed("a")
+    assert copied["a"] == {"b": 1} and not document.is_parsed("a") # parsing the copy does not parse the original
+
+
+def test_lazy_copy_on_write_matches_eager_process(tmp_path):
+    # The input is re-written in json.dump(indent=2) layout first, as unparsed slices keep the formatting of the input
+    config_path = tmp_path / "app-config.json"
+    json_backend.dump_file(json_backend.load_file(CONFIG_PATH), config_path, indent=2)
+    lazy = AppConfigProcessor(config_path, lazy=True, quiet=True)
+    output = lazy.process_copy_on_write()
+    lazy.write_output(output, tmp_path / "lazy.json")
+    eager = AppConfigProcessor(config_path, quiet=True)
+    eager.write_output(eager.process(), tmp_path / "eager.json")
+
+    assert (tmp_path / "lazy.json").read_text(encoding="utf-8") == (tmp_path / "eager.json").read_text(encoding="utf-8")
+    _write_lazy(lazy.config_data, tmp_path / "input.json")
+    assert json_backend.load_file(tmp_path / "input.json") == json_backend.load_file(CONFIG_PATH)
+
+
+def test_lazy_copy_on_write_leaves_untransformed_features_unparsed():
+    lazy = AppConfigProcessor(CONFIG_PATH, lazy=True, quiet=True)
+    output = lazy.process_copy_on_write()
+
+    shared = []
+    for app, new_app in zip(lazy.config_data["apps"], output["apps"]):
+        for feature, new_feature in zip(app["features"], new_app["features"]):
+            assert not feature.is_parsed("services") # the input is never parsed through the copies
+            if new_feature is feature:
+                shared.append(feature)
+                assert not feature.is_parsed("components"), feature.get("name")
+
+    eager = AppConfigProcessor(CONFIG_PATH, quiet=True).load_config()
+    untransformed = [feature for app in eager["apps"] for feature in app["features"]
+                     if feature_credential_type(feature) not in TransformerFactory.transformers]
+    assert shared and len(shared) == len(untransformed)
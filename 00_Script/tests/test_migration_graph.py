@@ -0,0 +1,62 @@
+'''
+The version migration graph (migration_graph.py): the shortest chain of edges is planned and run, and unconnected versions
+raise MigrationPathError.
+Run with: python -m pytest 00_Script/tests
+'''
+
+import copy
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parent.parent)) # 00_Script
+import json_backend
+from credential_classifier import classify_schema_url, component_schema_url
+from migration_graph import MigrationGraph, MigrationPathError, migrate_component
+
+SPOTCHECK_PATH = Path(__file__).resolve().parent.parent.parent / "01_Data" / "app-config" / "RBTP" / "spotcheck-0.5.json"
+
+
+@pytest.fixture
+def graph(monkeypatch):
+    # An empty graph with a TEST type: 1 -> 2 -> 3 by rules, and a shortcut 1 -> 3; the registered edges are restored afterwards
+    monkeypatch.setattr(MigrationGraph, "_edges", {})
+    monkeypatch.setattr(MigrationGraph, "_chains", {})
+    MigrationGraph.register("TEST", "1", "2", rules=[{"op": "rename", "path": "a", "to": "b"}])
+    MigrationGraph.register("TEST", "2", "3", rules=[{"op": "set", "path": "c", "value": 3}])
+    MigrationGraph.register("TEST", "1", "3", rules=[{"op": "set", "path": "shortcut", "value": True}])
+    return MigrationGraph
+
+
+def test_plan_takes_shortest_chain(graph):
+    assert [(edge.from_version, edge.to_version) for edge in graph.plan("TEST", "1", "2")] == [("1", "2")]
+    assert [(edge.from_version, edge.to_version) for edge in graph.plan("TEST", "1", "3")] == [("1", "3")]
+    assert graph.plan("TEST", "2", "2") == []
+    assert graph.migrate("TEST", {"a": 1}, "2", "3") == {"a": 1, "c": 3}
+    assert graph.migrate("TEST", {"a": 1}, "1", "3") == {"a": 1, "shortcut": True}
+
+
+def test_unconnected_versions_raise(graph):
+    with pytest.raises(MigrationPathError, match="No migration path for TEST from 3 to 1"):
+        graph.plan("TEST", "3", "1")
+    with pytest.raises(MigrationPathError):
+        graph.migrate("TEST", {"a": 1}, "1", "4")
+    with pytest.raises(MigrationPathError):
+        graph.plan("OTHER", "1", "2")
+    assert issubclass(MigrationPathError, LookupError)
+
+
+def test_migrate_component_along_registered_edge():
+    feature = json_backend.load_file(SPOTCHECK_PATH)
+    component = next(component for component in feature["components"] if component.get("type") == "EntryData")
+    schema = classify_schema_url(component_schema_url(component))
+    assert (schema.credential_type, schema.version) == ("DFR", "0.5.0")
+
+    with pytest.raises(MigrationPathError):
+        migrate_component(copy.deepcopy(component), "0.4.0")
+    migrated = migrate_component(component, "0.6.0")
+    assert classify_schema_url(component_schema_url(migrated)).version == "0.6.0"
+
+    with pytest.raises(ValueError, match="Cannot detect"):
+        migrate_component({"type": "EntryData", "props": {"schema": {"url": "https://example.com/schema.json"}}}, "0.6.0")
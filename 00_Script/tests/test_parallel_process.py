@@ -0,0 +1,27 @@
+'''
+AppConfigProcessor.process(max_workers=...) (main_transformer.py): the parallel run writes the same output, finds the same credential
+types and, when quiet, keeps the same progress messages as the serial run.
+Run with: python -m pytest 00_Script/tests
+'''
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent)) # 00_Script
+import json_backend
+import main_transformer
+from main_transformer import AppConfigProcessor
+
+CONFIG_PATH = Path(__file__).resolve().parent.parent.parent / "01_Data" / "app-config" / "RegenFarmers" / "app-config.json"
+
+
+def test_parallel_process_matches_serial(monkeypatch):
+    monkeypatch.setattr(main_transformer.os, "cpu_count", lambda: 2) # process() falls back to the serial loop on a single CPU
+    serial = AppConfigProcessor(CONFIG_PATH, quiet=True)
+    parallel = AppConfigProcessor(CONFIG_PATH, quiet=True)
+    expected = json_backend.dumps_compact(serial.process())
+
+    assert json_backend.dumps_compact(parallel.process(max_workers=2)) == expected
+    assert parallel.feature_types == serial.feature_types
+    assert serial.messages # the corpus has features without a valid credential type
+    assert parallel.messages == serial.messages
@@ -0,0 +1,47 @@
+'''
+The local playground stand-in (playground_mock.py): results of a concurrent batch come back in submission order, and a submission
+that is not a credential is answered with 400, which the client reports as an "error" result.
+Run with: python -m pytest 00_Script/tests
+'''
+
+import http.client
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent)) # 00_Script
+from playground_mock import VERIFY_PATH, VerificationClient, VerificationServer
+
+CONTEXTS = {
+    "DFR": "https://test.uncefact.org/vocabulary/untp/dfr/0.6.0/",
+    "DPP": "https://test.uncefact.org/vocabulary/untp/dpp/0.5.0/",
+    "DCC": "https://test.uncefact.org/vocabulary/untp/dcc/0.5.0/",
+}
+
+
+def _credential(credential_type, number):
+    return {
+        "@context": ["https://www.w3.org/ns/credentials/v2", CONTEXTS[credential_type]],
+        "type": ["VerifiableCredential"],
+        "credentialSubject": {"id": f"urn:test:{number}"},
+    }
+
+
+def test_verify_all_keeps_submission_order_and_reports_bad_bodies(tmp_path):
+    # Empty caches: every check is skipped, so the service answers without pyld/jsonschema and without network access
+    server = VerificationServer(("127.0.0.1", 0), tmp_path / "schemas", tmp_path / "contexts").start()
+    client = VerificationClient(*server.server_address, max_connections=4)
+    try:
+        types = ["DFR", "DPP", "DCC"] * 4
+        results = client.verify_all([_credential(credential_type, i) for i, credential_type in enumerate(types)] + [{"not": "a credential"}])
+
+        assert [result.get("credential_type") for result in results[:-1]] == types
+        assert all(result["status"] == "skipped" for result in results[:-1])
+        assert results[-1]["status"] == "error"
+
+        connection = http.client.HTTPConnection(*server.server_address, timeout=10)
+        connection.request("POST", VERIFY_PATH, b"not json", {"Content-Type": "application/json"})
+        assert connection.getresponse().status == 400
+        connection.close()
+    finally:
+        client.close()
+        server.shutdown()
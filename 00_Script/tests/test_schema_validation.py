@@ -0,0 +1,26 @@
+'''
+Offline schema validation (schema_validation.py): a component whose schema is not cached is never passed silently.
+Run with: python -m pytest 00_Script/tests
+'''
+
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("jsonschema")
+sys.path.append(str(Path(__file__).resolve().parent.parent)) # 00_Script
+from main_transformer import AppConfigProcessor
+from schema_validation import SchemaNotCached, validate_config
+
+CONFIG_PATH = Path(__file__).resolve().parent.parent.parent / "01_Data" / "app-config" / "RegenFarmers" / "app-config.json"
+
+
+def test_missing_schema_cache_fails_unless_skipping_is_allowed(tmp_path):
+    output = AppConfigProcessor(CONFIG_PATH, quiet=True).process()
+    with pytest.raises(SchemaNotCached):
+        validate_config(output, tmp_path)
+
+    validated, failures, skipped = validate_config(output, tmp_path, allow_skipped=True)
+    assert (validated, failures) == (0, [])
+    assert sum(skipped.values()) == 2 # the two DFR components of RegenFarmers
@@ -0,0 +1,47 @@
+'''
+Registry of the credential transformers.
+Each credential type plugs in with a decorator on its transformer class:
+
+    @TransformerRegistry.register("DPP")
+    class DPPTransformer(CredentialTransformer):
+        ...
+
+The class is instantiated once when it is registered. Transformers are stateless (the component or service is passed to
+transform() / transform_services()), so the same instance serves every component and dispatch is a single dict lookup.
+'''
+
+from typing import Dict, Any, Callable, Type
+
+
+# ---------- Registry ----------
+class TransformerRegistry:
+    _transformers: Dict[str, Any] = {} # credential type -> shared transformer instance
+
+    @classmethod
+    def register(cls, credential_type: str) -> Callable[[Type], Type]:
+        '''
+        Class decorator registering a transformer for credential_type. A later registration for the same type replaces the earlier one.
+        '''
+        def decorator(transformer_class: Type) -> Type:
+            cls._transformers[credential_type] = transformer_class()
+            return transformer_class
+        return decorator
+
+    @classmethod
+    def unregister(cls, credential_type: str) -> None:
+        cls._transformers.pop(credential_type, None)
+
+    @classmethod
+    def get(cls, credential_type: str) -> Any:
+        '''
+        Returns the shared transformer instance of credential_type.
+        '''
+        try:
+            return cls._transformers[credential_type]
+        except KeyError:
+            raise ValueError(f"Unknown credential type: {credential_type}") from None
+
+    @classmethod
+    def transformers(cls) -> Dict[str, Any]:
+        # The live mapping, used for "is this type supported" checks without a copy
+        return cls._transformers